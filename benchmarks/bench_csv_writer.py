@@ -0,0 +1,41 @@
+#! /usr/bin/env python
+
+"""Benchmark: create_csv_file_from_list against the previous csv.DictWriter implementation
+
+Run with: PYTHONPATH=. python benchmarks/bench_csv_writer.py [nb_rows]
+"""
+
+import csv
+import sys
+import time
+from io import StringIO
+from typing import Any, Dict, List
+
+from tools.depthdict.csv import create_csv_file_from_list
+
+
+def legacy_create_csv_file_from_list(fieldnames: List[str], records: List[Dict]) -> str:
+    string_file_in_memory = StringIO()
+    writer: csv.DictWriter = csv.DictWriter(string_file_in_memory, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+    return string_file_in_memory.getvalue()
+
+
+if __name__ == '__main__':
+    nb_rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    fieldnames: List[str] = ['__id', 'name', 'age', 'address.city', 'address.zip', 'score']
+    dense: List[Dict[str, Any]] = [
+        {'__id': str(i), 'name': 'name %d' % i, 'age': i % 90, 'address.city': 'Anytown', 'address.zip': '12345', 'score': i / 7}
+        for i in range(nb_rows)
+    ]
+    sparse: List[Dict[str, Any]] = [{k: v for k, v in r.items() if k != 'score' or i % 2} for i, r in enumerate(dense)]
+    for name, records in (('dense', dense), ('sparse', sparse)):
+        timings: Dict[str, float] = {}
+        for label, fct in (('DictWriter', legacy_create_csv_file_from_list), ('fast writer', create_csv_file_from_list)):
+            start: float = time.perf_counter()
+            content: str = fct(fieldnames, records)
+            timings[label] = time.perf_counter() - start
+            print("%-7s %-12s %8.3f s (%d bytes)" % (name, label, timings[label], len(content)))
+        print("%-7s speedup x%.2f" % (name, timings['DictWriter'] / timings['fast writer']))
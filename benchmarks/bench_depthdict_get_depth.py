@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+
+"""Benchmark: depthdict.get_depth per-lookup cost, compiled paths vs. the previous implementation
+
+Run with: PYTHONPATH=. python benchmarks/bench_depthdict_get_depth.py
+"""
+
+import re
+import timeit
+from typing import Any, List
+
+from tools.depthdict import compile_path, depthdict
+
+
+def legacy_get_depth(self: dict, f: str, d: Any = None, s: str = '.') -> Any:
+    """get_depth as it was before compiled paths (split and regex on every call)"""
+    field_names: List[str] = f.split(s)
+    len_fields_minus_one: int = len(field_names) - 1
+    c_d: Any = self
+    for i, field_name in enumerate(field_names):
+        flag_list: bool = False
+        z = re.match(r'^(?P<field_name>[^[]+)\[(?P<list_index>-?[0-9]+)\]$', field_name)
+        if z is not None:
+            flag_list = True
+            field_name = z.group('field_name')
+            list_index: int = int(z.group('list_index'))
+        if field_name not in c_d:
+            return d
+        if flag_list:
+            if not isinstance(c_d[field_name], list):
+                return d
+            if (list_index >= 0 and list_index >= len(c_d[field_name])) or \
+               (list_index < 0 and -list_index > len(c_d[field_name])):
+                return d
+            c_d = c_d[field_name][list_index:][0]
+        else:
+            c_d = c_d[field_name]
+        if i == len_fields_minus_one:
+            return c_d
+
+
+if __name__ == '__main__':
+    record = depthdict({
+        'id': 1,
+        'person': {
+            'name': 'John',
+            'address': {'city': 'Anytown', 'zip': '12345'},
+            'phones': [{'number': '555-1234'}, {'number': '555-5678'}],
+        },
+    })
+    paths: List[str] = ['id', 'person.name', 'person.address.city', 'person.phones[1].number', 'person.unknown']
+    number: int = 200000
+    accessors = [compile_path(p) for p in paths]
+
+    timings = {
+        'legacy get_depth': lambda: [legacy_get_depth(record, p) for p in paths],
+        'get_depth': lambda: [record.get_depth(p) for p in paths],
+        'compiled path get': lambda: [a.get(record) for a in accessors],
+    }
+    for name, fct in timings.items():
+        seconds: float = min(timeit.repeat(fct, number=number, repeat=3))
+        print("%-20s %8.1f ns/lookup" % (name, seconds * 1e9 / (number * len(paths))))
@@ -0,0 +1,66 @@
+#! /usr/bin/env python
+
+"""Benchmark: dictflat.flat on wide, deep and list-heavy documents
+
+The baseline is the former recursive engine (reference_flat, kept in the dictflat tests).
+
+Run with: PYTHONPATH=. python benchmarks/bench_dictflat.py
+"""
+
+import timeit
+from typing import Any, Dict
+
+from tests.tools.dictflat.test_dictflat_04_reference import reference_flat
+from tools.dictflat import FlatPlan, flat
+from tools.recordid import CounterIdGenerator
+
+
+def wide_document(nb_fields: int = 500) -> Dict:
+    return {'field%d' % i: i for i in range(nb_fields)}
+
+
+def deep_document(depth: int = 500) -> Dict:
+    d: Dict = {'leaf': 1, 'other': 'value'}
+    for i in range(depth):
+        d = {'level': d, 'value%d' % i: i}
+    return d
+
+
+def list_heavy_document(nb_elements: int = 200) -> Dict:
+    return {
+        'id': 1,
+        'items': [{'sku': i, 'tags': ['a', 'b', 'c'], 'price': {'amount': i, 'currency': 'EUR'}} for i in range(nb_elements)],
+    }
+
+
+def recursive_flat(d: Dict, snakecase_fieldnames: bool = False) -> Dict:
+    options: Dict[str, Any] = {
+        'snakecase_fieldnames': snakecase_fieldnames,
+        'use_nested': True,
+        'rename_values': {},
+        'rename_list': {},
+        'filter_values': {},
+        'drop_values': [],
+        'drop_objects': [],
+        'id_generator': CounterIdGenerator(),
+    }
+    flatten_dict: Dict = {}
+    reference_flat(d, flatten_dict, options, flat_dict_key='root')
+    return flatten_dict
+
+
+if __name__ == '__main__':
+    number: int = 200
+    for name, d in (('wide', wide_document()), ('deep', deep_document()), ('list-heavy', list_heavy_document())):
+        plan: FlatPlan = FlatPlan('root', id_generator='counter')
+        snakecase_plan: FlatPlan = FlatPlan('root', snakecase_fieldnames=True, id_generator='counter')
+        for label, fct in (
+            ('recursive', lambda: recursive_flat(d)),
+            ('flat()', lambda: flat(d, 'root', id_generator='counter')),
+            ('FlatPlan.flat()', lambda: plan.flat(d)),
+            ('recursive snakecase', lambda: recursive_flat(d, snakecase_fieldnames=True)),
+            ('flat() snakecase', lambda: flat(d, 'root', snakecase_fieldnames=True, id_generator='counter')),
+            ('FlatPlan snakecase', lambda: snakecase_plan.flat(d)),
+        ):
+            seconds: float = min(timeit.repeat(fct, number=number, repeat=3))
+            print("%-11s %-19s %9.1f us/document" % (name, label, seconds * 1e6 / number))
@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+
+"""Benchmark: flattening a large list of nested documents with 1..N processes
+
+Run with: PYTHONPATH=. python benchmarks/bench_flat_workers.py [nb_documents]
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List
+
+from tools.depthdict.csv import flat_dicts
+from tools.dictflat import flat_list
+
+
+def build_documents(nb: int) -> List[Dict]:
+    return [
+        {
+            'id': i,
+            'name': 'name %d' % i,
+            'address': {'street': '%d Main St' % i, 'city': 'Anytown', 'state': 'CA'},
+            'phones': [{'type': 'home', 'number': '555-%04d' % i}, {'type': 'work', 'number': '555-0000'}],
+        }
+        for i in range(nb)
+    ]
+
+
+if __name__ == '__main__':
+    nb_documents: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    documents: List[Dict] = build_documents(nb_documents)
+    max_workers: int = os.cpu_count() or 1
+    all_workers: List[int] = sorted({1, 2, 4, max_workers})
+    for name, fct in (
+        ('depthdict.csv.flat_dicts', lambda w: flat_dicts(documents, 'person', workers=w)),
+        ('dictflat.flat_list', lambda w: flat_list(documents, 'person', workers=w)),
+    ):
+        reference: float = 0.0
+        for workers in all_workers:
+            start: float = time.perf_counter()
+            fct(workers)
+            seconds: float = time.perf_counter() - start
+            if workers == 1:
+                reference = seconds
+            print("%-26s workers=%-3d %7.3f s (speedup x%.2f)" % (name, workers, seconds, reference / seconds))
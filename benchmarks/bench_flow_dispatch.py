@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+
+"""Benchmark: Flow per data overhead, compiled dispatch plan against the previous per call dispatch
+
+The previous dispatch is reproduced below: context lookup in flow_functions_dict and keyword arguments call
+for each filter, and a modulo test of every modulo number for each data.
+
+Run with: PYTHONPATH=. python benchmarks/bench_flow_dispatch.py [nb_data]
+"""
+
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from tools.flow import Flow, FlowSkipData
+
+
+def legacy_filter_data(flow: Flow, fct_idx: int, all_data: Iterable) -> tuple:
+    nb_filters: int = len(flow.functions_filter)
+    nb_data_total = nb_data_processed = nb_data_skip = nb_data_stopped_with_none = 0
+    for data in all_data:
+        nb_data_total += 1
+        fct_idx_tmp: int = fct_idx
+        try:
+            for index, fct in enumerate(flow.functions_filter, start=1):
+                fct_idx_tmp += 1
+                if flow.flow_functions_dict[fct_idx_tmp]:
+                    data = fct(data=data, context=flow.context)
+                else:
+                    data = fct(data=data)
+                if data is None and not flow.continue_if_none and (not flow.ignore_last_filter_return or index != nb_filters):
+                    nb_data_stopped_with_none += 1
+                    break
+            else:
+                nb_data_processed += 1
+        except FlowSkipData:
+            nb_data_skip += 1
+        for modulo_n in flow.functions_modulo:
+            if nb_data_total % modulo_n == 0:
+                for idx_fct, fct in enumerate(flow.functions_modulo[modulo_n], start=1):
+                    if flow.modulo_functions_dict[modulo_n, idx_fct]:
+                        fct(idx=nb_data_total, context=flow.context)
+                    else:
+                        fct(idx=nb_data_total)
+        if flow.log_modulo and nb_data_total % flow.log_modulo == 0:
+            pass
+    return nb_data_total, nb_data_processed, nb_data_skip, nb_data_stopped_with_none
+
+
+def identity(data: Any) -> Any:
+    return data
+
+
+def with_context(data: Any, context: Dict) -> Any:
+    return data
+
+
+def keyword_order(context: Dict, data: Any) -> Any:
+    return data
+
+
+def on_modulo(idx: int) -> None:
+    pass
+
+
+def new_flow(nb_data: int, filters: list) -> Flow:
+    return Flow(fct_init=lambda: None,
+                fct_load=lambda: range(nb_data),
+                fct_filter=filters,
+                fct_modulo={1000: on_modulo, 7777: on_modulo, 100000: on_modulo},
+                log_modulo=100000)
+
+
+def best_of(fct: Callable[[], Any], repeat: int = 3) -> float:
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        fct()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    nb_data: int = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    for name, filters in (('3 filters', [identity, with_context, identity]),
+                          ('keyword order', [keyword_order, identity])):
+        legacy_flow: Flow = new_flow(nb_data, filters)
+        legacy_flow._build_function_dicts()
+        # Index of the load function: one init function, then the load function
+        legacy: float = best_of(lambda: legacy_filter_data(legacy_flow, 2, range(nb_data)))
+        compiled: float = best_of(lambda: new_flow(nb_data, filters).run())
+        baseline: float = best_of(lambda: [data for data in range(nb_data)])
+        print("%-14s per call dispatch %6.0f ns/data, compiled plan %6.0f ns/data (loop alone %3.0f ns/data), x%.2f" % (
+            name,
+            legacy * 1e9 / nb_data,
+            compiled * 1e9 / nb_data,
+            baseline * 1e9 / nb_data,
+            legacy / compiled))
@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+
+"""Benchmark: installed JSON backends (tools.jsonbackend) on nested records and flattened rows
+
+Run with: PYTHONPATH=. python benchmarks/bench_json_backends.py [nb_records]
+"""
+
+import sys
+import time
+from typing import Any, Dict, List
+
+from tools.depthdict import depthdict
+from tools.jsonbackend import available_json_backends, get_json_backend
+
+
+def nested_record(i: int) -> Dict[str, Any]:
+    return {
+        'id': i,
+        'name': 'name %d' % i,
+        'address': {'street': '%d Main St' % i, 'city': 'Anytown', 'zip': '12345'},
+        'scores': [i / 3, i / 7, None],
+        'orders': [{'product': 'p%d' % j, 'qty': j, 'price': j * 1.25} for j in range(3)],
+    }
+
+
+if __name__ == '__main__':
+    nb_records: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    nested: List[Dict[str, Any]] = [nested_record(i) for i in range(nb_records)]
+    rows: List[Dict[str, Any]] = []
+    for record in nested:
+        # depthdict.flat does not handle lists of scalars
+        rows.extend(depthdict({k: v for k, v in record.items() if k != 'scores'}).flat(fd_key='root')['orders'])
+    for shape, records in (('nested', nested), ('rows', rows)):
+        for name in available_json_backends():
+            for compat in ((True,) if name == 'json' else (True, False)):
+                backend = get_json_backend(name, compat=compat)
+                start: float = time.perf_counter()
+                lines: List[str] = [backend.dumps(record) for record in records]
+                dumps_duration: float = time.perf_counter() - start
+                start = time.perf_counter()
+                for line in lines:
+                    backend.loads(line)
+                loads_duration: float = time.perf_counter() - start
+                print("%-6s %-8s %-6s dumps %7.3f s  loads %7.3f s" % (shape, name, 'compat' if compat else 'fast',
+                                                                       dumps_duration, loads_duration))
@@ -0,0 +1,59 @@
+import gc
+import os
+from io import TextIOWrapper
+from typing import Dict, Iterator
+from zipfile import ZipFile
+
+from tools.depthdict import csv
+
+
+def records() -> Iterator[Dict]:
+    yield {'a': 1, 'list': [{'x': 1}]}
+    yield {'a': 2, 'b': {'c': 'late column'}, 'list': [{'x': 2, 'y': 'late'}, {'y': 'y only'}]}
+
+
+def test_stream_same_as_in_memory() -> None:
+    dir_name: str = './tmp/stream'
+    csv_files = csv.create_csv_files_from_dict_iter(records(), 'root', dir_name)
+    assert csv_files['root']['nb_records'] == 2
+    assert csv_files['list']['nb_records'] == 3
+
+    in_memory = csv.create_csv_files_from_dict_list(list(records()), 'root')
+    for type_name in ('root', 'list'):
+        with open(os.path.join(dir_name, '%s.csv' % type_name), newline='') as f:
+            content: str = f.read()
+        # Ids are random: compare header and non id columns
+        expected_lines = in_memory[type_name]['content'].splitlines()
+        lines = content.splitlines()
+        assert lines[0] == expected_lines[0]
+        assert len(lines) == len(expected_lines)
+        assert [line.count(',') for line in lines] == [line.count(',') for line in expected_lines]
+
+
+def test_stream_to_zip() -> None:
+    zip_name: str = './tmp/stream.zip'
+    with ZipFile(zip_name, mode='w') as zip_file:
+        csv.create_csv_files_from_dict_iter(records(), 'root', zip_file, internal_dir_name='dirname')
+    with ZipFile(zip_name) as zip_file:
+        assert sorted(zip_file.namelist()) == ['dirname/list.csv', 'dirname/root.csv']
+        header: str = zip_file.read('dirname/root.csv').decode('utf-8').splitlines()[0]
+        assert header == '__id,a,b.c'
+
+
+def test_stream_spill_files() -> None:
+    dir_name: str = './tmp/stream_utf8'
+    csv.create_csv_files_from_dict_iter([{'a': 'é€', 'list': [{'x': '✓'}]}], 'root', dir_name)
+    with open(os.path.join(dir_name, 'root.csv'), encoding='utf-8', newline='') as f:
+        assert f.read().splitlines()[1].endswith(',é€')
+
+    def failing_records() -> Iterator[Dict]:
+        yield from records()
+        raise ValueError('loader error')
+
+    try:
+        csv.create_csv_files_from_dict_iter(failing_records(), 'root', './tmp/stream_failure')
+        assert False
+    except ValueError:
+        # Spill files are closed even if the records iterator fails
+        assert not [f for f in gc.get_objects()
+                    if isinstance(f, TextIOWrapper) and not f.closed and str(f.name).endswith(os.sep + '0.csv')]
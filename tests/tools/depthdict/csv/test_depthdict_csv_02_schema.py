@@ -0,0 +1,51 @@
+from tools.depthdict import csv
+from tools.depthdict.schema import SchemaCollector, order_appearance
+
+records = [
+    {'b': 1, 'a': None, 'list': [{'x': 1}]},
+    {'b': 'two', 'c': {'d': 2.5}},
+]
+
+
+def test_schema_field_lists() -> None:
+    schema = SchemaCollector()
+    records_dict = csv.flat_dicts(records, 'root', schema=schema)
+    assert schema.field_lists() == csv.build_field_lists(records_dict)
+    assert schema.nb_records == {'root': 2, 'list': 1}
+
+
+def test_schema_appearance_order() -> None:
+    schema = SchemaCollector(order=order_appearance)
+    csv.flat_dicts(records, 'root', schema=schema)
+    assert schema.field_names('root') == ['__id', 'b', 'a', 'c.d']
+
+
+def test_schema_stats() -> None:
+    schema = SchemaCollector()
+    csv.flat_dicts(records, 'root', schema=schema)
+    assert schema.column_stats('root', 'b') == {'nb_values': 2, 'nb_nulls': 0, 'nb_missing': 0, 'types': {'int': 1, 'str': 1}}
+    assert schema.column_stats('root', 'a') == {'nb_values': 0, 'nb_nulls': 1, 'nb_missing': 1, 'types': {}}
+
+
+def test_schema_save_load_reuse() -> None:
+    schema = SchemaCollector()
+    csv_files = csv.create_csv_files_from_dict_list(records, 'root', schema=schema)
+    schema.save('./tmp/schema.json')
+
+    loaded = SchemaCollector.load('./tmp/schema.json')
+    assert loaded.frozen
+    assert loaded.field_lists() == schema.field_lists()
+    csv_files_again = csv.create_csv_files_from_dict_list(records, 'root', schema=loaded)
+    assert loaded.nb_records == {'root': 2, 'list': 1}
+    for type_name in csv_files:
+        assert csv_files[type_name]['content'].splitlines()[0] == csv_files_again[type_name]['content'].splitlines()[0]
+
+
+def test_schema_merge() -> None:
+    schema_1 = SchemaCollector()
+    csv.flat_dicts(records[:1], 'root', schema=schema_1)
+    schema_2 = SchemaCollector()
+    csv.flat_dicts(records[1:], 'root', schema=schema_2)
+    schema = SchemaCollector()
+    csv.flat_dicts(records, 'root', schema=schema)
+    assert schema_1.merge(schema_2).to_dict() == schema.to_dict()
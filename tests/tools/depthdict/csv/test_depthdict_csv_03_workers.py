@@ -0,0 +1,25 @@
+from tools.depthdict import csv
+from tools.depthdict.schema import SchemaCollector
+
+records = [{'a': i, 'list': [{'x': i}, {'y': i}]} for i in range(10)]
+
+
+def strip_ids(fd):
+    return {k: [{f: v for f, v in r.items() if not f.startswith('__')} for r in rows] for k, rows in fd.items()}
+
+
+def test_flat_dicts_workers_same_result() -> None:
+    schema_1 = SchemaCollector()
+    fd_1 = csv.flat_dicts(records, 'root', schema=schema_1)
+    schema_3 = SchemaCollector()
+    fd_3 = csv.flat_dicts(records, 'root', schema=schema_3, workers=3)
+    assert list(fd_1) == list(fd_3)
+    assert strip_ids(fd_1) == strip_ids(fd_3)
+    assert schema_1.to_dict() == schema_3.to_dict()
+
+
+def test_flat_dicts_workers_refs() -> None:
+    fd = csv.flat_dicts(records, 'root', workers=4)
+    ids = {r['__id']: r['a'] for r in fd['root']}
+    for r in fd['list']:
+        assert ids[r['__ref__root']] == r.get('x', r.get('y'))
@@ -0,0 +1,57 @@
+import sys
+from zipfile import ZipFile
+
+from tools.depthdict import csv
+from tools.dictflat import flat
+
+records = [
+    {'a': 1, 'b': {'c': 'x', 'd': {'e': 2}}, 'list': [{'x': 1, 'sub': [{'s': 1}]}, {'x': 2}]},
+    {'a': 2, 'other': [{'y': 'y'}]},
+    {'a': 3},
+]
+
+
+def test_unflat_round_trip() -> None:
+    fd = csv.flat_dicts(records, 'root')
+    assert list(csv.unflat_dicts(fd, 'root')) == records
+
+
+def test_unflat_keep_ids() -> None:
+    fd = csv.flat_dicts(records, 'root', id_generator='counter')
+    d = next(csv.unflat_dicts(fd, 'root', keep_ids=True))
+    assert d['__id'] == '1'
+    assert d['list'][0]['__ref__root'] == '1'
+
+
+def test_unflat_from_zip() -> None:
+    csv_files = csv.create_csv_files_from_dict_list(records, 'root')
+    zip_name: str = './tmp/unflat.zip'
+    with open(zip_name, mode='bw') as zip_file:
+        zip_file.write(csv.create_zip_files(csv_files, internal_dir_name='dirname'))
+    with ZipFile(zip_name) as zip_file:
+        records_dict = csv.read_csv_files(zip_file, internal_dir_name='dirname')
+    docs = list(csv.unflat_dicts(records_dict, 'root', skip_empty_values=True))
+    assert docs[0] == {'a': '1', 'b': {'c': 'x', 'd': {'e': '2'}}, 'list': [{'x': '1', 'sub': [{'s': '1'}]}, {'x': '2'}]}
+    assert docs[1] == {'a': '2', 'other': [{'y': 'y'}]}
+    assert docs[2] == {'a': '3'}
+
+
+def test_unflat_from_directory() -> None:
+    csv.create_csv_files_from_dict_iter(iter(records), 'root', './tmp/unflat')
+    docs = list(csv.unflat_dicts(csv.read_csv_files('./tmp/unflat'), 'root', skip_empty_values=True))
+    assert [d['a'] for d in docs] == ['1', '2', '3']
+
+
+def test_unflat_deeper_than_recursion_limit() -> None:
+    depth: int = sys.getrecursionlimit() * 2
+    d = {'leaf': 1}
+    for i in range(depth):
+        d = {'i': i, 'l': [d]}
+    fd = flat(d, 'root', id_generator='counter')
+    assert len(fd['l']) == depth
+    (u,) = list(csv.unflat_dicts(fd, 'root'))
+    # Compared level by level (== is recursive)
+    for i in reversed(range(depth)):
+        assert (u['i'], len(u['l'])) == (i, 1)
+        u = u['l'][0]
+    assert u == {'leaf': 1}
@@ -0,0 +1,16 @@
+from tools.depthdict import csv
+
+records = [{'a': i, 'list': [{'x': j} for j in range(i)], 'other': [{'y': i}]} for i in range(20)]
+
+
+def test_create_csv_files_parallel() -> None:
+    records_dict = csv.flat_dicts(records, 'root')
+    fieldnames_dict = csv.build_field_lists(records_dict)
+    sequential = csv.create_csv_files(fieldnames_dict, records_dict)
+    for executor in ('thread', 'process'):
+        parallel = csv.create_csv_files(fieldnames_dict, records_dict, workers=2, executor=executor)
+        assert list(parallel) == list(sequential)
+        for type_name in sequential:
+            assert parallel[type_name]['content'] == sequential[type_name]['content']
+            assert parallel[type_name]['file_name'] == sequential[type_name]['file_name']
+            assert parallel[type_name]['duration'] >= 0.0
@@ -0,0 +1,25 @@
+import csv as std_csv
+from io import StringIO
+
+from tools.depthdict import csv
+
+
+def dict_writer_content(fieldnames, records) -> str:
+    f = StringIO()
+    writer = std_csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+    return f.getvalue()
+
+
+def test_fast_writer_same_as_dict_writer() -> None:
+    records = [{'a': 1, 'b': None, 'extra': 'x'}, {'a': 'with,comma'}, {'b': 'multi\nline', 'a': 2.5}] * 700
+    for fieldnames in (['a', 'b'], ['b'], []):
+        assert csv.create_csv_file_from_list(fieldnames, records) == dict_writer_content(fieldnames, records)
+
+
+def test_write_csv_records_count() -> None:
+    f = StringIO()
+    assert csv.write_csv_records(std_csv.writer(f), ['a'], iter([{'a': 1}] * 5), batch_size=2) == 5
+    assert f.getvalue() == '1\r\n' * 5
@@ -0,0 +1,62 @@
+from io import BytesIO, StringIO
+from zipfile import ZIP_DEFLATED, ZIP_LZMA, ZipFile
+
+from tools.depthdict import csv
+
+
+class Unseekable():
+    def __init__(self) -> None:
+        self.buffer = BytesIO()
+
+    def write(self, b: bytes) -> int:
+        return self.buffer.write(b)
+
+    def flush(self) -> None:
+        pass
+
+
+def files():
+    return {
+        'a': {'file_name': 'a.csv', 'content': 'x,y\r\n' * 1000},
+        'b': {'file_name': 'b.csv', 'content': StringIO('z\r\n' * 1000)},
+        'c': {'file_name': 'c.csv', 'content': (('%d\r\n' % i) for i in range(1000))},
+        'd': {'file_name': 'd.bin', 'content': b'\x00' * 100},
+    }
+
+
+def expected():
+    return {
+        'dir/a.csv': ('x,y\r\n' * 1000).encode(),
+        'dir/b.csv': ('z\r\n' * 1000).encode(),
+        'dir/c.csv': ''.join('%d\r\n' % i for i in range(1000)).encode(),
+        'dir/d.bin': b'\x00' * 100,
+    }
+
+
+def check(zip_source) -> None:
+    with ZipFile(zip_source) as zip_file:
+        assert zip_file.testzip() is None
+        assert {name: zip_file.read(name) for name in zip_file.namelist()} == expected()
+        assert zip_file.namelist() == list(expected())
+
+
+def test_write_zip_file() -> None:
+    for compression in (ZIP_DEFLATED, ZIP_LZMA):
+        zip_name: str = './tmp/stream_%d.zip' % (compression)
+        csv.write_zip_file(zip_name, files(), internal_dir_name='dir', compression=compression)
+        check(zip_name)
+
+
+def test_write_zip_file_unseekable() -> None:
+    sink = Unseekable()
+    csv.write_zip_file(sink, files(), internal_dir_name='dir', compresslevel=9)
+    check(BytesIO(sink.buffer.getvalue()))
+
+
+def test_create_zip_files_compressed() -> None:
+    csv_files = {'a': {'file_name': 'a.csv', 'content': 'x,y\r\n' * 1000}}
+    stored = csv.create_zip_files(csv_files)
+    deflated = csv.create_zip_files(csv_files, compression=ZIP_DEFLATED)
+    assert len(deflated) < len(stored)
+    with ZipFile(BytesIO(deflated)) as zip_file:
+        assert zip_file.read('a.csv') == b'x,y\r\n' * 1000
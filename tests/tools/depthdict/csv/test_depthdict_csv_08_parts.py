@@ -0,0 +1,70 @@
+import os
+from io import BytesIO
+from typing import Dict, Iterator
+from zipfile import ZipFile
+
+from tools.depthdict import csv
+
+
+def records() -> Iterator[Dict]:
+    for i in range(25):
+        yield {'name': 'n%d' % i, 'list': [{'x': i, 'y': 'é' * i}, {'x': -i}]}
+
+
+def test_split_by_rows() -> None:
+    csv_files = csv.create_csv_files_from_dict_list(list(records()), 'root', max_rows=10)
+    parts = csv_files['root']['parts']
+    assert [part['file_name'] for part in parts] == ['root.part-0001.csv', 'root.part-0002.csv', 'root.part-0003.csv']
+    headers = {part['content'].splitlines()[0] for part in parts}
+    assert headers == {'__id,name'}
+    assert [len(part['content'].splitlines()) for part in parts] == [11, 11, 6]
+    assert len(csv_files['list']['parts']) == 5
+
+
+def test_split_by_bytes() -> None:
+    csv_files = csv.create_csv_files_from_dict_list(list(records()), 'root', max_bytes=300)
+    parts = csv_files['list']['parts']
+    assert len(parts) > 1
+    for part in parts[:-1]:
+        lines = part['content'].encode('utf-8').splitlines(keepends=True)
+        # The part is closed by the row crossing the limit
+        assert len(b''.join(lines[:-1])) < 300 <= len(part['content'].encode('utf-8'))
+    assert sum(len(part['content'].splitlines()) - 1 for part in parts) == 50
+
+
+def test_empty_table_has_one_part() -> None:
+    csv_files = csv.create_csv_files({'t': ['a']}, {'t': []}, max_rows=5)
+    assert csv_files['t']['parts'] == [{'content': 'a\r\n', 'file_name': 't.part-0001.csv'}]
+
+
+def test_parts_round_trip_zip() -> None:
+    csv_files = csv.create_csv_files_from_dict_list(list(records()), 'root', max_rows=7, workers=None)
+    zip_content: bytes = csv.create_zip_files(csv_files, internal_dir_name='dir')
+    with ZipFile(BytesIO(zip_content)) as zip_file:
+        assert 'dir/list.part-0008.csv' in zip_file.namelist()
+    records_dict = csv.read_csv_files(ZipFile(BytesIO(zip_content)), internal_dir_name='dir')
+    assert [record['name'] for record in records_dict['root']] == ['n%d' % i for i in range(25)]
+    rebuilt = list(csv.unflat_dicts(records_dict, 'root', skip_empty_values=True))
+    assert rebuilt[3] == {'name': 'n3', 'list': [{'x': '3', 'y': 'ééé'}, {'x': '-3'}]}
+
+
+def test_stream_parts_to_dir() -> None:
+    dir_name: str = './tmp/stream_parts'
+    for file_name in os.listdir(dir_name) if os.path.isdir(dir_name) else []:
+        os.remove(os.path.join(dir_name, file_name))
+    csv_files = csv.create_csv_files_from_dict_iter(records(), 'root', dir_name, max_rows=10)
+    assert csv_files['root']['file_names'] == [os.path.join(dir_name, 'root.part-%04d.csv' % i) for i in (1, 2, 3)]
+    assert csv_files['list']['nb_records'] == 50
+    records_dict = csv.read_csv_files(dir_name)
+    assert len(records_dict['root']) == 25
+    assert len(records_dict['list']) == 50
+    assert [record['name'] for record in records_dict['root']] == ['n%d' % i for i in range(25)]
+
+
+def test_stream_parts_to_zip() -> None:
+    zip_name: str = './tmp/stream_parts.zip'
+    with ZipFile(zip_name, mode='w') as zip_file:
+        csv_files = csv.create_csv_files_from_dict_iter(records(), 'root', zip_file, internal_dir_name='d', max_bytes=200)
+    assert len(csv_files['list']['file_names']) > 1
+    records_dict = csv.read_csv_files(zip_name, internal_dir_name='d')
+    assert len(records_dict['list']) == 50
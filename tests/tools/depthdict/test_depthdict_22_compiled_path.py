@@ -0,0 +1,35 @@
+from tools.depthdict import compile_path, compile_path_cache_info, depthdict
+
+
+def test_01_compiled_get() -> None:
+    p = compile_path('a.b[1].c')
+    d = {'a': {'b': [{'c': 0}, {'c': 1}]}}
+    assert p.get(d) == 1
+    assert p.get({'a': {'b': [{'c': 0}]}}, 'default') == 'default'
+
+
+def test_02_compiled_exists() -> None:
+    p = compile_path(['a', 'b[-1]'])
+    assert p.exists({'a': {'b': [None]}})
+    assert not p.exists({'a': {'b': []}})
+    assert not p.exists({'a': {'b': 'not a list'}})
+
+
+def test_03_compiled_set() -> None:
+    d = depthdict({})
+    compile_path('a/b', s='/').set(d, 'letter b')
+    compile_path('a/c', s='/').set(d, 'one', add_in_list=True)
+    assert d == {'a': {'b': 'letter b', 'c': ['one']}}
+
+
+def test_04_compiled_cached() -> None:
+    assert compile_path('x.y[0]') is compile_path('x.y[0]')
+    assert compile_path(['x', 'y[0]']) is compile_path(['x', 'y[0]'])
+    assert compile_path_cache_info().hits > 0
+
+
+def test_05_get_depth_uses_compiled() -> None:
+    d = depthdict({'a': {'b': [{'x': 1}]}})
+    assert d.get_depth('a.b[0].x') == compile_path('a.b[0].x').get(d)
+    assert d.exists_depth('a.b[0].x')
+    assert not d.exists_depth('a.b[1].x')
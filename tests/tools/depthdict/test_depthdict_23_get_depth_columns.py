@@ -0,0 +1,27 @@
+from array import array
+
+from tools.depthdict import depthdict, get_depth_columns
+
+records = [
+    {'a': {'b': 1, 'c': [{'x': 1.5}, {'x': 2.5}]}, 'n': 'one'},
+    {'a': {'b': 2, 'c': [{'x': 3.5}]}, 'n': 'two'},
+    {'a': {'b': 3}},
+]
+paths = ['a.b', 'a.c[0].x', 'a.c[1].x', ['n'], 'unknown.path']
+
+
+def test_01_columns_like_get_depth() -> None:
+    columns = get_depth_columns(records, paths, d='-')
+    for column, f in zip(columns, paths):
+        assert column == [depthdict(r).get_depth(f, d='-') for r in records]
+
+
+def test_02_columns_as_array() -> None:
+    columns = get_depth_columns(records[:2], ['a.b', 'a.c[0].x', 'n'], as_array=True)
+    assert columns[0] == array('q', [1, 2])
+    assert columns[1] == array('d', [1.5, 3.5])
+    assert columns[2] == ['one', 'two']
+
+
+def test_03_no_records() -> None:
+    assert get_depth_columns([], ['a', 'b']) == [[], []]
@@ -0,0 +1,87 @@
+from tools import dictflat
+from tools.depthdict import depthdict
+from tools.depthdict.csv import flat_dicts
+from tools.recordid import CounterIdGenerator, KeyPathIdGenerator
+
+records = [
+    {'id': 'A', 'v': 1, 'list': [{'x': 1}, {'x': 2}]},
+    {'id': 'B', 'v': 2, 'list': [{'x': 3}]},
+]
+
+
+def test_flat_counter_ids() -> None:
+    fd = flat_dicts(records, 'root', id_generator='counter')
+    assert [r['__id'] for r in fd['root']] == ['1', '4']
+    assert [(r['__id'], r['__ref__root']) for r in fd['list']] == [('2', '1'), ('3', '1'), ('5', '4')]
+
+
+def test_flat_counter_shared_between_calls() -> None:
+    fd = {}
+    id_generator = CounterIdGenerator()
+    depthdict(records[0]).flat('root', fd=fd, id_generator=id_generator)
+    depthdict(records[1]).flat('root', fd=fd, id_generator=id_generator)
+    ids = [r['__id'] for rows in fd.values() for r in rows]
+    assert len(ids) == len(set(ids))
+
+
+def test_flat_hash_ids_reproducible() -> None:
+    fd_1 = flat_dicts(records, 'root', id_generator='hash')
+    fd_2 = flat_dicts(records, 'root', id_generator='hash')
+    assert fd_1 == fd_2
+    assert len({r['__id'] for r in fd_1['list']}) == 3
+
+
+def test_flat_key_path_ids() -> None:
+    fd = flat_dicts(records, 'root', id_generator=KeyPathIdGenerator('id'))
+    assert [r['__id'] for r in fd['root']] == ['A', 'B']
+    assert [r['__id'] for r in fd['list']] == ['A/list/0', 'A/list/1', 'B/list/0']
+    assert [r['__ref__root'] for r in fd['list']] == ['A', 'A', 'B']
+
+
+def test_flat_counter_ids_workers() -> None:
+    fd = flat_dicts(records, 'root', id_generator='counter', workers=2)
+    ids = [r['__id'] for rows in fd.values() for r in rows]
+    assert len(ids) == len(set(ids))
+    root_ids = {r['__id'] for r in fd['root']}
+    assert all(r['__ref__root'] in root_ids for r in fd['list'])
+
+
+def test_counter_shard_keeps_start() -> None:
+    shard = CounterIdGenerator(start=100, prefix='r').shard(2)
+    assert [shard('root', {}, None, None), shard('root', {}, None, None)] == ['r2.100', 'r2.101']
+
+
+def test_flat_key_path_ids_same_named_lists() -> None:
+    record = {'id': 'A', 'a': {'list': [{'x': 1}]}, 'b': {'list': [{'x': 2}]}}
+    fd = flat_dicts([record], 'root', id_generator='key:id')
+    assert [r['__id'] for r in fd['list']] == ['A/a.list/0', 'A/b.list/0']
+    fd = dictflat.flat(record, 'root', id_generator='key:id')
+    ids = [r['__id'] for r in fd['list']]
+    assert len(ids) == len(set(ids)) == 2
+
+
+def test_flat_hash_ids_identical_documents() -> None:
+    fd = flat_dicts([records[0], records[0]], 'root', id_generator='hash')
+    ids = [r['__id'] for rows in fd.values() for r in rows]
+    assert len(ids) == len(set(ids)) == 6
+    fd = flat_dicts([records[0], records[0]], 'root', id_generator='hash', workers=2)
+    ids = [r['__id'] for rows in fd.values() for r in rows]
+    assert len(ids) == len(set(ids)) == 6
+
+
+def test_flat_hash_ids_deep_document() -> None:
+    record = {'id': 'A'}
+    d = record
+    for _ in range(5000):
+        d['sub'] = {'v': 1}
+        d = d['sub']
+    fd = dictflat.flat(record, 'root', id_generator='hash')
+    assert len(fd['root']) == 1
+
+
+def test_flat_id_generator_without_key_path() -> None:
+    def table_id(table, d, ref_value, index):
+        return '%s-%s-%s' % (table, ref_value, index)
+
+    fd = flat_dicts(records[:1], 'root', id_generator=table_id)
+    assert [r['__id'] for r in fd['list']] == ['list-root-None-None-0', 'list-root-None-None-1']
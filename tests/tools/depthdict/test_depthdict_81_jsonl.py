@@ -0,0 +1,14 @@
+from tools.depthdict import depthdict
+from tools.dictio import JsonlWriter
+
+
+def test_jsonl_write_read() -> None:
+    path: str = "./tmp/depthdict.jsonl"
+    with JsonlWriter(path, mode='w', batch_size=2) as writer:
+        for i in range(5):
+            depthdict({'a': {'b': i}}) >> writer
+    records = depthdict.iter_jsonl(path)
+    first = next(records)
+    assert isinstance(first, depthdict)
+    assert first.get_depth('a.b') == 0
+    assert [record.get_depth('a.b') for record in records] == [1, 2, 3, 4]
@@ -0,0 +1,67 @@
+import sys
+from typing import Dict
+
+from tools.dictflat import FlatPlan, flat, flat_list
+
+
+def test_flat_nested_and_lists() -> None:
+    d: Dict = {
+        'name': 'John',
+        'address': {'city': 'Anytown'},
+        'phones': [{'number': '1'}, {'number': '2'}],
+        'tags': ['a', 'b'],
+    }
+    fd = flat(d, 'person', id_generator='counter')
+    assert fd == {
+        'person': [{'__id': '1', 'name': 'John', 'address.city': 'Anytown'}],
+        'phones': [
+            {'__id': '2', '__ref__person': '1', 'number': '1'},
+            {'__id': '3', '__ref__person': '1', 'number': '2'},
+        ],
+        'tags': [
+            {'__id': '4', '__ref__person': '1', 'tags': 'a'},
+            {'__id': '5', '__ref__person': '1', 'tags': 'b'},
+        ],
+    }
+
+
+def test_flat_deeper_than_recursion_limit() -> None:
+    depth: int = sys.getrecursionlimit() * 2
+    d: Dict = {'leaf': 1}
+    for _ in range(depth):
+        d = {'n': d}
+    fd = flat(d, 'root')
+    assert list(fd['root'][0].keys()) == ['__id', '.'.join(['n'] * depth + ['leaf'])]
+
+    d = {'leaf': 1}
+    for _ in range(depth):
+        d = {'l': [d]}
+    fd = flat(d, 'root')
+    assert len(fd['l']) == depth
+
+
+def test_flat_plan_reused() -> None:
+    plan = FlatPlan('root', snakecase_fieldnames=True, id_generator='counter')
+    fd = {}
+    plan.flat({'firstName': 'A'}, fd)
+    plan.flat({'firstName': 'B'}, fd)
+    assert fd == flat_list([{'firstName': 'A'}, {'firstName': 'B'}], 'root', snakecase_fieldnames=True, id_generator='counter')
+
+
+def test_flat_plan_rules_and_stream() -> None:
+    plan = FlatPlan('root',
+                    snakecase_fieldnames=True,
+                    rename_values={'address.zip_code': 'zip'},
+                    drop_values=['secret'],
+                    drop_objects=['internal'],
+                    filter_values={'age': lambda fieldname, value: int(value)},
+                    id_generator='counter')
+    records = [
+        {'firstName': 'A', 'age': '30', 'secret': 'x', 'internal': {'a': 1}, 'address': {'zipCode': '1'}},
+        {'firstName': 'B', 'age': '40', 'address': {'zipCode': '2'}},
+    ]
+    results = list(plan.flat_stream(records))
+    assert results == [
+        {'root': [{'__id': '1', 'first_name': 'A', 'age': 30, 'zip': '1'}]},
+        {'root': [{'__id': '2', 'first_name': 'B', 'age': 40, 'zip': '2'}]},
+    ]
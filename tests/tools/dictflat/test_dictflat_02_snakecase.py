@@ -0,0 +1,19 @@
+from tools.dictflat import str_2_snakecase, str_2_snakecase_cache_info, str_2_snakecase_cached
+
+
+def test_snakecase() -> None:
+    assert str_2_snakecase('firstName') == 'first_name'
+    assert str_2_snakecase('FirstName') == 'first_name'
+    assert str_2_snakecase('first__name') == 'first_name'
+    assert str_2_snakecase('first_Name') == 'first_name'
+    assert str_2_snakecase('already_snake') == 'already_snake'
+    assert str_2_snakecase('x1') == 'x1'
+
+
+def test_snakecase_cached() -> None:
+    before = str_2_snakecase_cache_info()
+    assert str_2_snakecase_cached('someFieldName') == 'some_field_name'
+    assert str_2_snakecase_cached('someFieldName') == 'some_field_name'
+    after = str_2_snakecase_cache_info()
+    assert after.hits >= before.hits + 1
+    assert after.currsize <= after.maxsize
@@ -0,0 +1,31 @@
+from tools.dictflat import flat_columns, flat_list
+
+records = [
+    {'a': 1, 'list': [{'x': 1}, {'y': 'late'}]},
+    {'a': 2, 'b': None},
+    {'b': 'b3'},
+]
+
+
+def test_flat_columns() -> None:
+    tables = flat_columns(records, 'root', id_generator='counter')
+    root = tables['root']
+    assert root.nb_rows == 3
+    assert root.field_names() == ['__id', 'a', 'b']
+    assert root.column('a') == [1, 2, None]
+    assert root.column('b') == [None, None, 'b3']
+    assert root.presence_mask('b') == bytearray([0, 1, 1])
+    assert tables['list'].column('y') == [None, 'late']
+
+
+def test_flat_columns_to_records() -> None:
+    tables = flat_columns(records, 'root', id_generator='counter')
+    fd = flat_list(records, 'root', id_generator='counter')
+    assert {key: list(table.to_records()) for key, table in tables.items()} == fd
+
+
+def test_flat_columns_same_table_name() -> None:
+    nested = [{'a': 1, 'root': [{'x': 1}, {'x': 2}], 'b': 2}, {'root': {'c': 3}}]
+    tables = flat_columns(nested, 'root', id_generator='counter')
+    fd = flat_list(nested, 'root', id_generator='counter')
+    assert {key: list(table.to_records()) for key, table in tables.items()} == fd
@@ -0,0 +1,103 @@
+import random
+from typing import Any, Dict, List
+
+from tools.dictflat import flat, flat_list, str_2_snakecase
+from tools.recordid import CounterIdGenerator
+
+KEYS: List[str] = ['id', 'firstName', 'city', 'items', 'subObject', 'tags', 'value']
+
+
+def reference_flat(d: Dict, flatten_dict: Dict, options: Dict, flat_dict_key: str = '', fieldname_prefix: str = '',
+                   current_dict: Dict = None, ref_name: str = None, ref_value: str = None, index: int = None) -> None:
+    """Recursive dictflat engine replaced by FlatPlan (reference implementation)
+    """
+    snakecase: bool = options['snakecase_fieldnames']
+    if snakecase:
+        fieldname_prefix = str_2_snakecase(fieldname_prefix)
+    if not flat_dict_key:
+        flat_dict_key = fieldname_prefix
+    elif snakecase:
+        flat_dict_key = str_2_snakecase(flat_dict_key)
+    flat_dict_key = options['rename_list'].get(flat_dict_key, flat_dict_key)
+
+    for field_name in d:
+        if flatten_dict.get(flat_dict_key, None) is None:
+            flatten_dict[flat_dict_key] = []
+        if current_dict is None:
+            current_dict = {'__id': options['id_generator'](flat_dict_key, d, ref_value, index)}
+            if ref_name and ref_value:
+                current_dict['__ref__%s' % (ref_name)] = ref_value
+            flatten_dict[flat_dict_key].append(current_dict)
+
+        field_name_value: str = str_2_snakecase(field_name) if snakecase else field_name
+        if fieldname_prefix:
+            field_name_value = '%s.%s' % (fieldname_prefix, field_name_value)
+        field_name_value = options['rename_values'].get(field_name_value, field_name_value)
+
+        field_value: Any = d[field_name]
+        if options['use_nested'] and isinstance(field_value, dict):
+            if field_name not in options['drop_objects']:
+                reference_flat(field_value, flatten_dict, options, flat_dict_key=flat_dict_key,
+                               fieldname_prefix=field_name_value, current_dict=current_dict)
+        elif isinstance(field_value, (list, tuple, dict)):
+            if isinstance(field_value, dict):
+                field_value = [field_value]
+            if field_name not in options['drop_objects']:
+                if len(field_value) > 0 and isinstance(field_value[0], dict):
+                    elements: List[Dict] = list(field_value)
+                else:
+                    elements: List[Dict] = [{field_name_value: elt} for elt in field_value]
+                for elt_index, elt in enumerate(elements):
+                    reference_flat(elt, flatten_dict, options, flat_dict_key=field_name, ref_name=flat_dict_key,
+                                   ref_value=current_dict['__id'], index=elt_index)
+        elif field_name_value not in options['drop_values']:
+            if field_name_value in options['filter_values']:
+                current_dict[field_name_value] = options['filter_values'][field_name_value](fieldname=field_name_value,
+                                                                                            value=field_value)
+            else:
+                current_dict[field_name_value] = field_value
+
+
+def random_value(rnd: random.Random, depth: int) -> Any:
+    kind: int = rnd.randrange(8 if depth < 4 else 3)
+    if kind == 0:
+        return rnd.randrange(100)
+    if kind == 1:
+        return 'v%d' % (rnd.randrange(100))
+    if kind == 2:
+        return None
+    if kind in (3, 4):
+        return random_document(rnd, depth + 1)
+    if kind == 5:
+        return [random_document(rnd, depth + 1) for _ in range(rnd.randrange(3))]
+    if kind == 6:
+        return [rnd.randrange(10) for _ in range(rnd.randrange(3))]
+    return tuple('t%d' % (i) for i in range(rnd.randrange(3)))
+
+
+def random_document(rnd: random.Random, depth: int = 0) -> Dict:
+    return {key: random_value(rnd, depth) for key in rnd.sample(KEYS, rnd.randrange(1, 5))}
+
+
+def test_flat_same_as_reference() -> None:
+    rnd: random.Random = random.Random(20240607)
+    for _ in range(300):
+        options: Dict = {
+            'snakecase_fieldnames': rnd.random() < 0.5,
+            'use_nested': rnd.random() < 0.7,
+            'rename_values': {'city': 'town', 'value': 'val'} if rnd.random() < 0.3 else {},
+            'rename_list': {'items': 'item_list'} if rnd.random() < 0.3 else {},
+            'filter_values': {'id': lambda fieldname, value: '#%s' % (value)} if rnd.random() < 0.3 else {},
+            'drop_values': ['value'] if rnd.random() < 0.3 else [],
+            'drop_objects': ['tags'] if rnd.random() < 0.3 else [],
+        }
+        documents: List[Dict] = [random_document(rnd) for _ in range(rnd.randrange(1, 4))]
+
+        expected: Dict = {}
+        reference_options: Dict = dict(options, id_generator=CounterIdGenerator())
+        for document in documents:
+            reference_flat(document, expected, reference_options, flat_dict_key='root')
+
+        assert flat_list(documents, 'root', id_generator='counter', **options) == expected
+        if len(documents) == 1:
+            assert flat(documents[0], 'root', id_generator='counter', **options) == expected
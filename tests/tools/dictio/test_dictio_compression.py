@@ -0,0 +1,107 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+from importlib.util import find_spec
+
+from tools.depthdict import depthdict
+from tools.dictio import DURABILITY_ATOMIC, DURABILITY_GROUP, DictIO, JsonlWriter, flush_group_commits, iter_jsonl, open_file
+
+OPENERS = {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+
+def test_compressed_write_read() -> None:
+    for suffix, opener in OPENERS.items():
+        path: str = "./tmp/compressed.json.%s" % (suffix)
+        d_w = DictIO({'a': 'letter a'})
+        d_w > path
+        with opener(path, 'rt') as f:
+            assert json.loads(f.read()) == {'a': 'letter a'}
+        d_r = DictIO({'b': 'letter b'})
+        d_r << path
+        assert d_r.d == {'a': 'letter a', 'b': 'letter b'}
+
+
+def test_compressed_append_members() -> None:
+    for suffix in OPENERS:
+        path: str = "./tmp/compressed.jsonl.%s" % (suffix)
+        d_w = depthdict({'i': 0})
+        d_w > path
+        for i in range(1, 3):
+            depthdict({'i': i}) >> path
+        DictIO({'i': 3}, durability=DURABILITY_ATOMIC) >> path
+        DictIO({'i': 4}, durability=DURABILITY_GROUP) >> path
+        flush_group_commits()
+        assert [record['i'] for record in iter_jsonl(path)] == list(range(5))
+
+
+def test_compressed_atomic_write() -> None:
+    path: str = "./tmp/compressed_atomic.json.gz"
+    depthdict_w = depthdict({'a': {'b': 1}})
+    depthdict_w.durability = DURABILITY_ATOMIC
+    depthdict_w > path
+    d_r = depthdict()
+    d_r < path
+    assert d_r.get_depth('a.b') == 1
+
+
+def test_compressed_jsonl_writer() -> None:
+    path: str = "./tmp/writer.jsonl.xz"
+    with JsonlWriter(path, mode='w', batch_size=10) as writer:
+        writer.write_many({'i': i} for i in range(25))
+    with lzma.open(path, 'rt') as f:
+        assert len(f.readlines()) == 25
+    assert sum(1 for _ in iter_jsonl(path)) == 25
+
+
+def test_zstd() -> None:
+    path: str = "./tmp/compressed.json.zst"
+    if find_spec('zstandard') is None:
+        try:
+            DictIO({'a': 1}) > path
+            assert False
+        except Exception as e:
+            assert 'zstandard' in str(e)
+        return
+    DictIO({'a': 1}) > path
+    DictIO({'a': 2}) >> path
+    with open_file(path) as f:
+        assert [json.loads(line) for line in f] == [{'a': 1}, {'a': 2}]
+
+
+def test_compressed_buffered_appends_smaller_than_plain() -> None:
+    sizes = {}
+    for suffix in ['plain'] + list(OPENERS):
+        path: str = "./tmp/compressed_appends.jsonl" + ('' if suffix == 'plain' else '.%s' % (suffix))
+        DictIO({'i': -1}) > path
+        for i in range(500):
+            DictIO({'i': i, 'name': 'record %d' % (i)}, durability=DURABILITY_GROUP) >> path
+        flush_group_commits()
+        with JsonlWriter(path) as writer:
+            writer.write_many({'i': i, 'name': 'record %d' % (i)} for i in range(500, 1000))
+        assert [record['i'] for record in iter_jsonl(path)] == list(range(-1, 1000))
+        sizes[suffix] = os.path.getsize(path)
+    for suffix in OPENERS:
+        assert sizes[suffix] < sizes['plain']
+
+
+def test_compressed_append_write_through() -> None:
+    for suffix, opener in OPENERS.items():
+        path: str = "./tmp/compressed_write_through.jsonl.%s" % (suffix)
+        DictIO({'a': 0}) > path
+        DictIO({'a': 1}) >> path
+        # Readable right away by an external reader
+        with opener(path, 'rt') as f:
+            assert [json.loads(line) for line in f] == [{'a': 0}, {'a': 1}]
+
+
+def test_compressed_jsonl_writer_one_member() -> None:
+    path: str = "./tmp/writer_members.jsonl.gz"
+    with JsonlWriter(path, mode='w', batch_size=1) as writer:
+        writer.write_many({'i': i} for i in range(100))
+        with gzip.open(path, 'rt') as f:
+            assert len(f.read(10)) == 10
+    with open(path, 'rb') as f:
+        assert f.read().count(b'\x1f\x8b\x08') == 1
+    assert sum(1 for _ in iter_jsonl(path)) == 100
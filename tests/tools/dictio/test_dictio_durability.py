@@ -0,0 +1,78 @@
+import json
+import os
+
+from tools import dictio
+from tools.depthdict import depthdict
+from tools.dictio import DURABILITY_ATOMIC, DURABILITY_GROUP, DictIO, flush_group_commits
+
+
+def read_lines(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_atomic_write() -> None:
+    path: str = "./tmp/atomic.json"
+    DictIO({'a': 1}, durability=DURABILITY_ATOMIC) > path
+    d_r = DictIO()
+    d_r < path
+    assert d_r.d == {'a': 1}
+    # No temporary file left
+    assert not [file_name for file_name in os.listdir('./tmp') if file_name.startswith('.atomic.json.')]
+
+
+def test_atomic_write_failure_keeps_file() -> None:
+    path: str = "./tmp/atomic_failure.json"
+    DictIO({'a': 1}, durability=DURABILITY_ATOMIC) > path
+    try:
+        DictIO({'a': object()}, durability=DURABILITY_ATOMIC) > path
+        assert False
+    except TypeError:
+        assert True
+    assert read_lines(path) == [{'a': 1}]
+
+
+def test_atomic_append() -> None:
+    path: str = "./tmp/atomic_append.jsonl"
+    DictIO({'i': 0}, durability=DURABILITY_ATOMIC) > path
+    DictIO({'i': 1}, durability=DURABILITY_ATOMIC) >> path
+    assert read_lines(path) == [{'i': 0}, {'i': 1}]
+
+
+def test_group_commit() -> None:
+    path: str = "./tmp/group.jsonl"
+    d_w = depthdict({'i': 0})
+    d_w.durability = DURABILITY_GROUP
+    d_w > path
+    for i in range(1, 5):
+        d_w['i'] = i
+        d_w >> path
+    # Pending appends are not written yet
+    assert read_lines(path) == [{'i': 0}]
+    flush_group_commits()
+    assert read_lines(path) == [{'i': i} for i in range(5)]
+
+
+def test_group_commit_committed_before_read_and_rewrite() -> None:
+    path: str = "./tmp/group_read.jsonl"
+    DictIO({'a': 1}) > path
+    DictIO({'b': 2}, durability=DURABILITY_GROUP) >> path
+    try:
+        # The pending append is committed before the read
+        DictIO() < path
+        assert False
+    except json.JSONDecodeError:
+        assert True
+    DictIO({'c': 3}, durability=DURABILITY_GROUP) >> path
+    DictIO({'d': 4}, durability=DURABILITY_GROUP) > path
+    flush_group_commits()
+    assert read_lines(path) == [{'d': 4}]
+    assert not dictio._group_commits
+
+
+def test_invalid_durability() -> None:
+    try:
+        DictIO({}, durability='always')
+        assert False
+    except Exception:
+        assert True
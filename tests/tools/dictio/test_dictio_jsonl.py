@@ -0,0 +1,53 @@
+import json
+import os
+
+from tools.dictio import FSYNC_CLOSE, FSYNC_FLUSH, DictIO, JsonlWriter, iter_jsonl
+
+
+def test_jsonl_write_read() -> None:
+    path: str = "./tmp/a.jsonl"
+    with JsonlWriter(path, mode='w', batch_size=3, fsync=FSYNC_FLUSH) as writer:
+        for i in range(10):
+            writer.write({'i': i})
+            if i == 3:
+                # 3 records are flushed, 1 is buffered
+                with open(path) as f:
+                    assert len(f.readlines()) == 3
+        DictIO({'i': 10}) >> writer
+        assert writer.nb_records == 11
+    assert [record['i'] for record in iter_jsonl(path)] == list(range(11))
+
+
+def test_jsonl_append_and_factory() -> None:
+    path: str = "./tmp/b.jsonl"
+    with JsonlWriter(path, mode='w', fsync=FSYNC_CLOSE) as writer:
+        writer.write_many([{'a': 1}, {'a': 2}])
+    size: int = os.path.getsize(path)
+    with JsonlWriter(path, flush_interval=None) as writer:
+        writer.write({'a': 3})
+        assert os.path.getsize(path) == size
+    records = list(iter_jsonl(path, factory=DictIO))
+    assert [record.d for record in records] == [{'a': 1}, {'a': 2}, {'a': 3}]
+
+
+def test_jsonl_invalid_line() -> None:
+    path: str = "./tmp/c.jsonl"
+    with open(path, 'w') as f:
+        f.write('{"a": 1}\n\n{"a": \n')
+    records = iter_jsonl(path)
+    assert next(records) == {'a': 1}
+    try:
+        next(records)
+        assert False
+    except json.decoder.JSONDecodeError:
+        assert True
+
+
+def test_jsonl_closed_writer() -> None:
+    writer = JsonlWriter("./tmp/d.jsonl", mode='w')
+    writer.close()
+    try:
+        writer.write({'a': 1})
+        assert False
+    except Exception:
+        assert True
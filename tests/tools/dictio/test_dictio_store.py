@@ -0,0 +1,70 @@
+import json
+import os
+
+from tools.dictio import DictIO, DictIOStore
+
+
+def new_store_path(name: str) -> str:
+    path: str = "./tmp/%s.jsonl" % (name)
+    for file_name in (path, path + '.idx'):
+        if os.path.exists(file_name):
+            os.remove(file_name)
+    return path
+
+
+def test_store_write_get() -> None:
+    path: str = new_store_path('store')
+    with DictIOStore(path) as store:
+        assert len(store) == 0
+        assert store.get(1) is None
+        for i in range(100):
+            DictIO({'id': i, 'name': 'n%d' % i}) >> store
+        store.write({'id': 5, 'name': 'updated'})
+        assert store[42] == {'id': 42, 'name': 'n42'}
+        assert store['5'] == {'id': 5, 'name': 'updated'}
+        assert store.get(5, factory=DictIO).d == {'id': 5, 'name': 'updated'}
+        assert 99 in store and 100 not in store
+        assert len(store) == 100
+    assert os.path.exists(path + '.idx')
+    with DictIOStore(path) as store:
+        assert store[99] == {'id': 99, 'name': 'n99'}
+        assert list(store.keys())[:3] == ['0', '1', '2']
+        try:
+            store[100]
+            assert False
+        except KeyError:
+            assert True
+
+
+def test_store_index_completed_and_rebuilt() -> None:
+    path: str = new_store_path('store_lazy')
+    with DictIOStore(path, key='k') as store:
+        store.write({'k': 'a', 'v': 1})
+    # Appended by another writer: the index is completed
+    with open(path, 'a') as f:
+        f.write('%s\n' % json.dumps({'k': 'b', 'v': 2}))
+    with DictIOStore(path, key='k') as store:
+        assert store['b'] == {'k': 'b', 'v': 2}
+        assert store['a'] == {'k': 'a', 'v': 1}
+    # Rewritten data file: the index is rebuilt
+    with open(path, 'w') as f:
+        f.write('%s\n' % json.dumps({'k': 'c', 'v': 3}))
+    with DictIOStore(path, key='k') as store:
+        assert list(store.keys()) == ['c']
+    # Torn last line is ignored then overwritten
+    with open(path, 'a') as f:
+        f.write('{"k": "d", ')
+    with DictIOStore(path, key='k') as store:
+        assert 'd' not in store
+        store.write({'k': 'e', 'v': 5})
+    with open(path) as f:
+        assert [json.loads(line)['k'] for line in f] == ['c', 'e']
+
+
+def test_store_missing_key() -> None:
+    with DictIOStore(new_store_path('store_missing')) as store:
+        try:
+            store.write({'name': 'no id'})
+            assert False
+        except Exception:
+            assert True
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Dict, Generator, List
+
+from tools.flow import Flow, FlowSkipData
+
+
+def load(context: Dict) -> Generator[Dict, None, None]:
+    for i in range(context['nb']):
+        yield {'num': i}
+
+
+def init(context: Dict) -> None:
+    context['nums'] = []
+
+
+def slow_transform(data: Dict) -> Dict:
+    # Later data finish first
+    time.sleep(0.001 * (10 - data['num'] % 10))
+    if data['num'] % 7 == 0:
+        raise FlowSkipData('skip %d' % data['num'])
+    if data['num'] % 5 == 0:
+        return None
+    return {'num': data['num'], 'square': data['num'] ** 2}
+
+
+def collect(data: Dict, context: Dict) -> None:
+    context['nums'].append(data['num'])
+
+
+def square(data: Dict) -> Dict:
+    if data['num'] % 3 == 0:
+        raise FlowSkipData('skip')
+    return {'num': data['num'] ** 2}
+
+
+def run_flow(**options) -> tuple:
+    context: Dict = {'nb': 50}
+    modulo_calls: List[int] = []
+    counters = Flow(fct_init=init,
+                    fct_load=load,
+                    fct_filter=[slow_transform, collect],
+                    fct_modulo={10: lambda idx: modulo_calls.append(idx)},
+                    context=context,
+                    **options).run()
+    return counters, context['nums'], modulo_calls
+
+
+def test_parallel_same_counters() -> None:
+    serial, serial_nums, serial_modulo = run_flow()
+    assert serial == (50, 34, 8, 8)
+    ordered, ordered_nums, ordered_modulo = run_flow(workers=4)
+    assert ordered == serial
+    assert ordered_modulo == serial_modulo == [10, 20, 30, 40, 50]
+    unordered, unordered_nums, _ = run_flow(workers=4, ordered=False, max_in_flight=8)
+    assert unordered == serial
+    assert sorted(unordered_nums) == sorted(serial_nums)
+
+
+def test_parallel_workers_from_context() -> None:
+    threads: set = set()
+
+    def record_thread(data: Dict) -> Dict:
+        threads.add(threading.get_ident())
+        time.sleep(0.001)
+        return data
+
+    context: Dict = {'nb': 20, 'workers': 3}
+    counters = Flow(fct_init=init, fct_load=load, fct_filter=record_thread, context=context, workers='context:workers').run()
+    assert counters == (20, 20, 0, 0)
+    assert threading.get_ident() not in threads
+
+
+def test_parallel_process_executor() -> None:
+    context: Dict = {'nb': 30}
+    counters = Flow(fct_init=init, fct_load=load, fct_filter=square, context=context, workers=2, executor='process').run()
+    assert counters == (30, 20, 10, 0)
+
+
+def test_parallel_filter_error() -> None:
+    def failing(data: Dict) -> Dict:
+        if data['num'] == 12:
+            raise KeyError('num')
+        return data
+
+    try:
+        Flow(fct_init=init, fct_load=load, fct_filter=failing, context={'nb': 40}, workers=2).run()
+        assert False
+    except KeyError:
+        assert True
+
+
+def test_invalid_executor() -> None:
+    try:
+        Flow(fct_load=load, executor='gpu')
+        assert False
+    except ValueError:
+        assert True
+
+
+def test_parallel_without_init() -> None:
+    context: Dict = {'nb': 30, 'workers': 3, 'window': 4}
+    counters = Flow(fct_load=load, fct_filter=slow_transform, context=context,
+                    workers='context:workers', max_in_flight='context:window').run()
+    assert counters == (30, 25, 5, 0)
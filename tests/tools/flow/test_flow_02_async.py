@@ -0,0 +1,153 @@
+import asyncio
+from typing import AsyncGenerator, Dict, List
+
+from tools.flow import AsyncFlow, FlowFilterError, FlowSkipData, flow_batch
+
+
+async def init(context: Dict) -> None:
+    await asyncio.sleep(0)
+    context['nums'] = []
+    context['running'] = 0
+    context['max_running'] = 0
+
+
+async def load(context: Dict) -> AsyncGenerator[Dict, None]:
+    for i in range(context['nb']):
+        await asyncio.sleep(0)
+        yield {'num': i}
+
+
+async def fetch(data: Dict, context: Dict) -> Dict:
+    context['running'] += 1
+    context['max_running'] = max(context['max_running'], context['running'])
+    # Later data finish first
+    await asyncio.sleep(0.001 * (10 - data['num'] % 10))
+    context['running'] -= 1
+    if data['num'] % 7 == 0:
+        raise FlowSkipData('skip %d' % data['num'])
+    if data['num'] % 5 == 0:
+        return None
+    return data
+
+
+def collect(data: Dict, context: Dict) -> None:
+    context['nums'].append(data['num'])
+
+
+def run_flow(**options) -> tuple:
+    context: Dict = {'nb': 50}
+    finalyzed: List[bool] = []
+    modulo_calls: List[int] = []
+
+    async def finalyze() -> None:
+        finalyzed.append(True)
+
+    counters = asyncio.run(AsyncFlow(fct_init=init,
+                                     fct_load=load,
+                                     fct_filter=[fetch, collect],
+                                     fct_finalyze=finalyze,
+                                     fct_modulo={10: lambda idx: modulo_calls.append(idx)},
+                                     context=context,
+                                     **options).run())
+    assert finalyzed == [True]
+    return counters, context, modulo_calls
+
+
+def test_async_sequential() -> None:
+    counters, context, modulo_calls = run_flow()
+    assert counters == (50, 34, 8, 8)
+    assert context['max_running'] == 1
+    assert modulo_calls == [10, 20, 30, 40, 50]
+    assert context['nums'] == sorted(context['nums'])
+
+
+def test_async_concurrent() -> None:
+    counters, context, modulo_calls = run_flow(concurrency=8)
+    assert counters == (50, 34, 8, 8)
+    assert 1 < context['max_running'] <= 8
+    assert modulo_calls == [10, 20, 30, 40, 50]
+    # Filter chains run concurrently and complete out of order
+    assert context['nums'] != sorted(context['nums'])
+
+
+def test_async_unordered_from_context() -> None:
+    context: Dict = {'nb': 30, 'concurrency': 5}
+    counters = asyncio.run(AsyncFlow(fct_init=init,
+                                     fct_load=load,
+                                     fct_filter=[fetch, collect],
+                                     context=context,
+                                     ordered=False,
+                                     concurrency='context:concurrency').run())
+    assert counters == (30, 20, 5, 5)
+    assert context['max_running'] == 5
+
+
+def test_async_sync_loader_error() -> None:
+    def sync_load() -> List[Dict]:
+        return [{'num': i} for i in range(10)]
+
+    async def failing(data: Dict) -> Dict:
+        if data['num'] == 4:
+            raise KeyError('num')
+        return data
+
+    try:
+        asyncio.run(AsyncFlow(fct_init=lambda: None, fct_load=sync_load, fct_filter=failing, concurrency=3).run())
+        assert False
+    except KeyError:
+        assert True
+
+
+def test_async_without_init() -> None:
+    context: Dict = {'nb': 20, 'c': 2, 'nums': [], 'running': 0, 'max_running': 0}
+    counters = asyncio.run(AsyncFlow(fct_load=load, fct_filter=[fetch], context=context, concurrency='context:c').run())
+    assert counters[0] == 20
+    assert context['max_running'] == 2
+
+
+def test_async_batch_filter() -> None:
+    @flow_batch
+    async def bulk(data: List[Dict], context: Dict) -> List:
+        context['sizes'].append(len(data))
+        return [FlowSkipData('skip') if d['num'] % 7 == 0 else None if d['num'] % 5 == 0 else d for d in data]
+
+    context: Dict = {'nb': 50, 'sizes': [], 'nums': []}
+    counters = asyncio.run(AsyncFlow(fct_load=load, fct_filter=[bulk, collect], context=context, concurrency=4).run())
+    assert counters == (50, 34, 8, 8)
+    assert set(context['sizes']) == {1}
+
+    @flow_batch
+    def drop(data: List[Dict]) -> List[Dict]:
+        return []
+
+    try:
+        asyncio.run(AsyncFlow(fct_load=load, fct_filter=[drop], context={'nb': 3}).run())
+        assert False
+    except FlowFilterError:
+        assert True
+
+
+def test_async_filter_error_awaits_cancelled() -> None:
+    started: List[int] = []
+    cancelled: List[int] = []
+
+    async def slow_or_failing(data: Dict) -> Dict:
+        if data['num'] == 3:
+            raise KeyError('num')
+        started.append(data['num'])
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(data['num'])
+            raise
+        return data
+
+    async def main() -> None:
+        try:
+            await AsyncFlow(fct_load=load, fct_filter=slow_or_failing, context={'nb': 10}, concurrency=5,
+                            ordered=False).run()
+            assert False
+        except KeyError:
+            assert started and sorted(cancelled) == sorted(started)
+
+    asyncio.run(main())
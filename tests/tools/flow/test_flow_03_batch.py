@@ -0,0 +1,119 @@
+import time
+from typing import Dict, Generator, List
+
+from tools.flow import Flow, FlowFilterError, FlowSkipData, flow_batch
+
+
+def init(context: Dict) -> None:
+    context['nums'] = []
+    context['batch_sizes'] = []
+
+
+def load(context: Dict) -> Generator[Dict, None, None]:
+    for i in range(context['nb']):
+        yield {'num': i}
+
+
+def check(data: Dict) -> Dict:
+    if data['num'] % 7 == 0:
+        raise FlowSkipData('skip %d' % data['num'])
+    return data
+
+
+@flow_batch
+def bulk_square(data: List[Dict], context: Dict) -> List:
+    context['batch_sizes'].append(len(data))
+    return [None if d['num'] % 5 == 0 else {'num': d['num'], 'square': d['num'] ** 2} for d in data]
+
+
+def collect(data: Dict, context: Dict) -> None:
+    context['nums'].append(data['num'])
+
+
+def run_flow(filters: list, **options) -> tuple:
+    context: Dict = {'nb': 50}
+    modulo_calls: List[int] = []
+    counters = Flow(fct_init=init,
+                    fct_load=load,
+                    fct_filter=filters,
+                    fct_modulo={10: lambda idx: modulo_calls.append(idx)},
+                    context=context,
+                    **options).run()
+    return counters, context, modulo_calls
+
+
+def test_batch_same_counters() -> None:
+    def square(data: Dict) -> Dict:
+        return None if data['num'] % 5 == 0 else data
+
+    serial, serial_context, serial_modulo = run_flow([check, square, collect])
+    assert serial == (50, 34, 8, 8)
+    batch, batch_context, batch_modulo = run_flow([check, bulk_square, collect], batch_size=16)
+    assert batch == serial
+    # Data skipped by check do not reach the batch filter
+    assert batch_context['batch_sizes'] == [13, 14, 14, 1]
+    assert batch_context['nums'] == serial_context['nums']
+    assert batch_modulo == serial_modulo == [10, 20, 30, 40, 50]
+
+
+def test_batch_filter_without_batch_mode() -> None:
+    counters, context, _ = run_flow([check, bulk_square, collect])
+    assert counters == (50, 34, 8, 8)
+    assert set(context['batch_sizes']) == {1}
+
+
+def test_batch_parallel() -> None:
+    context: Dict = {'nb': 50, 'size': 10}
+    modulo_calls: List[int] = []
+    counters = Flow(fct_init=init, fct_load=load, fct_filter=[check, bulk_square, collect],
+                    fct_modulo={10: lambda idx: modulo_calls.append(idx)},
+                    context=context, batch_size='context:size', workers=3).run()
+    assert counters == (50, 34, 8, 8)
+    assert sorted(context['nums']) == [n for n in range(50) if n % 5 and n % 7]
+    assert modulo_calls == [10, 20, 30, 40, 50]
+
+
+def test_batch_time_window() -> None:
+    def slow_load(context: Dict) -> Generator[Dict, None, None]:
+        for i in range(6):
+            time.sleep(0.02)
+            yield {'num': i}
+
+    context: Dict = {}
+    Flow(fct_init=init, fct_load=slow_load, fct_filter=bulk_square, context=context, batch_time=0.03).run()
+    assert sum(context['batch_sizes']) == 6
+    assert max(context['batch_sizes']) <= 3
+    assert len(context['batch_sizes']) >= 2
+
+
+def test_batch_skip_and_bad_length() -> None:
+    @flow_batch
+    def skip_all(data: List[Dict]) -> List[Dict]:
+        raise FlowSkipData('whole batch')
+
+    counters, _, _ = run_flow([skip_all], batch_size=20)
+    assert counters == (50, 0, 50, 0)
+
+    @flow_batch
+    def drop_one(data: List[Dict]) -> List[Dict]:
+        return data[1:]
+
+    try:
+        run_flow([drop_one], batch_size=20)
+        assert False
+    except FlowFilterError:
+        assert True
+
+
+def test_batch_without_init() -> None:
+    sizes: List[int] = []
+
+    @flow_batch
+    def sizes_of(data: List[Dict]) -> List[Dict]:
+        sizes.append(len(data))
+        return data
+
+    context: Dict = {'nb': 20, 'size': 8}
+    counters = Flow(fct_load=load, fct_filter=sizes_of, context=context, batch_size='context:size').run()
+    assert counters[0] == 20
+    assert sizes == [8, 8, 4]
@@ -0,0 +1,144 @@
+import logging
+from typing import Dict, Generator, List
+
+from tools.flow import PROFILE_MAX_SAMPLES, Flow, FlowSkipData, FlowStageStats, flow_batch
+
+
+def init(context: Dict) -> None:
+    context['nums'] = []
+
+
+def load(context: Dict) -> Generator[Dict, None, None]:
+    for i in range(context['nb']):
+        yield {'num': i}
+
+
+def check(data: Dict) -> Dict:
+    if data['num'] % 7 == 0:
+        raise FlowSkipData('skip %d' % data['num'])
+    return data
+
+
+def square(data: Dict) -> Dict:
+    return None if data['num'] % 5 == 0 else data
+
+
+def collect(data: Dict, context: Dict) -> None:
+    context['nums'].append(data['num'])
+
+
+def finalyze(context: Dict) -> None:
+    context['done'] = True
+
+
+def run_flow(**options) -> tuple:
+    context: Dict = {'nb': 50}
+    modulo_calls: List[int] = []
+    flow: Flow = Flow(fct_init=init,
+                      fct_load=load,
+                      fct_filter=[check, square, collect],
+                      fct_modulo={10: lambda idx: modulo_calls.append(idx)},
+                      fct_finalyze=finalyze,
+                      context=context,
+                      **options)
+    counters = flow.run()
+    return flow, counters, context, modulo_calls
+
+
+def test_profile_disabled() -> None:
+    flow, counters, _, _ = run_flow()
+    assert counters == (50, 34, 8, 8)
+    assert flow.report is None
+
+
+def test_profile_serial() -> None:
+    plain, plain_counters, plain_context, plain_modulo = run_flow()
+    flow, counters, context, modulo_calls = run_flow(profile=True)
+    assert counters == plain_counters
+    assert context['nums'] == plain_context['nums']
+    assert modulo_calls == plain_modulo
+
+    report: Dict = flow.report
+    assert report['data'] == {'total': 50, 'processed': 34, 'skipped': 8, 'stopped_with_none': 8}
+    assert report['loader']['calls'] == 50
+    assert report['loader']['wait_time'] >= 0
+    assert [stage['name'] for stage in report['init']] == ['init']
+    assert [stage['name'] for stage in report['finalyze']] == ['finalyze']
+    assert report['total_time'] >= report['init'][0]['total_time']
+
+    check_stats, square_stats, collect_stats = report['filters']
+    assert (check_stats['name'], check_stats['calls'], check_stats['skipped']) == ('check', 50, 8)
+    assert (square_stats['calls'], square_stats['stopped_with_none']) == (42, 8)
+    assert (collect_stats['calls'], collect_stats['skipped'], collect_stats['stopped_with_none']) == (34, 0, 0)
+    for stats in report['filters']:
+        assert stats['p50'] <= stats['p95'] <= stats['p99'] <= stats['total_time']
+
+
+def test_profile_parallel() -> None:
+    for executor in ('thread', 'process'):
+        flow, counters, _, _ = run_flow(profile=True, workers=2, executor=executor)
+        assert counters == (50, 34, 8, 8)
+        assert flow.report['data']['total'] == 50
+        assert flow.report['loader']['calls'] == 50
+        assert len(flow.report['init']) == 1
+        check_stats, square_stats, collect_stats = flow.report['filters']
+        assert (check_stats['name'], check_stats['calls'], check_stats['skipped']) == ('check', 50, 8)
+        assert (square_stats['calls'], square_stats['stopped_with_none']) == (42, 8)
+        assert (collect_stats['calls'], collect_stats['skipped'], collect_stats['stopped_with_none']) == (34, 0, 0)
+
+
+def test_profile_parallel_batch() -> None:
+    context: Dict = {'nb': 50}
+    flow: Flow = Flow(fct_init=init, fct_load=load, fct_filter=[check, square, collect],
+                      context=context, workers=2, batch_size=16, profile=True)
+    assert flow.run() == (50, 34, 8, 8)
+    check_stats, square_stats, collect_stats = flow.report['filters']
+    assert (check_stats['calls'], check_stats['skipped']) == (50, 8)
+    assert (square_stats['calls'], square_stats['stopped_with_none']) == (42, 8)
+    assert collect_stats['calls'] == 34
+
+
+def test_stage_stats_merge() -> None:
+    total: FlowStageStats = FlowStageStats('total')
+    worker: FlowStageStats = FlowStageStats('')
+    for duration in (0.1, 0.2, 0.3):
+        worker.add(duration)
+    worker.skipped = 1
+    total.add(0.4)
+    total.merge(worker)
+    assert (total.calls, total.skipped, sorted(total.samples)) == (4, 1, [0.1, 0.2, 0.3, 0.4])
+    assert abs(total.total_time - 1.0) < 1e-9
+
+
+def test_profile_batch() -> None:
+    @flow_batch
+    def bulk_square(data: List[Dict]) -> List:
+        return [None if d['num'] % 5 == 0 else d for d in data]
+
+    context: Dict = {'nb': 50}
+    flow: Flow = Flow(fct_init=init, fct_load=load, fct_filter=[check, bulk_square, collect],
+                      context=context, batch_size=16, profile=True)
+    assert flow.run() == (50, 34, 8, 8)
+    report: Dict = flow.report
+    assert report['loader']['calls'] == 50
+    check_stats, bulk_stats, collect_stats = report['filters']
+    assert (check_stats['calls'], check_stats['skipped']) == (50, 8)
+    assert (bulk_stats['name'], bulk_stats['calls'], bulk_stats['stopped_with_none']) == ('test_profile_batch.<locals>.bulk_square', 4, 8)
+    assert (collect_stats['calls'], collect_stats['skipped'], collect_stats['stopped_with_none']) == (34, 0, 0)
+
+
+def test_profile_log_modulo(caplog) -> None:
+    with caplog.at_level(logging.DEBUG):
+        run_flow(profile=True, log_modulo=20)
+    assert any('Flow: profile: check: ' in record.getMessage() for record in caplog.records)
+    assert any('Flow: profile (final): ' in record.getMessage() for record in caplog.records)
+
+
+def test_stage_stats_reservoir() -> None:
+    stats: FlowStageStats = FlowStageStats('stage')
+    for i in range(PROFILE_MAX_SAMPLES + 100):
+        stats.add(3.0 if i % 4 == 0 else 1.0)
+    assert stats.calls == PROFILE_MAX_SAMPLES + 100
+    assert len(stats.samples) == PROFILE_MAX_SAMPLES
+    report: Dict = stats.report()
+    assert (report['p50'], report['p99']) == (1.0, 3.0)
@@ -0,0 +1,94 @@
+import json
+
+from tools import jsonbackend
+from tools.depthdict import depthdict
+from tools.dictio import DictIO
+
+DOCUMENTS = [
+    {'a': 1, 'b': [1.5, None, True], 'c': {'d': 'é', 'e': ''}},
+    {'big': 2 ** 70, 'nan': float('nan')},
+    [],
+]
+
+
+def test_stdlib_always_available() -> None:
+    assert 'json' in jsonbackend.available_json_backends()
+    backend = jsonbackend.get_json_backend('json')
+    assert backend.dumps({'a': 1}) == '{"a": 1}'
+
+
+def test_compat_same_output() -> None:
+    for name in jsonbackend.available_json_backends():
+        backend = jsonbackend.get_json_backend(name)
+        for document in DOCUMENTS:
+            assert backend.dumps(document).isascii()
+            assert repr(json.loads(backend.dumps(document))) == repr(document)
+            assert repr(backend.loads(json.dumps(document))) == repr(json.loads(json.dumps(document)))
+            assert repr(backend.loads(json.dumps(document).encode('utf-8'))) == repr(document)
+
+
+def test_compat_uses_fast_codec() -> None:
+    calls = []
+
+    def factory() -> jsonbackend.JsonBackend:
+        def dumps(o) -> str:
+            calls.append('dumps')
+            return json.dumps(o, ensure_ascii=False, separators=(',', ':'))
+        return jsonbackend.JsonBackend('compact', dumps, json.loads)
+
+    jsonbackend.register_json_backend('compact', factory)
+    backend = jsonbackend.get_json_backend('compact')
+    assert backend.dumps({'a': ['é', '\U0001f600']}) == '{"a":["\\u00e9","\\ud83d\\ude00"]}'
+    assert calls == ['dumps']
+
+
+def test_fast_round_trip() -> None:
+    for name in jsonbackend.available_json_backends():
+        backend = jsonbackend.get_json_backend(name, compat=False)
+        assert backend.loads(backend.dumps(DOCUMENTS[0])) == DOCUMENTS[0]
+
+
+def test_decode_error() -> None:
+    for name in jsonbackend.available_json_backends():
+        for compat in (True, False):
+            backend = jsonbackend.get_json_backend(name, compat=compat)
+            try:
+                backend.loads('{"a": ')
+                assert False
+            except json.JSONDecodeError:
+                assert True
+
+
+def test_unknown_backend() -> None:
+    try:
+        jsonbackend.get_json_backend('unknown')
+        assert False
+    except Exception:
+        assert True
+
+
+def test_operators_use_backend() -> None:
+    calls = []
+
+    def factory() -> jsonbackend.JsonBackend:
+        def dumps(o) -> str:
+            calls.append('dumps')
+            return json.dumps(o)
+
+        def loads(s):
+            calls.append('loads')
+            return json.loads(s)
+        return jsonbackend.JsonBackend('counting', dumps, loads)
+
+    jsonbackend.register_json_backend('counting', factory)
+    jsonbackend.set_json_backend('counting', compat=False)
+    try:
+        depthdict({'a': 1}) > './tmp/backend.json'
+        d = depthdict()
+        d < './tmp/backend.json'
+        DictIO({'b': 2}) > './tmp/backend.json'
+        DictIO() < './tmp/backend.json'
+        assert calls == ['dumps', 'loads', 'dumps', 'loads']
+        assert d == {'a': 1}
+    finally:
+        jsonbackend.set_json_backend()
@@ -3,10 +3,20 @@
 """This is a test for dictionnary extension and funny use cases
 """
 
-import json
 import re
-from typing import Any, Dict, List, Union
-from uuid import uuid4 as get_uuid
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Final, Iterable, List, Optional, Tuple, Union
+
+from tools.dictio import DURABILITY_NONE, JsonlWriter, append_json_line, iter_jsonl, read_text_file, write_text_file
+from tools.jsonbackend import json_backend
+from tools.recordid import IdGenerator, get_id_generator, uuid_id
+
+DEPTH_PATH_CACHE_SIZE: Final[int] = 1024
+
+_RE_LIST_INDEX: Final[re.Pattern[str]] = re.compile(r'^(?P<field_name>[^[]+)\[(?P<list_index>-?[0-9]+)\]$')
+
+_MISSING: Final[object] = object()
 
 
 def get_str_sorted_list_elem(lst: List, *args, **kw) -> List:
@@ -17,12 +27,235 @@ def get_int_sorted_list_elem(lst: List, *args, **kw) -> List:
     return sorted(lst, key=int, reverse=kw.get('reverse', False))
 
 
+def _get_step(c_d: Any, field_name: str, list_index: Optional[int]) -> Any:
+    """Walk one step of a compiled path
+    :param c_d: Current container
+    :param field_name: Field name to read in the current container
+    :param list_index: List index to apply on the field value (None if no index)
+    :returns: The value, or _MISSING if the step cannot be walked
+    """
+    if field_name not in c_d:
+        return _MISSING
+    c_d = c_d[field_name]
+    if list_index is not None:
+        if not isinstance(c_d, list):
+            return _MISSING
+        if (list_index >= 0 and list_index >= len(c_d)) or \
+           (list_index < 0 and -list_index > len(c_d)):
+            return _MISSING
+        c_d = c_d[list_index]
+    return c_d
+
+
+class depthpath():
+    """A parsed path usable on any nested dictionnary (see compile_path)
+
+    Each field name may end with a list index (e.g. 'a[2]' or 'a[-1]') for reading.
+    Writing (set) uses raw field names, like depthdict.set_depth.
+    """
+
+    __slots__ = ('field_names', 'steps')
+
+    def __init__(self, field_names: Tuple[str, ...]) -> None:
+        self.field_names: Tuple[str, ...] = field_names
+        steps: List[Tuple[str, Optional[int]]] = []
+        for field_name in field_names:
+            z: re.Match[str] | None = _RE_LIST_INDEX.match(field_name)
+            if z is not None:
+                steps.append((z.group('field_name'), int(z.group('list_index'))))
+            else:
+                steps.append((field_name, None))
+        self.steps: Tuple[Tuple[str, Optional[int]], ...] = tuple(steps)
+
+    def __repr__(self) -> str:
+        return "depthpath(%s)" % (list(self.field_names))
+
+    def get(self, o: Dict, d: Any = None) -> Any:
+        """Read the value at this path
+        :param o: Nested dictionnary
+        :param d: Default value if the path does not exist
+        :returns: The value or the default value
+        """
+        if not self.steps:
+            return d
+        c_d: Any = o
+        for field_name, list_index in self.steps:
+            c_d = _get_step(c_d, field_name, list_index)
+            if c_d is _MISSING:
+                return d
+        return c_d
+
+    def exists(self, o: Dict) -> bool:
+        """Check if this path exists
+        :param o: Nested dictionnary
+        :returns: True if the path exists
+        """
+        return self.get(o, _MISSING) is not _MISSING
+
+    def set(self,
+            o: Dict,
+            v: Any = None,
+            add_in_list: bool = False,
+            uniq: bool = False) -> Dict:
+        """Write a value at this path, creating intermediate dictionnaries
+        :param o: Nested dictionnary
+        :param v: Value
+        :param add_in_list: Append the value in a list
+        :param uniq: Same meaning as in depthdict.set_depth
+        :returns: The nested dictionnary
+        """
+        if not self.field_names:
+            return o
+        d: Any = o
+        for field_name in self.field_names[:-1]:
+            if field_name not in d or not isinstance(d, dict):
+                d[field_name] = {}
+            d = d[field_name]
+        field_name: str = self.field_names[-1]
+        if add_in_list:
+            if field_name not in d or not isinstance(d[field_name], list):
+                d[field_name] = []
+            if not uniq or field_name not in d:
+                d[field_name].append(v)
+        else:
+            d[field_name] = v
+        return o
+
+
+@lru_cache(maxsize=DEPTH_PATH_CACHE_SIZE)
+def _compile_path(f: Union[str, Tuple[str, ...]], s: str) -> depthpath:
+    if isinstance(f, tuple):
+        return depthpath(f)
+    if s:
+        return depthpath(tuple(f.split(s)))
+    return depthpath((f,))
+
+
+def compile_path(f: Union[List[str], str], s: str = '.') -> depthpath:
+    """Parse a path once, for fast and repeated get/set/exists calls
+    Parsed paths are kept in a bounded LRU cache (DEPTH_PATH_CACHE_SIZE entries)
+
+    :param f: Path as a string ('a.b[2].c') or as a list of field names
+    :param s: Separator used in a string path
+    :returns: A depthpath object
+    """
+    if isinstance(f, list):
+        try:
+            return _compile_path(tuple(f), s)
+        except TypeError:
+            # Unhashable field names: no cache
+            return depthpath(tuple(f))
+    return _compile_path(f, s)
+
+
+def compile_path_cache_info() -> Any:
+    """Statistics (hits, misses, maxsize, currsize) of the compiled path cache
+    """
+    return _compile_path.cache_info()
+
+
+def compile_path_cache_clear() -> None:
+    """Empty the compiled path cache
+    """
+    _compile_path.cache_clear()
+
+
+class _depthtrie():
+    """Prefix tree of compiled paths: shared path prefixes are walked only once
+    """
+
+    __slots__ = ('children', 'columns')
+
+    def __init__(self) -> None:
+        self.children: Dict[Tuple[str, Optional[int]], _depthtrie] = {}
+        self.columns: List[int] = []
+
+    def add(self, steps: Tuple[Tuple[str, Optional[int]], ...], column: int) -> None:
+        node: _depthtrie = self
+        for step in steps:
+            child: Optional[_depthtrie] = node.children.get(step, None)
+            if child is None:
+                child = _depthtrie()
+                node.children[step] = child
+            node = child
+        node.columns.append(column)
+
+    def walk(self, c_d: Any, row: List[Any]) -> None:
+        for (field_name, list_index), child in self.children.items():
+            value: Any = _get_step(c_d, field_name, list_index)
+            if value is _MISSING:
+                continue
+            for column in child.columns:
+                row[column] = value
+            if child.children:
+                child.walk(value, row)
+
+
+def _to_array(column: List[Any]) -> Union[List[Any], array]:
+    """Convert a column into an array if all its values are integers or all are floats
+    """
+    if not column:
+        return column
+    if all(type(value) is int for value in column):
+        try:
+            return array('q', column)
+        except OverflowError:
+            return column
+    if all(type(value) is float for value in column):
+        return array('d', column)
+    return column
+
+
+def get_depth_columns(records: Iterable[Dict],
+                      paths: List[Union[List[str], str]],
+                      d: Any = None,
+                      s: str = '.',
+                      as_array: bool = False) -> List[Union[List[Any], array]]:
+    """Extract several fields from a list of records into columns
+    Same path syntax and results as depthdict.get_depth, but paths are parsed once
+    and common path prefixes are walked once per record.
+
+    :param records: Records (nested dictionnaries)
+    :param paths: List of paths
+    :param d: Default value for missing fields
+    :param s: Separator used in string paths
+    :param as_array: Convert homogeneous integer or float columns into array.array
+    :returns: One column (list of values, one per record) per path, in paths order
+    """
+    nb_columns: int = len(paths)
+    root: _depthtrie = _depthtrie()
+    for column, f in enumerate(paths):
+        if f:
+            root.add(compile_path(f, s).steps, column)
+    columns: List[List[Any]] = [[] for _ in range(nb_columns)]
+    appends: List[Any] = [column.append for column in columns]
+    for record in records:
+        row: List[Any] = [d] * nb_columns
+        root.walk(record, row)
+        for append, value in zip(appends, row):
+            append(value)
+    if as_array:
+        return [_to_array(column) for column in columns]
+    return columns
+
+
 class depthdict(dict):
+    # How '>' and '>>' write (see tools.dictio durability modes), can be set by instance
+    durability: str = DURABILITY_NONE
+
     def __init__(self, *args, **kw) -> None:
         super(depthdict, self).__init__(*args, **kw)
 
     def to_json(self) -> str:
-        return json.dumps(self)
+        return json_backend().dumps(self)
+
+    @classmethod
+    def iter_jsonl(cls, path: str) -> Iterable['depthdict']:
+        """Lazily read a JSON Lines file (see tools.dictio.iter_jsonl)
+        :param path: JSON Lines file name
+        :returns: A generator of depthdict
+        """
+        return iter_jsonl(path, factory=cls)
 
     def _flat(self,
               fd: Dict[str, List[Dict[str, Any]]],
@@ -33,7 +266,12 @@ class depthdict(dict):
               ref_value: str = None,
               sep: str = '.',
               id_field_name: str = '__id',
-              ref_field_prefix: str = '__ref_') -> None:
+              ref_field_prefix: str = '__ref_',
+              schema: Any = None,
+              id_generator: IdGenerator = uuid_id,
+              index: Optional[int] = None,
+              key_path: Optional[str] = None) -> None:
+        created_record: bool = record is None
         if not fd_key:
             fd_key: str = prefix
             # print("init fd_key with prefix=<%s>" % fd_key)
@@ -50,7 +288,7 @@ class depthdict(dict):
 
             if record is None:
                 record: Dict = {}
-                record[id_field_name] = str(get_uuid())
+                record[id_field_name] = id_generator(fd_key, self, ref_value, index, key_path)
                 if ref_name and ref_value:
                     record['%s%s' % (ref_field_prefix, ref_name)] = ref_value
                 fd[fd_key].append(record)
@@ -69,7 +307,9 @@ class depthdict(dict):
                                   record=record,
                                   sep=sep,
                                   id_field_name=id_field_name,
-                                  ref_field_prefix=ref_field_prefix)
+                                  ref_field_prefix=ref_field_prefix,
+                                  schema=schema,
+                                  id_generator=id_generator)
             elif isinstance(field_value, Dict):
                 # print("  sub:%s" % field_name)
                 depthdict(field_value)._flat(fd, fd_key=fd_key,
@@ -77,29 +317,43 @@ class depthdict(dict):
                                              record=record,
                                              sep=sep,
                                              id_field_name=id_field_name,
-                                             ref_field_prefix=ref_field_prefix)
+                                             ref_field_prefix=ref_field_prefix,
+                                             schema=schema,
+                                             id_generator=id_generator)
             elif isinstance(field_value, List):
-                for elt in self[field_name]:
+                for elt_index, elt in enumerate(self[field_name]):
                     depthdict(elt)._flat(fd, fd_key=field_name,
                                          ref_name=fd_key, ref_value=record[id_field_name],
                                          sep=sep,
                                          id_field_name=id_field_name,
-                                         ref_field_prefix=ref_field_prefix)
+                                         ref_field_prefix=ref_field_prefix,
+                                         schema=schema,
+                                         id_generator=id_generator,
+                                         index=elt_index,
+                                         key_path=field_name_value)
             else:
                 # print("  append field: <%s>=<%s>" % (field_name_value, field_value))
                 record[field_name_value] = field_value
 
+        if created_record and record is not None and schema is not None:
+            schema.add_record(fd_key, record)
+
     def flat(self,
              fd_key: str,
              fd: Dict[str, List[Dict[str, Any]]] = None,
              sep: str = '.',
              id_field_name: str = '__id',
-             ref_field_prefix: str = '__ref__') -> Dict[str, List[Dict[str, Any]]]:
+             ref_field_prefix: str = '__ref__',
+             schema: Any = None,
+             id_generator: Union[str, IdGenerator, None] = None) -> Dict[str, List[Dict[str, Any]]]:
         """Flatten a dictionary into several dictionary lists for transformation into CSV files.
         :param fd_key: Root name
         :param fd: Previous flat call return
         :param sep: Separator used to build concatenate new field names
         :param field_id_name:
+        :param schema: SchemaCollector updated with each flatten record
+        :param id_generator: Record id generator (see tools.recordid.get_id_generator), pass the
+                             same generator object to successive calls sharing the same fd
         :returns: A dictionnary of list of flatten dictionnaries
         """
         if fd is None:
@@ -108,7 +362,9 @@ class depthdict(dict):
                    fd_key=fd_key,
                    sep=sep,
                    id_field_name=id_field_name,
-                   ref_field_prefix=ref_field_prefix)
+                   ref_field_prefix=ref_field_prefix,
+                   schema=schema,
+                   id_generator=get_id_generator(id_generator))
         return fd
 
     def get_int_sorted_keys(self, *args, **kw) -> List:
@@ -122,59 +378,17 @@ class depthdict(dict):
                   d: str = None,
                   s: str = '.'
                   ) -> Any:
-        field_names: List[str] = []
-        if f is None or not f:
+        if f is None or not f or not isinstance(f, (str, list)):
             return d
-        elif isinstance(f, str):
-            if s:
-                field_names = f.split(s)
-            else:
-                field_names = [f]
-        elif isinstance(f, list):
-            field_names = f
-        else:
-            return d
-        len_fields_minus_one: int = len(field_names) - 1
-        c_d: Any = self
-        for i, field_name in enumerate(field_names):
-            flag_list: bool = False
-            z: re.Match[str] | None = re.match(
-                r'^(?P<field_name>[^[]+)\[(?P<list_index>-?[0-9]+)\]$',
-                field_name)
-            if z is not None:
-                flag_list = True
-                field_name: str = z.group('field_name')
-                list_index: int = int(z.group('list_index'))
-                # print("I=<%d>" % list_index)
-            if field_name in c_d:
-                if i == len_fields_minus_one:
-                    if flag_list:
-                        if isinstance(c_d[field_name], List):
-                            # print("LIST")
-                            if (list_index >= 0 and list_index >= len(c_d[field_name])) or \
-                               (list_index < 0 and -list_index > len(c_d[field_name])):
-                                # print("  OOB")
-                                return d
-                            else:
-                                return c_d[field_name][list_index:][0]
-                        else:
-                            return d
-                    else:
-                        return c_d[field_name]
-                else:
-                    if flag_list:
-                        if isinstance(c_d[field_name], List):
-                            if (list_index >= 0 and list_index >= len(c_d[field_name])) or \
-                               (list_index < 0 and -list_index > len(c_d[field_name])):
-                                return d
-                            else:
-                                c_d = c_d[field_name][list_index:][0]
-                        else:
-                            return d
-                    else:
-                        c_d = c_d[field_name]
-            else:
-                return d
+        return compile_path(f, s).get(self, d)
+
+    def exists_depth(self,
+                     f: Union[List[str], str] = None,
+                     s: str = '.'
+                     ) -> bool:
+        if f is None or not f or not isinstance(f, (str, list)):
+            return False
+        return compile_path(f, s).exists(self)
 
     def set_depth(self,
                   f: Union[List[str], str] = None,
@@ -183,58 +397,31 @@ class depthdict(dict):
                   add_in_list: bool = False,
                   uniq: bool = False
                   ) -> Any:
-        field_names: List[str] = []
-        if f is None or not f:
+        if f is None or not f or not isinstance(f, (str, list)):
             return self
-        elif isinstance(f, str):
-            if s:
-                field_names = f.split(s)
-            else:
-                field_names = [f]
-        elif isinstance(f, list):
-            field_names = f
-        else:
-            return self
-        len_fields_minus_one: int = len(field_names) - 1
-        d: Any = self
-        for i, field_name in enumerate(field_names):
-            if i < len_fields_minus_one:
-                if field_name not in d or not isinstance(d, dict):
-                    d[field_name] = {}
-                d = d[field_name]
-            else:
-                if add_in_list:
-                    if field_name not in d or not isinstance(d[field_name], list):
-                        d[field_name] = []
-                    if not uniq or field_name not in d:
-                        d[field_name].append(v)
-                    break
-                else:
-                    d[field_name] = v
-                    break
-        return self
+        return compile_path(f, s).set(self, v, add_in_list=add_in_list, uniq=uniq)
 
     def __gt__(self, other) -> None:
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "w") as f:
-            f.write("%s\n" % (json.dumps(self)))
+        write_text_file(other, "%s\n" % (json_backend().dumps(self)), durability=self.durability)
 
     def __rshift__(self, other) -> None:
+        if isinstance(other, JsonlWriter):
+            other.write(self)
+            return
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "a") as f:
-            f.write("%s\n" % (json.dumps(self)))
+        append_json_line(other, self, durability=self.durability)
 
     def __lt__(self, other) -> None:
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "r") as f:
-            self.clear()
-            self.update(json.loads(f.read()))
+        text: str = read_text_file(other)
+        self.clear()
+        self.update(json_backend().loads(text))
 
     def __lshift__(self, other) -> None:
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "r") as f:
-            self.update(json.loads(f.read()))
+        self.update(json_backend().loads(read_text_file(other)))
@@ -4,30 +4,105 @@
 """
 
 import csv
-from io import BytesIO, StringIO
-from typing import Any, Dict, List
-from zipfile import ZipFile
+import os
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO, StringIO, TextIOWrapper
+from itertools import islice
+from operator import itemgetter
+from tempfile import TemporaryDirectory
+from typing import Any, BinaryIO, Callable, Dict, Final, Generator, Iterable, List, Optional, TextIO, Tuple, Union
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
-from tools.depthdict import depthdict
+from tools.depthdict import compile_path, depthdict
+from tools.depthdict.schema import SchemaCollector
+from tools.recordid import IdGenerator, get_id_generator
+
+CSV_BATCH_SIZE: Final[int] = 1000
+
+CSV_PART_FILE_NAME: Final[str] = '%s.part-%04d.csv'
+_RE_CSV_PART_FILE_NAME: Final[re.Pattern] = re.compile(r'^(.+)\.part-(\d+)\.csv$')
+
+
+def _flat_dicts_shard(args: Tuple) -> Tuple[Dict[str, List[Dict[str, Any]]], Optional[SchemaCollector]]:
+    """Flatten one shard of records (process pool worker)
+    """
+    ld, fd_key, sep, id_field_name, ref_field_prefix, schema_order, id_generator = args
+    schema: Optional[SchemaCollector] = None
+    if schema_order is not None:
+        schema = SchemaCollector(order=schema_order)
+    fd: Dict[str, List[Dict[str, Any]]] = flat_dicts(ld,
+                                                     fd_key=fd_key,
+                                                     sep=sep,
+                                                     id_field_name=id_field_name,
+                                                     ref_field_prefix=ref_field_prefix,
+                                                     schema=schema,
+                                                     id_generator=id_generator)
+    return fd, schema
+
+
+def merge_flat_dicts(fd: Dict[str, List[Dict[str, Any]]],
+                     other_fd: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Append the records of a flat_dicts result to another one
+    :param fd: Dictionnary of list of flatten dictionnaries (updated)
+    :param other_fd: Dictionnary of list of flatten dictionnaries to append
+    :returns: The updated dictionnary
+    """
+    for fd_key in other_fd:
+        if fd_key in fd:
+            fd[fd_key].extend(other_fd[fd_key])
+        else:
+            fd[fd_key] = other_fd[fd_key]
+    return fd
 
 
 def flat_dicts(ld: List[Dict],
                fd_key: str,
                sep: str = '.',
                id_field_name: str = '__id',
-               ref_field_prefix: str = '__ref__') -> Dict[str, List[Dict[str, Any]]]:
+               ref_field_prefix: str = '__ref__',
+               schema: SchemaCollector = None,
+               workers: Optional[int] = None,
+               id_generator: Union[str, IdGenerator, None] = None) -> Dict[str, List[Dict[str, Any]]]:
     """Flatten a list of dictionaries into several dictionary lists for transformation into CSV files.
     :param ld: List of dictionnaries
     :param fd_key: Root name
+    :param schema: SchemaCollector updated while flattening
+    :param workers: Number of processes; the list is split into contiguous shards whose
+                    results are merged in order (same tables, rows and schema as with one process)
+    :param id_generator: Record id generator (see tools.recordid.get_id_generator)
     :returns: A dictionnary of list of flatten dictionnaries
     """
+    if schema is not None and schema.frozen:
+        schema = None
+    id_generator = get_id_generator(id_generator)
     fd: Dict[str, List[Dict[str, Any]]] = {}
+    if workers is not None and workers > 1:
+        if not isinstance(ld, list):
+            ld = list(ld)
+        shard_size: int = max(1, -(-len(ld) // workers))
+        schema_order: Optional[str] = schema.order if schema is not None else None
+        shards: List[Tuple] = [
+            (ld[i:i + shard_size], fd_key, sep, id_field_name, ref_field_prefix, schema_order,
+             id_generator.shard(shard_index) if hasattr(id_generator, 'shard') else id_generator)
+            for shard_index, i in enumerate(range(0, len(ld), shard_size))
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_fd, shard_schema in executor.map(_flat_dicts_shard, shards):
+                merge_flat_dicts(fd, shard_fd)
+                if schema is not None:
+                    schema.merge(shard_schema)
+        return fd
     for elt in ld:
         md = depthdict(elt)
         md.flat(fd_key=fd_key, fd=fd,
                 sep=sep,
                 id_field_name=id_field_name,
-                ref_field_prefix=ref_field_prefix)
+                ref_field_prefix=ref_field_prefix,
+                schema=schema,
+                id_generator=id_generator)
     return fd
 
 
@@ -38,7 +113,7 @@ def build_field_list(el: List[Dict[str, Any]]) -> List[str]:
     """
     field_names: set[str] = set()
     for elt in el:
-        field_names = field_names.union(elt.keys())
+        field_names.update(elt.keys())
     # print("set=<%s>", field_names)
     field_names_list = list(field_names)
     field_names_list.sort()
@@ -58,6 +133,145 @@ def build_field_lists(fd: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[str
     return dh
 
 
+def build_row_getter(fieldnames: List[str]) -> Callable[[Dict[str, Any]], Tuple]:
+    """Build a function projecting a record on field names (KeyError if a field is missing)
+    :param fieldnames: List of field names
+    :returns: Function returning the tuple of values of a record
+    """
+    if len(fieldnames) == 0:
+        return lambda record: ()
+    if len(fieldnames) == 1:
+        field_name: str = fieldnames[0]
+        return lambda record: (record[field_name],)
+    return itemgetter(*fieldnames)
+
+
+def write_csv_records(writer: Any,
+                      fieldnames: List[str],
+                      records: Iterable[Dict[str, Any]],
+                      batch_size: int = CSV_BATCH_SIZE) -> int:
+    """Write records with a csv.writer, like csv.DictWriter(extrasaction='ignore') but faster
+
+    Records are projected on field names by batches with a precomputed getter; a batch
+    containing a record with missing fields falls back to a per field lookup ('' default).
+
+    :param writer: A csv.writer
+    :param fieldnames: List of field names
+    :param records: Records (dictionnaries)
+    :param batch_size: Number of records written by each writerows call
+    :returns: Number of records written
+    """
+    row_getter: Callable[[Dict[str, Any]], Tuple] = build_row_getter(fieldnames)
+    nb_records: int = 0
+    records_iter = iter(records)
+    while True:
+        batch: List[Dict[str, Any]] = list(islice(records_iter, batch_size))
+        if not batch:
+            break
+        try:
+            rows: List[Tuple] = list(map(row_getter, batch))
+        except KeyError:
+            rows: List[Tuple] = [[record.get(field_name, '') for field_name in fieldnames] for record in batch]
+        writer.writerows(rows)
+        nb_records += len(batch)
+    return nb_records
+
+
+class CsvPartWriter():
+    """Rows of one table written in parts (<type_name>.part-0001.csv, ...), each starting with the header
+
+    A new part is started once the current one holds max_rows rows or max_bytes bytes (UTF-8),
+    so a part can exceed max_bytes by at most one row. A table without rows gets one part.
+    It can be used as the writer of write_csv_records.
+    """
+
+    def __init__(self,
+                 type_name: str,
+                 fieldnames: List[str],
+                 open_part: Callable[[str], TextIO],
+                 close_part: Callable[[str, TextIO], None],
+                 dialect: str = 'excel',
+                 delimiter: str = ',',
+                 max_rows: Optional[int] = None,
+                 max_bytes: Optional[int] = None) -> None:
+        """
+        :param type_name: Table name
+        :param fieldnames: List of field names (header of each part)
+        :param open_part: Function opening a part from its file name
+        :param close_part: Function closing a part (file name and opened part)
+        :param dialect: Output format
+        :param delimiter: Output fields separator
+        :param max_rows: Maximum number of rows by part
+        :param max_bytes: Maximum size of a part (bytes)
+        """
+        if (max_rows is not None and max_rows < 1) or (max_bytes is not None and max_bytes < 1):
+            raise Exception("'%s' parts must have a positive max_rows or max_bytes" % (type_name))
+        self.type_name: str = type_name
+        self.fieldnames: List[str] = fieldnames
+        self.open_part: Callable[[str], TextIO] = open_part
+        self.close_part: Callable[[str, TextIO], None] = close_part
+        self.dialect: str = dialect
+        self.delimiter: str = delimiter
+        self.max_rows: Optional[int] = max_rows
+        self.max_bytes: Optional[int] = max_bytes
+        self.file_names: List[str] = []
+        self.file: Optional[TextIO] = None
+        self.nb_rows: int = 0
+        self.nb_bytes: int = 0
+
+    def write(self, s: str) -> int:
+        """Called by the csv.writer of the current part
+        """
+        self.nb_bytes += len(s) if s.isascii() else len(s.encode('utf-8'))
+        return self.file.write(s)
+
+    def _next_part(self) -> None:
+        self._close_part()
+        file_name: str = CSV_PART_FILE_NAME % (self.type_name, len(self.file_names) + 1)
+        self.file_names.append(file_name)
+        self.file = self.open_part(file_name)
+        self.nb_rows = 0
+        self.nb_bytes = 0
+        self.writer = csv.writer(self, dialect=self.dialect, delimiter=self.delimiter)
+        self.writer.writerow(self.fieldnames)
+
+    def _close_part(self) -> None:
+        if self.file is not None:
+            self.close_part(self.file_names[-1], self.file)
+            self.file = None
+
+    def writerows(self, rows: Iterable[Iterable[Any]]) -> None:
+        for row in rows:
+            if self.file is None \
+                    or (self.max_rows is not None and self.nb_rows >= self.max_rows) \
+                    or (self.max_bytes is not None and self.nb_rows > 0 and self.nb_bytes >= self.max_bytes):
+                self._next_part()
+            self.writer.writerow(row)
+            self.nb_rows += 1
+
+    def close(self) -> List[str]:
+        """Close the last part
+
+        :returns: List of part file names
+        """
+        if not self.file_names:
+            self._next_part()
+        self._close_part()
+        return self.file_names
+
+
+def split_csv_table_name(file_name: str) -> Tuple[str, int]:
+    """Table name and part number (0 if not a part) of a CSV file name
+
+    :param file_name: CSV file name (<type_name>.csv or <type_name>.part-0001.csv)
+    :returns: Table name and part number
+    """
+    match = _RE_CSV_PART_FILE_NAME.match(file_name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return file_name[:-len('.csv')], 0
+
+
 def create_csv_file_from_list(fieldnames: List[str],
                               records: List[Dict],
                               dialect: str = 'excel',
@@ -71,42 +285,126 @@ def create_csv_file_from_list(fieldnames: List[str],
     :returns: CSV content
     """
     string_file_in_memory = StringIO()
-    writer: csv.DictWriter = csv.DictWriter(string_file_in_memory,
-                                            fieldnames=fieldnames,
-                                            extrasaction='ignore',
-                                            dialect=dialect,
-                                            delimiter=delimiter)
-    writer.writeheader()
-    for record in records:
-        writer.writerow(record)
+    writer = csv.writer(string_file_in_memory,
+                        dialect=dialect,
+                        delimiter=delimiter)
+    writer.writerow(fieldnames)
+    write_csv_records(writer, fieldnames, records)
     return string_file_in_memory.getvalue()
 
 
+def create_csv_file_parts_from_list(type_name: str,
+                                    fieldnames: List[str],
+                                    records: List[Dict],
+                                    dialect: str = 'excel',
+                                    delimiter: str = ',',
+                                    max_rows: Optional[int] = None,
+                                    max_bytes: Optional[int] = None) -> List[Dict[str, str]]:
+    """Create CSV contents of one table split in parts (see CsvPartWriter)
+
+    :param type_name: Table name
+    :param fieldnames: List of field names
+    :param records: List of records (dictionnaries)
+    :param dialect: Output format
+    :param delimiter: Output fields separator
+    :param max_rows: Maximum number of rows by part
+    :param max_bytes: Maximum size of a part (bytes)
+    :returns: List of CSV contents and filenames
+    """
+    parts: List[Dict[str, str]] = []
+    part_writer: CsvPartWriter = CsvPartWriter(type_name,
+                                               fieldnames,
+                                               lambda file_name: StringIO(),
+                                               lambda file_name, file: parts.append({'content': file.getvalue(),
+                                                                                     'file_name': file_name}),
+                                               dialect=dialect,
+                                               delimiter=delimiter,
+                                               max_rows=max_rows,
+                                               max_bytes=max_bytes)
+    write_csv_records(part_writer, fieldnames, records)
+    part_writer.close()
+    return parts
+
+
+def _create_csv_file_task(args: Tuple) -> Tuple[Union[str, List[Dict[str, str]]], float]:
+    """Create one CSV content (or its parts) and measure its duration (pool worker)
+    """
+    type_name, fieldnames, records, dialect, delimiter, max_rows, max_bytes = args
+    start: float = time.perf_counter()
+    if max_rows is None and max_bytes is None:
+        content: str = create_csv_file_from_list(fieldnames, records, dialect=dialect, delimiter=delimiter)
+        return content, time.perf_counter() - start
+    parts: List[Dict[str, str]] = create_csv_file_parts_from_list(type_name,
+                                                                  fieldnames,
+                                                                  records,
+                                                                  dialect=dialect,
+                                                                  delimiter=delimiter,
+                                                                  max_rows=max_rows,
+                                                                  max_bytes=max_bytes)
+    return parts, time.perf_counter() - start
+
+
 def create_csv_files(fieldnames_dict: Dict[str, List[str]],
                      records_dict: Dict[str, List[Dict[str, Any]]],
                      dialect: str = 'excel',
-                     delimiter: str = ',') -> Dict[str, Dict[str, str]]:
+                     delimiter: str = ',',
+                     workers: Optional[int] = None,
+                     executor: str = 'thread',
+                     max_rows: Optional[int] = None,
+                     max_bytes: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
     """Create in memory CSV contents from field names and dictionnaries
 
+    With max_rows or max_bytes, each table is split in parts (see CsvPartWriter) and
+    its 'content' and 'file_name' are replaced by a 'parts' list of contents and filenames.
+
     :param fieldnames_dict: Dictionnary of list of field names
     :param records_dict: Dictionnary of list of records (dictionnaries)
     :param dialect: Output format
     :param delimiter: Output fields separator
-    :returns: Dictionnary of CSV contents and filenames
+    :param workers: Number of tables rendered concurrently (largest tables are started first)
+    :param executor: Pool used when workers > 1: 'thread' or 'process'
+    :param max_rows: Maximum number of rows by part
+    :param max_bytes: Maximum size of a part (bytes)
+    :returns: Dictionnary of CSV contents, filenames and rendering durations (seconds)
     """
     if not dialect:
         dialect = 'excel'
     if not delimiter:
         delimiter = ','
-    csv_files: Dict[str, str] = {}
+    results: Dict[str, Tuple[str, float]] = {}
+    if workers is not None and workers > 1:
+        if executor not in ('thread', 'process'):
+            raise Exception("'%s' is not a valid executor" % (executor))
+        pool_class: type = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        type_names: List[str] = sorted(fieldnames_dict, key=lambda type_name: len(records_dict[type_name]), reverse=True)
+        with pool_class(max_workers=workers) as pool:
+            futures: Dict[str, Future] = {
+                type_name: pool.submit(_create_csv_file_task,
+                                       (type_name, fieldnames_dict[type_name], records_dict[type_name],
+                                        dialect, delimiter, max_rows, max_bytes))
+                for type_name in type_names
+            }
+            for type_name, future in futures.items():
+                results[type_name] = future.result()
+    else:
+        for type_name in fieldnames_dict:
+            results[type_name] = _create_csv_file_task((type_name, fieldnames_dict[type_name], records_dict[type_name],
+                                                        dialect, delimiter, max_rows, max_bytes))
+
+    csv_files: Dict[str, Dict[str, Any]] = {}
     for type_name in fieldnames_dict:
-        csv_files[type_name] = {
-            'content': create_csv_file_from_list(fieldnames_dict[type_name],
-                                                 records_dict[type_name],
-                                                 dialect=dialect,
-                                                 delimiter=delimiter),
-            'file_name': '%s.csv' % (type_name),
-        }
+        content, duration = results[type_name]
+        if isinstance(content, list):
+            csv_files[type_name] = {
+                'parts': content,
+                'duration': duration,
+            }
+        else:
+            csv_files[type_name] = {
+                'content': content,
+                'file_name': '%s.csv' % (type_name),
+                'duration': duration,
+            }
     return csv_files
 
 
@@ -116,7 +414,12 @@ def create_csv_files_from_dict_list(dict_list: List[Dict],
                                     id_field_name: str = '__id',
                                     ref_field_prefix: str = '__ref__',
                                     csv_dialect: str = 'excel',
-                                    csv_delimiter: str = ','
+                                    csv_delimiter: str = ',',
+                                    schema: SchemaCollector = None,
+                                    workers: Optional[int] = None,
+                                    id_generator: Union[str, IdGenerator, None] = None,
+                                    max_rows: Optional[int] = None,
+                                    max_bytes: Optional[int] = None
                                     ) -> Dict[str, Dict[str, str]]:
     """Create in memory CSV contents from dictionnary list
 
@@ -124,41 +427,373 @@ def create_csv_files_from_dict_list(dict_list: List[Dict],
     :param fd_key: Root name
     :param dialect: CSV Output format
     :param delimiter: CSV output fields separator
+    :param schema: SchemaCollector filled while flattening, or a frozen one (e.g. loaded
+                   from a previous export) whose field lists are used without inference
+    :param workers: Number of processes used to flatten records (see flat_dicts)
+    :param id_generator: Record id generator (see tools.recordid.get_id_generator)
+    :param max_rows: Maximum number of rows by CSV part (see create_csv_files)
+    :param max_bytes: Maximum size of a CSV part (bytes)
     :returns: Dictionnary of CSV contents and filenames
     """
+    if schema is None:
+        schema = SchemaCollector()
+
     # Flat records
     records_dict: Dict[str, List[Dict[str, Any]]] = flat_dicts(dict_list,
                                                                fd_key=fd_key,
                                                                sep=sep,
                                                                id_field_name=id_field_name,
-                                                               ref_field_prefix=ref_field_prefix)
+                                                               ref_field_prefix=ref_field_prefix,
+                                                               schema=schema,
+                                                               workers=workers,
+                                                               id_generator=id_generator)
 
-    # Build fieldnames
-    fieldnames_dict: Dict[str, List[str]] = build_field_lists(records_dict)
+    # Build fieldnames (tables unknown by a frozen schema are inferred)
+    fieldnames_dict: Dict[str, List[str]] = {}
+    for type_name in records_dict:
+        if type_name in schema.tables:
+            fieldnames_dict[type_name] = schema.field_names(type_name)
+        else:
+            fieldnames_dict[type_name] = build_field_list(records_dict[type_name])
 
     # Create CSV files
     csv_files: Dict[str, Dict[str, str]] = create_csv_files(fieldnames_dict,
                                                             records_dict,
                                                             dialect=csv_dialect,
-                                                            delimiter=csv_delimiter)
+                                                            delimiter=csv_delimiter,
+                                                            max_rows=max_rows,
+                                                            max_bytes=max_bytes)
     return csv_files
 
 
+def _iter_content_chunks(content: Any) -> Generator[bytes, None, None]:
+    """Bytes chunks of a file content: str, bytes, file-like object or iterable of str/bytes
+    """
+    if isinstance(content, str):
+        yield content.encode('utf-8')
+    elif isinstance(content, (bytes, bytearray)):
+        yield bytes(content)
+    elif hasattr(content, 'read'):
+        while True:
+            chunk: Union[str, bytes] = content.read(1024 * 1024)
+            if not chunk:
+                break
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+    else:
+        for chunk in content:
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _write_zip_entry(zipfile: ZipFile, full_file_name: str, content: Any) -> None:
+    """Write one entry, streamed if the content size is unknown
+    """
+    if isinstance(content, (str, bytes, bytearray)):
+        zipfile.writestr(full_file_name, data=content)
+    else:
+        with zipfile.open(full_file_name, mode='w', force_zip64=True) as zip_entry:
+            for chunk in _iter_content_chunks(content):
+                zip_entry.write(chunk)
+
+
+def write_zip_file(target: Union[str, BinaryIO],
+                   files: Dict[str, Dict[str, Any]],
+                   internal_dir_name: str = None,
+                   compression: int = ZIP_DEFLATED,
+                   compresslevel: Optional[int] = None) -> None:
+    """Write a Zip file directly to a file name or a writable binary stream (file, socket file...)
+
+    Contents can be strings, bytes, file-like objects or iterables (e.g. generators) of
+    strings/bytes chunks; file-like and iterable contents are streamed.
+
+    :param target: Zip file name or writable binary stream (seekable or not)
+    :param files: Dictionnary of contents and filenames, or of 'parts' lists of them (see create_csv_files)
+    :param internal_dir_name: Internal directory name
+    :param compression: ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2 or ZIP_LZMA
+    :param compresslevel: Compression level (see zipfile.ZipFile)
+    """
+    entries: List[Tuple[str, Any]] = []
+    for type_name in files:
+        for file in files[type_name].get('parts', [files[type_name]]):
+            full_file_name: str = file['file_name']
+            if internal_dir_name:
+                full_file_name = '/'.join([internal_dir_name, full_file_name])
+            entries.append((full_file_name, file['content']))
+
+    with ZipFile(target, mode='w', compression=compression, compresslevel=compresslevel) as zipfile:
+        for full_file_name, content in entries:
+            _write_zip_entry(zipfile, full_file_name, content)
+
+
 def create_zip_files(files: Dict[str, Dict[str, str]],
-                     internal_dir_name: str = None) -> bytes:
+                     internal_dir_name: str = None,
+                     compression: int = ZIP_STORED,
+                     compresslevel: Optional[int] = None) -> bytes:
     """Create Zip files from CSV contents and filenames
 
     :param files: Dictionnary of CSV contents and filenames
     :param internal_dir_name: inernal directory name
+    :param compression: ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2 or ZIP_LZMA
+    :param compresslevel: Compression level (see zipfile.ZipFile)
     :returns: Zip file content
     """
     zip_bytes_in_memory: BytesIO = BytesIO()
-    zipfile = ZipFile(zip_bytes_in_memory, mode='w')
-    for type_name in files:
-        file: Dict[str, str] = files[type_name]
-        full_file_name: str = file['file_name']
-        if internal_dir_name:
-            full_file_name = '/'.join([internal_dir_name, full_file_name])
-        zipfile.writestr('%s' % (full_file_name), data=file['content'])
-    zipfile.close()
+    write_zip_file(zip_bytes_in_memory,
+                   files,
+                   internal_dir_name=internal_dir_name,
+                   compression=compression,
+                   compresslevel=compresslevel)
     return zip_bytes_in_memory.getvalue()
+
+
+class _CsvSpill():
+    """Temporary CSV rows of one table, written with columns in first appearance order
+    Rows written before a column was discovered are shorter and padded when read back.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name: str = file_name
+        self.file: TextIO = open(file_name, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.columns: List[str] = []
+        self.columns_index: Dict[str, int] = {}
+        self.nb_records: int = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        for field_name in record:
+            if field_name not in self.columns_index:
+                self.columns_index[field_name] = len(self.columns)
+                self.columns.append(field_name)
+        self.writer.writerow([record.get(field_name, '') for field_name in self.columns])
+        self.nb_records += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+    def copy_to(self, writer: Any, fieldnames: List[str]) -> None:
+        """Write the rows (without header) with a csv.writer or a CsvPartWriter
+        """
+        self.close()
+        positions: List[int] = [self.columns_index[field_name] for field_name in fieldnames]
+        nb_columns: int = len(self.columns)
+        with open(self.file_name, 'r', encoding='utf-8', newline='') as spill_file:
+            rows: Iterable[List[str]] = csv.reader(spill_file)
+            writer.writerows(([row[position] for position in positions] if len(row) == nb_columns
+                              else [(row[position] if position < len(row) else '') for position in positions])
+                             for row in rows)
+
+
+def create_csv_files_from_dict_iter(dict_iter: Iterable[Dict],
+                                    fd_key: str,
+                                    output: Union[str, ZipFile],
+                                    internal_dir_name: str = None,
+                                    sep: str = '.',
+                                    id_field_name: str = '__id',
+                                    ref_field_prefix: str = '__ref__',
+                                    csv_dialect: str = 'excel',
+                                    csv_delimiter: str = ',',
+                                    id_generator: Union[str, IdGenerator, None] = None,
+                                    max_rows: Optional[int] = None,
+                                    max_bytes: Optional[int] = None
+                                    ) -> Dict[str, Dict[str, Any]]:
+    """Create CSV files from an iterator of dictionnaries without holding the whole dataset in memory
+
+    Each record is flattened then its rows are spilled into temporary files, one per table.
+    Columns discovered late are handled when the final CSV files are written (second pass),
+    so memory stays bounded by one record (plus field names).
+
+    :param dict_iter: Iterable of dictionnaries (records)
+    :param fd_key: Root name
+    :param output: Directory name or an opened ZipFile (mode 'w' or 'a')
+    :param internal_dir_name: Internal directory name (ZipFile output only)
+    :param csv_dialect: CSV Output format
+    :param csv_delimiter: CSV output fields separator
+    :param id_generator: Record id generator (see tools.recordid.get_id_generator)
+    :param max_rows: Maximum number of rows by CSV part (see CsvPartWriter)
+    :param max_bytes: Maximum size of a CSV part (bytes)
+    :returns: Dictionnary of CSV filenames (or 'file_names' of parts) and number of records
+    """
+    id_generator = get_id_generator(id_generator)
+    if not csv_dialect:
+        csv_dialect = 'excel'
+    if not csv_delimiter:
+        csv_delimiter = ','
+    csv_files: Dict[str, Dict[str, Any]] = {}
+    with TemporaryDirectory() as tmp_dir_name, ExitStack() as spill_files:
+        spills: Dict[str, _CsvSpill] = {}
+        for elt in dict_iter:
+            fd: Dict[str, List[Dict[str, Any]]] = depthdict(elt).flat(fd_key=fd_key,
+                                                                      sep=sep,
+                                                                      id_field_name=id_field_name,
+                                                                      ref_field_prefix=ref_field_prefix,
+                                                                      id_generator=id_generator)
+            for type_name in fd:
+                spill: _CsvSpill = spills.get(type_name, None)
+                if spill is None:
+                    spill = _CsvSpill(os.path.join(tmp_dir_name, '%d.csv' % (len(spills))))
+                    spill_files.callback(spill.close)
+                    spills[type_name] = spill
+                for record in fd[type_name]:
+                    spill.write(record)
+
+        if isinstance(output, str):
+            os.makedirs(output, exist_ok=True)
+
+        def full_name(file_name: str) -> str:
+            if isinstance(output, ZipFile):
+                return '/'.join([internal_dir_name, file_name]) if internal_dir_name else file_name
+            return os.path.join(output, file_name)
+
+        def open_part(file_name: str) -> TextIO:
+            if isinstance(output, ZipFile):
+                return TextIOWrapper(output.open(full_name(file_name), mode='w', force_zip64=True), encoding='utf-8', newline='')
+            return open(full_name(file_name), 'w', encoding='utf-8', newline='')
+
+        for type_name in spills:
+            spill: _CsvSpill = spills[type_name]
+            fieldnames: List[str] = sorted(spill.columns)
+            if max_rows is None and max_bytes is None:
+                file_name: str = '%s.csv' % (type_name)
+                with open_part(file_name) as csv_file:
+                    writer = csv.writer(csv_file, dialect=csv_dialect, delimiter=csv_delimiter)
+                    writer.writerow(fieldnames)
+                    spill.copy_to(writer, fieldnames)
+                csv_files[type_name] = {
+                    'file_name': full_name(file_name),
+                    'nb_records': spill.nb_records,
+                }
+            else:
+                part_writer: CsvPartWriter = CsvPartWriter(type_name,
+                                                           fieldnames,
+                                                           open_part,
+                                                           lambda file_name, file: file.close(),
+                                                           dialect=csv_dialect,
+                                                           delimiter=csv_delimiter,
+                                                           max_rows=max_rows,
+                                                           max_bytes=max_bytes)
+                spill.copy_to(part_writer, fieldnames)
+                csv_files[type_name] = {
+                    'file_names': [full_name(file_name) for file_name in part_writer.close()],
+                    'nb_records': spill.nb_records,
+                }
+    return csv_files
+
+
+def read_csv_files(source: Union[str, ZipFile],
+                   internal_dir_name: str = None,
+                   dialect: str = 'excel',
+                   delimiter: str = ',') -> Dict[str, List[Dict[str, str]]]:
+    """Read CSV files created by create_csv_files (directory, Zip file name or opened ZipFile)
+
+    Parts of a table (<type_name>.part-0001.csv, ...) are read in order into the same list.
+
+    :param source: Directory name, Zip file name or opened ZipFile
+    :param internal_dir_name: Internal directory name (Zip files only)
+    :param dialect: CSV format
+    :param delimiter: CSV fields separator
+    :returns: Dictionnary of list of records (values are strings)
+    """
+    if not dialect:
+        dialect = 'excel'
+    if not delimiter:
+        delimiter = ','
+    records_dict: Dict[str, List[Dict[str, str]]] = {}
+    if isinstance(source, str) and os.path.isdir(source):
+        file_names: List[str] = [file_name for file_name in os.listdir(source) if file_name.endswith('.csv')]
+        for file_name in sorted(file_names, key=split_csv_table_name):
+            with open(os.path.join(source, file_name), 'r', encoding='utf-8', newline='') as csv_file:
+                records_dict.setdefault(split_csv_table_name(file_name)[0], []).extend(
+                    csv.DictReader(csv_file, dialect=dialect, delimiter=delimiter))
+        return records_dict
+    zipfile: ZipFile = source if isinstance(source, ZipFile) else ZipFile(source, mode='r')
+    try:
+        dir_prefix: str = '%s/' % (internal_dir_name) if internal_dir_name else ''
+        file_names: List[str] = []
+        for full_file_name in zipfile.namelist():
+            if full_file_name.startswith(dir_prefix) and full_file_name.endswith('.csv'):
+                file_name: str = full_file_name[len(dir_prefix):]
+                if '/' not in file_name:
+                    file_names.append(file_name)
+        for file_name in sorted(file_names, key=split_csv_table_name):
+            with zipfile.open(dir_prefix + file_name, mode='r') as zip_entry:
+                with TextIOWrapper(zip_entry, encoding='utf-8', newline='') as text_entry:
+                    records_dict.setdefault(split_csv_table_name(file_name)[0], []).extend(
+                        csv.DictReader(text_entry, dialect=dialect, delimiter=delimiter))
+    finally:
+        if zipfile is not source:
+            zipfile.close()
+    return records_dict
+
+
+def unflat_dicts(records_dict: Dict[str, List[Dict[str, Any]]],
+                 fd_key: str,
+                 sep: str = '.',
+                 id_field_name: str = '__id',
+                 ref_field_prefix: str = '__ref__',
+                 keep_ids: bool = False,
+                 skip_empty_values: bool = False) -> Generator[Dict[str, Any], None, None]:
+    """Rebuild nested dictionnaries from flatten records (reverse of flat_dicts)
+
+    Child records are found with hash indexes on id and reference fields (one pass per table),
+    then nested dictionnaries are yielded one root record at a time.
+    Child lists are set at the top level of their parent record, under their table name.
+
+    :param records_dict: Dictionnary of list of flatten records (flat_dicts or read_csv_files result)
+    :param fd_key: Root name
+    :param sep: Separator used in field names
+    :param id_field_name: Id field name
+    :param ref_field_prefix: Reference field names prefix
+    :param keep_ids: Keep id and reference fields
+    :param skip_empty_values: Ignore empty string values (missing values in CSV files)
+    :returns: A generator of nested dictionnaries
+    """
+    # (parent table, parent id) -> child table -> child records
+    children_index: Dict[Tuple[str, Any], Dict[str, List[Dict[str, Any]]]] = {}
+    ref_field_names: set[str] = set()
+    for type_name, records in records_dict.items():
+        table_ref_field_names: set[str] = set()
+        for record in records:
+            for field_name in record:
+                if field_name.startswith(ref_field_prefix):
+                    table_ref_field_names.add(field_name)
+        ref_field_names.update(table_ref_field_names)
+        for record in records:
+            for ref_field_name in table_ref_field_names:
+                ref_value: Any = record.get(ref_field_name, None)
+                if ref_value is None or ref_value == '':
+                    continue
+                parent_key: Tuple[str, Any] = (ref_field_name[len(ref_field_prefix):], ref_value)
+                children: Optional[Dict[str, List[Dict[str, Any]]]] = children_index.get(parent_key, None)
+                if children is None:
+                    children = {}
+                    children_index[parent_key] = children
+                if type_name in children:
+                    children[type_name].append(record)
+                else:
+                    children[type_name] = [record]
+
+    def fields(record: Dict[str, Any]) -> Dict[str, Any]:
+        d: Dict[str, Any] = {}
+        for field_name, value in record.items():
+            if not keep_ids and (field_name == id_field_name or field_name in ref_field_names):
+                continue
+            if skip_empty_values and value == '':
+                continue
+            compile_path(field_name, sep).set(d, value)
+        return d
+
+    for root_record in records_dict.get(fd_key, []):
+        root: Dict[str, Any] = fields(root_record)
+        # Explicit stack of (table name, record, nested dictionnary), no recursion limit on nesting depth
+        stack: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = [(fd_key, root_record, root)]
+        while stack:
+            type_name, record, d = stack.pop()
+            children: Optional[Dict[str, List[Dict[str, Any]]]] = children_index.get((type_name, record.get(id_field_name, None)), None)
+            if children:
+                for child_type_name, child_records in children.items():
+                    child_list: List[Dict[str, Any]] = []
+                    for child_record in child_records:
+                        child: Dict[str, Any] = fields(child_record)
+                        child_list.append(child)
+                        stack.append((child_type_name, child_record, child))
+                    d[child_type_name] = child_list
+        yield root
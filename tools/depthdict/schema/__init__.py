@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+
+"""Incremental schema (field names and statistics) of flatten dictionnaries
+"""
+
+from typing import Any, Dict, Final, List, Optional
+
+from tools.jsonbackend import json_backend
+
+order_sorted:     Final[str] = 'sorted'
+order_appearance: Final[str] = 'appearance'
+
+
+class SchemaCollector():
+    """Collect field names and per-column statistics of flatten records, table by table
+
+    The collector is updated in place by the flattener (see depthdict.flat(schema=...)).
+    A frozen collector (e.g. loaded from a file) is never updated: repeated exports of the
+    same record shape reuse its field lists and skip inference.
+    """
+
+    def __init__(self, order: str = order_sorted, frozen: bool = False) -> None:
+        """
+        :param order: Field names order: 'sorted' or 'appearance' (first appearance)
+        :param frozen: Do not update the collector
+        """
+        if order not in (order_sorted, order_appearance):
+            raise Exception("'%s' is not a valid field names order" % (order))
+        self.order: str = order
+        self.frozen: bool = frozen
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.nb_records: Dict[str, int] = {}
+
+    def add_record(self, table: str, record: Dict[str, Any]) -> None:
+        """Add a flatten record
+        :param table: Table name
+        :param record: Flatten record
+        """
+        if self.frozen:
+            return
+        columns: Optional[Dict[str, Dict[str, Any]]] = self.tables.get(table, None)
+        if columns is None:
+            columns = {}
+            self.tables[table] = columns
+            self.nb_records[table] = 0
+        self.nb_records[table] += 1
+        for field_name, value in record.items():
+            stats: Optional[Dict[str, Any]] = columns.get(field_name, None)
+            if stats is None:
+                stats = {'nb_values': 0, 'nb_nulls': 0, 'types': {}}
+                columns[field_name] = stats
+            if value is None:
+                stats['nb_nulls'] += 1
+            else:
+                stats['nb_values'] += 1
+                types: Dict[str, int] = stats['types']
+                type_name: str = type(value).__name__
+                types[type_name] = types.get(type_name, 0) + 1
+
+    def merge(self, other: 'SchemaCollector') -> 'SchemaCollector':
+        """Merge another collector in this one (appearance order: this one first)
+        :param other: Another collector
+        :returns: This collector
+        """
+        for table, other_columns in other.tables.items():
+            columns: Optional[Dict[str, Dict[str, Any]]] = self.tables.get(table, None)
+            if columns is None:
+                columns = {}
+                self.tables[table] = columns
+                self.nb_records[table] = 0
+            self.nb_records[table] += other.nb_records[table]
+            for field_name, other_stats in other_columns.items():
+                stats: Optional[Dict[str, Any]] = columns.get(field_name, None)
+                if stats is None:
+                    stats = {'nb_values': 0, 'nb_nulls': 0, 'types': {}}
+                    columns[field_name] = stats
+                stats['nb_values'] += other_stats['nb_values']
+                stats['nb_nulls'] += other_stats['nb_nulls']
+                for type_name, nb in other_stats['types'].items():
+                    stats['types'][type_name] = stats['types'].get(type_name, 0) + nb
+        return self
+
+    def field_names(self, table: str) -> List[str]:
+        """List of field names of a table
+        :param table: Table name
+        :returns: List of field names
+        """
+        field_names: List[str] = list(self.tables.get(table, {}))
+        if self.order == order_sorted:
+            field_names.sort()
+        return field_names
+
+    def field_lists(self) -> Dict[str, List[str]]:
+        """Lists of field names of all tables (same result as csv.build_field_lists)
+        :returns: Dictionnary of list of field names
+        """
+        return {table: self.field_names(table) for table in self.tables}
+
+    def column_stats(self, table: str, field_name: str) -> Dict[str, Any]:
+        """Statistics of a column
+        :param table: Table name
+        :param field_name: Field name
+        :returns: Number of values, nulls (None values), missing values and value types
+        """
+        stats: Dict[str, Any] = self.tables[table][field_name]
+        return {
+            'nb_values': stats['nb_values'],
+            'nb_nulls': stats['nb_nulls'],
+            'nb_missing': self.nb_records[table] - stats['nb_values'] - stats['nb_nulls'],
+            'types': dict(stats['types']),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'order': self.order,
+            'nb_records': self.nb_records,
+            'tables': self.tables,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], frozen: bool = True) -> 'SchemaCollector':
+        schema: SchemaCollector = cls(order=d.get('order', order_sorted), frozen=frozen)
+        schema.nb_records = dict(d.get('nb_records', {}))
+        schema.tables = d.get('tables', {})
+        return schema
+
+    def save(self, file_name: str) -> None:
+        """Save the collector into a JSON file
+        :param file_name: File name
+        """
+        with open(file_name, 'w') as f:
+            f.write("%s\n" % (json_backend().dumps(self.to_dict())))
+
+    @classmethod
+    def load(cls, file_name: str, frozen: bool = True) -> 'SchemaCollector':
+        """Load a collector saved with save()
+        :param file_name: File name
+        :param frozen: Do not update the loaded collector
+        :returns: The collector
+        """
+        with open(file_name, 'r') as f:
+            return cls.from_dict(json_backend().loads(f.read()), frozen=frozen)
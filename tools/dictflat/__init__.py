@@ -2,9 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import re
-from typing import Any, Callable, Dict, Final, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Final, FrozenSet, Generator, Iterable, List, Optional, Tuple, Union
 from uuid import uuid4
 
+from tools.recordid import IdGenerator, get_id_generator
+
 
 def get_uuid() -> str:
     return str(uuid4())
@@ -14,127 +18,364 @@ __RE_UPPER_LETTER: Final[re.Pattern[str]] = re.compile(r'(?<!^)(?=[A-Z])')
 __RE_MULTIPLE_UNDERSCORE: Final[re.Pattern[str]] = re.compile(r'_+')
 
 
+SNAKECASE_CACHE_SIZE: Final[int] = 4096
+
+
 def str_2_snakecase(fn: str) -> str:
+    if fn.islower() and '__' not in fn:
+        # Already snake case: nothing to substitute
+        return fn
     return __RE_MULTIPLE_UNDERSCORE.sub('_', __RE_UPPER_LETTER.sub('_', fn).lower())
 
 
-def __flat(d: Dict,
-           flatten_dict: Dict[str, List[Dict[str, Any]]],
-           flat_dict_key: str = '',
-           fieldname_prefix: str = '',
-           current_dict: Dict = None,
-           ref_name: str = None,
-           ref_value: str = None,
-           sep: str = '.',
-           id_field_name: str = '__id',
-           ref_field_prefix: str = '__ref_',
-           snakecase_fieldnames: bool = False,
-           rename_values: Dict[str, str] = None,
-           rename_list: Dict[str, str] = None,
-           filter_values: Dict[str, Callable] = None,
-           drop_values: List[str] = None,
-           drop_objects: List[str] = None,
-           use_nested: bool = True) -> None:
-
-    if snakecase_fieldnames:
-        fieldname_prefix = str_2_snakecase(fieldname_prefix)
-    if not flat_dict_key:
-        flat_dict_key = fieldname_prefix
-    elif snakecase_fieldnames:
-        flat_dict_key = str_2_snakecase(flat_dict_key)
-    if rename_list and flat_dict_key in rename_list:
-        flat_dict_key = rename_list[flat_dict_key]
-
-    for field_name in d:
-        if flatten_dict.get(flat_dict_key, None) is None:
-            flatten_dict[flat_dict_key] = []
-
-        if current_dict is None:
-            current_dict: Dict = {}
-            current_dict[id_field_name] = get_uuid()
-            if ref_name and ref_value:
-                current_dict['%s%s' % (ref_field_prefix, ref_name)] = ref_value
-            flatten_dict[flat_dict_key].append(current_dict)
-
-        if snakecase_fieldnames:
-            field_name_value: str = str_2_snakecase(field_name)
+@lru_cache(maxsize=SNAKECASE_CACHE_SIZE)
+def str_2_snakecase_cached(fn: str) -> str:
+    """str_2_snakecase with a bounded LRU cache (see str_2_snakecase_cache_info)
+    """
+    return str_2_snakecase(fn)
+
+
+def str_2_snakecase_cache_info() -> Any:
+    """Statistics (hits, misses, maxsize, currsize) of the str_2_snakecase_cached cache
+    """
+    return str_2_snakecase_cached.cache_info()
+
+
+class ColumnTable():
+    """Column store of one flattened table: column name -> list of values
+
+    All columns share the same row count (nb_rows). A presence mask (bytearray) per column
+    tells if the field was set in each row (1, even when its value is None) or missing
+    (0, value None), so explicit None values and missing fields can be told apart.
+    Columns discovered late are padded lazily, so setting a field only touches its column.
+    """
+
+    def __init__(self) -> None:
+        self.nb_rows: int = 0
+        self.columns: Dict[str, List[Any]] = {}
+        self.presence: Dict[str, bytearray] = {}
+
+    def add_row(self) -> int:
+        """Add an empty row and return its index
+        """
+        self.nb_rows += 1
+        return self.nb_rows - 1
+
+    def set(self, row: int, field_name: str, value: Any) -> None:
+        """Set a field of a row
+        """
+        column: Optional[List[Any]] = self.columns.get(field_name, None)
+        if column is None:
+            column = []
+            self.columns[field_name] = column
+            self.presence[field_name] = bytearray()
+        presence: bytearray = self.presence[field_name]
+        if len(column) <= row:
+            presence.extend(bytes(self.nb_rows - len(column)))
+            column.extend([None] * (self.nb_rows - len(column)))
+        column[row] = value
+        presence[row] = 1
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Append a flattened row
+        """
+        row_index: int = self.add_row()
+        for field_name, value in row.items():
+            self.set(row_index, field_name, value)
+
+    def _pad(self, field_name: str) -> None:
+        column: List[Any] = self.columns[field_name]
+        if len(column) < self.nb_rows:
+            self.presence[field_name].extend(bytes(self.nb_rows - len(column)))
+            column.extend([None] * (self.nb_rows - len(column)))
+
+    def column(self, field_name: str) -> List[Any]:
+        """Values of a column (None where the field is missing)
+        """
+        self._pad(field_name)
+        return self.columns[field_name]
+
+    def presence_mask(self, field_name: str) -> bytearray:
+        """Presence mask of a column (1: set, possibly to None, 0: missing)
+        """
+        self._pad(field_name)
+        return self.presence[field_name]
+
+    def field_names(self) -> List[str]:
+        return list(self.columns)
+
+    def to_records(self) -> Generator[Dict[str, Any], None, None]:
+        """Rebuild the flattened rows (missing fields are not set)
+        """
+        field_names: List[str] = self.field_names()
+        columns: List[List[Any]] = [self.column(field_name) for field_name in field_names]
+        masks: List[bytearray] = [self.presence_mask(field_name) for field_name in field_names]
+        for i in range(self.nb_rows):
+            yield {field_name: column[i] for field_name, column, mask in zip(field_names, columns, masks) if mask[i]}
+
+
+class _ColumnRow():
+    """Row of a ColumnTable filled by FlatPlan: fields are written straight into the columns
+    """
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table: ColumnTable) -> None:
+        self.table: ColumnTable = table
+        self.row: int = table.add_row()
+
+    def __setitem__(self, field_name: str, value: Any) -> None:
+        self.table.set(self.row, field_name, value)
+
+    def __getitem__(self, field_name: str) -> Any:
+        return self.table.columns[field_name][self.row]
+
+
+_DICT_FRAME: Final[int] = 0
+_LIST_FRAME: Final[int] = 1
+
+DEFAULT_NAME_CACHE_SIZE: Final[int] = 65536
+
+
+class FlatPlan():
+    """Flatten options compiled once, applied by an iterative (explicit stack) engine
+
+    The engine handles any nesting depth (no recursion) and gives the same result as the
+    former recursive implementation: rows are created in depth-first order.
+
+    Rename, drop, filter and snake case rules are resolved once per (prefix, field name) and
+    memoized (up to name_cache_size entries per cache), so records of the same shape pay the
+    rules cost only once. A plan can be applied to a stream of records (see flat_stream).
+    """
+
+    def __init__(self,
+                 flat_dict_key: str,
+                 sep: str = '.',
+                 id_field_name: str = '__id',
+                 ref_field_prefix: str = '__ref__',
+                 snakecase_fieldnames: bool = False,
+                 rename_values: Dict[str, str] = None,
+                 rename_list: Dict[str, str] = None,
+                 filter_values: Dict[str, Callable] = None,
+                 drop_values: List[str] = None,
+                 drop_objects: List[str] = None,
+                 use_nested: bool = True,
+                 id_generator: Union[str, IdGenerator, None] = None,
+                 name_cache_size: int = DEFAULT_NAME_CACHE_SIZE) -> None:
+        self.flat_dict_key: str = flat_dict_key
+        self.sep: str = sep
+        self.id_field_name: str = id_field_name
+        self.ref_field_prefix: str = ref_field_prefix
+        self.snakecase_fieldnames: bool = snakecase_fieldnames
+        self.rename_values: Dict[str, str] = rename_values or {}
+        self.rename_list: Dict[str, str] = rename_list or {}
+        self.filter_values: Dict[str, Callable] = filter_values or {}
+        self.drop_values: FrozenSet[str] = frozenset(drop_values or ())
+        self.drop_objects: FrozenSet[str] = frozenset(drop_objects or ())
+        self.use_nested: bool = use_nested
+        self.id_generator: IdGenerator = get_id_generator(id_generator)
+        self.name_cache_size: int = name_cache_size
+        # (table name, field name prefix) -> (resolved table name, resolved prefix, columns cache)
+        self._frame_names: Dict[Tuple[str, str], Tuple[str, str, Dict]] = {}
+        # resolved prefix -> field name -> (column name, drop object, keep value, filter function)
+        self._columns: Dict[str, Dict[Any, Tuple[str, bool, bool, Optional[Callable]]]] = {}
+
+    def _resolve_frame_names(self, flat_dict_key: str, fieldname_prefix: str) -> Tuple[str, str, Dict]:
+        """Resolve the table name and the field name prefix of a dictionary
+        """
+        if self.snakecase_fieldnames:
+            fieldname_prefix = str_2_snakecase_cached(fieldname_prefix)
+        if not flat_dict_key:
+            flat_dict_key = fieldname_prefix
+        elif self.snakecase_fieldnames:
+            flat_dict_key = str_2_snakecase_cached(flat_dict_key)
+        if flat_dict_key in self.rename_list:
+            flat_dict_key = self.rename_list[flat_dict_key]
+        columns: Optional[Dict] = self._columns.get(fieldname_prefix, None)
+        if columns is None:
+            columns = {}
+            if len(self._columns) < self.name_cache_size:
+                self._columns[fieldname_prefix] = columns
+        return flat_dict_key, fieldname_prefix, columns
+
+    def _resolve_column(self, fieldname_prefix: str, field_name: Any) -> Tuple[str, bool, bool, Optional[Callable]]:
+        """Resolve the column name and the rules of a field
+        """
+        if self.snakecase_fieldnames:
+            field_name_value: str = str_2_snakecase_cached(field_name)
         else:
             field_name_value: str = field_name
         if fieldname_prefix:
-            field_name_value = '%s%s%s' % (fieldname_prefix, sep, field_name_value)
-        if rename_values and field_name_value in rename_values:
-            field_name_value = rename_values[field_name_value]
-
-        field_value: Any = d[field_name]
-
-        if use_nested and isinstance(field_value, dict):
-            if not drop_objects or field_name not in drop_objects:
-                __flat(field_value,
-                       flatten_dict,
-                       flat_dict_key=flat_dict_key,
-                       fieldname_prefix=field_name_value,
-                       current_dict=current_dict,
-                       sep=sep,
-                       id_field_name=id_field_name,
-                       ref_field_prefix=ref_field_prefix,
-                       snakecase_fieldnames=snakecase_fieldnames,
-                       rename_values=rename_values,
-                       rename_list=rename_list,
-                       filter_values=filter_values,
-                       drop_values=drop_values,
-                       drop_objects=drop_objects,
-                       use_nested=use_nested)
-        elif isinstance(field_value, list) or isinstance(field_value, tuple) or not use_nested and isinstance(field_value, dict):
-            if isinstance(field_value, dict):
-                field_value = [field_value]
-            if not drop_objects or field_name not in drop_objects:
-                if len(field_value) > 0 and isinstance(field_value[0], dict):
-                    for elt in field_value:
-                        __flat(elt,
-                               flatten_dict,
-                               flat_dict_key=field_name,
-                               ref_name=flat_dict_key,
-                               ref_value=current_dict[id_field_name],
-                               sep=sep,
-                               id_field_name=id_field_name,
-                               ref_field_prefix=ref_field_prefix,
-                               snakecase_fieldnames=snakecase_fieldnames,
-                               rename_values=rename_values,
-                               rename_list=rename_list,
-                               filter_values=filter_values,
-                               drop_values=drop_values,
-                               drop_objects=drop_objects,
-                               use_nested=use_nested)
-                else:
-                    field_value_bis: List = []
-                    for elt in field_value:
-                        field_value_bis.append({"%s" % field_name_value: elt})
-                    for elt in field_value_bis:
-                        __flat(elt,
-                               flatten_dict,
-                               flat_dict_key=field_name,
-                               ref_name=flat_dict_key,
-                               ref_value=current_dict[id_field_name],
-                               sep=sep,
-                               id_field_name=id_field_name,
-                               ref_field_prefix=ref_field_prefix,
-                               snakecase_fieldnames=snakecase_fieldnames,
-                               rename_values=rename_values,
-                               rename_list=rename_list,
-                               filter_values=filter_values,
-                               drop_values=drop_values,
-                               drop_objects=drop_objects,
-                               use_nested=use_nested)
+            field_name_value = '%s%s%s' % (fieldname_prefix, self.sep, field_name_value)
+        if field_name_value in self.rename_values:
+            field_name_value = self.rename_values[field_name_value]
+        return (field_name_value,
+                field_name in self.drop_objects,
+                field_name_value not in self.drop_values,
+                self.filter_values.get(field_name_value, None))
 
-        else:
-            if not drop_values or field_name_value not in drop_values:
-                if filter_values and field_name_value in filter_values:
-                    current_dict[field_name_value] = filter_values[field_name_value](
-                        fieldname=field_name_value,
-                        value=field_value
-                    )
+    def _dict_frame(self,
+                    d: Dict,
+                    flat_dict_key: str,
+                    fieldname_prefix: str,
+                    current_dict: Optional[Dict],
+                    ref_name: Optional[str],
+                    ref_value: Optional[str],
+                    index: Optional[int],
+                    key_path: Optional[str] = None) -> List:
+        """Build the stack frame of a dictionary (table name and field name prefix resolved)
+        """
+        names: Optional[Tuple[str, str, Dict]] = self._frame_names.get((flat_dict_key, fieldname_prefix), None)
+        if names is None:
+            names = self._resolve_frame_names(flat_dict_key, fieldname_prefix)
+            if len(self._frame_names) < self.name_cache_size:
+                self._frame_names[flat_dict_key, fieldname_prefix] = names
+        return [_DICT_FRAME, iter(d), d, names[0], names[1], current_dict, ref_name, ref_value, index, names[2],
+                key_path]
+
+    def flat(self,
+             d: Dict,
+             flatten_dict: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten a dictionary
+
+        Args:
+            d (Dict): Dictionary to flatten.
+            flatten_dict (Optional[Dict[str, List[Dict[str, Any]]]]): Record lists to append to.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Record lists by table name.
+        """
+        if flatten_dict is None:
+            flatten_dict = {}
+        return self._flat(d, flatten_dict, False)
+
+    def _flat(self, d: Dict, flatten_dict: Dict[str, Any], columnar: bool) -> Dict[str, Any]:
+        """Flatten a dictionary into record lists, or into ColumnTable column stores if columnar
+        """
+        id_field_name: str = self.id_field_name
+        use_nested: bool = self.use_nested
+        id_generator: IdGenerator = self.id_generator
+        name_cache_size: int = self.name_cache_size
+
+        stack: List[List] = [self._dict_frame(d, self.flat_dict_key, '', None, None, None, None)]
+        while stack:
+            frame: List = stack[-1]
+
+            if frame[0] == _LIST_FRAME:
+                # frame: kind, iterator of (index, element), table name, parent table name, parent id, key path
+                item: Optional[Tuple[int, Dict]] = next(frame[1], None)
+                if item is None:
+                    stack.pop()
                 else:
-                    current_dict[field_name_value] = field_value
+                    stack.append(self._dict_frame(item[1], frame[2], '', None, frame[3], frame[4], item[0], frame[5]))
+                continue
+
+            _, fields, d, flat_dict_key, fieldname_prefix, current_dict, ref_name, ref_value, index, columns, key_path = frame
+            for field_name in fields:
+                if current_dict is None:
+                    rows: Any = flatten_dict.get(flat_dict_key, None)
+                    if rows is None:
+                        rows = ColumnTable() if columnar else []
+                        flatten_dict[flat_dict_key] = rows
+                    if columnar:
+                        current_dict = _ColumnRow(rows)
+                    else:
+                        current_dict = {}
+                        rows.append(current_dict)
+                    current_dict[id_field_name] = id_generator(flat_dict_key, d, ref_value, index, key_path)
+                    if ref_name and ref_value:
+                        current_dict['%s%s' % (self.ref_field_prefix, ref_name)] = ref_value
+                    frame[5] = current_dict
+                elif flat_dict_key not in flatten_dict:
+                    flatten_dict[flat_dict_key] = ColumnTable() if columnar else []
+
+                column: Optional[Tuple[str, bool, bool, Optional[Callable]]] = columns.get(field_name, None)
+                if column is None:
+                    column = self._resolve_column(fieldname_prefix, field_name)
+                    if len(columns) < name_cache_size:
+                        columns[field_name] = column
+                field_name_value, drop_object, keep_value, filter_value = column
+
+                field_value: Any = d[field_name]
+
+                if use_nested and isinstance(field_value, dict):
+                    if not drop_object:
+                        stack.append(self._dict_frame(field_value, flat_dict_key, field_name_value,
+                                                      current_dict, None, None, None))
+                        break
+                elif isinstance(field_value, list) or isinstance(field_value, tuple) or not use_nested and isinstance(field_value, dict):
+                    if isinstance(field_value, dict):
+                        field_value = [field_value]
+                    if not drop_object:
+                        if len(field_value) > 0 and isinstance(field_value[0], dict):
+                            elements: Any = enumerate(field_value)
+                        else:
+                            elements: Any = enumerate([{"%s" % field_name_value: elt} for elt in field_value])
+                        stack.append([_LIST_FRAME, elements, field_name, flat_dict_key, current_dict[id_field_name],
+                                      field_name_value])
+                        break
+                elif keep_value:
+                    if filter_value is not None:
+                        current_dict[field_name_value] = filter_value(
+                            fieldname=field_name_value,
+                            value=field_value
+                        )
+                    else:
+                        current_dict[field_name_value] = field_value
+            else:
+                stack.pop()
+
+        return flatten_dict
+
+    def flat_all(self,
+                 records: Iterable[Dict],
+                 flatten_dict: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten records into one dictionary of record lists
+
+        Args:
+            records (Iterable[Dict]): Dictionaries to flatten.
+            flatten_dict (Optional[Dict[str, List[Dict[str, Any]]]]): Record lists to append to.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Record lists by table name.
+        """
+        if flatten_dict is None:
+            flatten_dict = {}
+        for d in records:
+            self.flat(d, flatten_dict)
+        return flatten_dict
+
+    def flat_stream(self, records: Iterable[Dict]) -> Generator[Dict[str, List[Dict[str, Any]]], None, None]:
+        """Flatten a stream of records, one result per record
+
+        Args:
+            records (Iterable[Dict]): Dictionaries to flatten.
+
+        Yields:
+            Dict[str, List[Dict[str, Any]]]: Record lists by table name of one record.
+        """
+        for d in records:
+            yield self.flat(d)
+
+    def flat_columns(self,
+                     records: Iterable[Dict],
+                     tables: Optional[Dict[str, ColumnTable]] = None) -> Dict[str, ColumnTable]:
+        """Flatten records into column stores, one per table
+
+        Fields are written straight into the columns, without building row dictionaries.
+
+        Args:
+            records (Iterable[Dict]): Dictionaries to flatten.
+            tables (Optional[Dict[str, ColumnTable]]): Column stores to append to.
+
+        Returns:
+            Dict[str, ColumnTable]: Column stores by table name.
+        """
+        if tables is None:
+            tables = {}
+        for d in records:
+            self._flat(d, tables, True)
+        return tables
 
 
 def flat(d: Dict,
@@ -148,11 +389,9 @@ def flat(d: Dict,
          filter_values: Dict[str, Callable] = None,
          drop_values: List[str] = None,
          drop_objects: List[str] = None,
-         use_nested: bool = True) -> Dict[str, List[Dict[str, Any]]]:
-    flatten_dict: Dict = {}
-    __flat(
-        d=d,
-        flatten_dict=flatten_dict,
+         use_nested: bool = True,
+         id_generator: Union[str, IdGenerator, None] = None) -> Dict[str, List[Dict[str, Any]]]:
+    return FlatPlan(
         flat_dict_key=flat_dict_key,
         sep=sep,
         id_field_name=id_field_name,
@@ -163,9 +402,94 @@ def flat(d: Dict,
         filter_values=filter_values,
         drop_values=drop_values,
         drop_objects=drop_objects,
-        use_nested=use_nested
-    )
-    return flatten_dict
+        use_nested=use_nested,
+        id_generator=id_generator
+    ).flat(d)
+
+
+def flat_columns(ld: Iterable[Dict],
+                 flat_dict_key: str,
+                 **options) -> Dict[str, ColumnTable]:
+    """Flatten dictionaries into column stores instead of row dictionaries
+
+    Args:
+        ld (Iterable[Dict]): Dictionaries to flatten.
+        flat_dict_key (str): Root name.
+        **options: Same options as flat().
+
+    Returns:
+        Dict[str, ColumnTable]: Column stores by table name.
+    """
+    return FlatPlan(flat_dict_key, **options).flat_columns(ld)
+
+
+def _flat_list_shard(args: Tuple) -> Dict[str, List[Dict[str, Any]]]:
+    ld, flat_dict_key, options = args
+    return flat_list(ld, flat_dict_key, **options)
+
+
+def flat_list(ld: List[Dict],
+              flat_dict_key: str,
+              sep: str = '.',
+              id_field_name: str = '__id',
+              ref_field_prefix: str = '__ref__',
+              snakecase_fieldnames: bool = False,
+              rename_values: Dict[str, str] = None,
+              rename_list: Dict[str, str] = None,
+              filter_values: Dict[str, Callable] = None,
+              drop_values: List[str] = None,
+              drop_objects: List[str] = None,
+              use_nested: bool = True,
+              workers: Optional[int] = None,
+              id_generator: Union[str, IdGenerator, None] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Flatten a list of dictionaries into one dictionary of record lists (same options as flat)
+
+    Args:
+        ld (List[Dict]): Dictionaries to flatten.
+        flat_dict_key (str): Root name.
+        workers (Optional[int]): Number of processes. The list is split into contiguous shards
+            whose results are merged in order, so tables and rows are the same as with one
+            process, except the ids of generators with a shard() method (e.g. counter ids are
+            prefixed by the shard index), which depend on the number of workers.
+            Options (e.g. filter_values functions) must be picklable.
+        id_generator (Union[str, IdGenerator, None]): Record id generator
+            (see tools.recordid.get_id_generator).
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Record lists by table name.
+    """
+    options: Dict[str, Any] = {
+        'sep': sep,
+        'id_field_name': id_field_name,
+        'ref_field_prefix': ref_field_prefix,
+        'snakecase_fieldnames': snakecase_fieldnames,
+        'rename_values': rename_values,
+        'rename_list': rename_list,
+        'filter_values': filter_values,
+        'drop_values': drop_values,
+        'drop_objects': drop_objects,
+        'use_nested': use_nested,
+    }
+    id_generator = get_id_generator(id_generator)
+    flatten_dict: Dict[str, List[Dict[str, Any]]] = {}
+    if workers is not None and workers > 1:
+        if not isinstance(ld, list):
+            ld = list(ld)
+        shard_size: int = max(1, -(-len(ld) // workers))
+        shards: List[Tuple] = [
+            (ld[i:i + shard_size], flat_dict_key, dict(options, id_generator=(
+                id_generator.shard(shard_index) if hasattr(id_generator, 'shard') else id_generator)))
+            for shard_index, i in enumerate(range(0, len(ld), shard_size))
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_flatten_dict in executor.map(_flat_list_shard, shards):
+                for key, records in shard_flatten_dict.items():
+                    if key in flatten_dict:
+                        flatten_dict[key].extend(records)
+                    else:
+                        flatten_dict[key] = records
+        return flatten_dict
+    return FlatPlan(flat_dict_key, id_generator=id_generator, **options).flat_all(ld, flatten_dict)
 
 
 if __name__ == '__main__':
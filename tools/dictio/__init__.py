@@ -49,24 +49,493 @@ Methods:
             dictio = DictIO({'name': 'John', 'age': 30}) << 'data.json'
             # Returns {'name': 'John', 'age': 30, 'occupation': 'Developer'}
 
+### JsonlWriter
+
+A buffered JSON Lines writer: records are serialized in memory and written by
+batches, so appending millions of records does not open and close the file for
+each of them.
+        Examples:
+            ```
+            with JsonlWriter('data.jsonl', batch_size=1000, fsync=FSYNC_CLOSE) as writer:
+                for record in records:
+                    writer.write(record)
+                    # or DictIO(record) >> writer
+            ```
+
+### Durability
+
+`DictIO(d, durability=...)` (and the `durability` attribute of depthdict) sets how
+the `>` and `>>` operators write:
+    DURABILITY_NONE: in place writes, no fsync (fastest, the historical behavior).
+    DURABILITY_ATOMIC: `>` writes a temporary file, fsyncs it and renames it over
+        the target (a crash leaves either the old or the new file); each `>>` append
+        is fsynced.
+    DURABILITY_GROUP: `>` is atomic; `>>` appends are group committed, i.e. buffered
+        and fsynced together every GROUP_COMMIT_SIZE records or GROUP_COMMIT_INTERVAL
+        seconds (records of the last group may be lost by a crash). Pending groups are
+        committed by flush_group_commits(), before a read or a rewrite of the same
+        file, and at exit.
+
+### Compression
+
+Paths ending with `.gz`, `.bz2`, `.xz` (and `.zst` if the zstandard package is
+installed) are compressed and decompressed on the fly by the operators,
+JsonlWriter and iter_jsonl (see open_file). Each `>>` append is written through as
+one complete compressed member; a JsonlWriter (or DURABILITY_GROUP appends) keeps
+one streaming compressor open and writes one member holding many records, which
+compresses much better for small records. Concatenated members form a valid file,
+and no decompression to a temporary file is needed to read it.
+
+### JSON backend
+
+All operators, JsonlWriter, iter_jsonl and DictIOStore use the current backend of
+tools.jsonbackend (a faster installed codec, ASCII output by default).
+
+### DictIOStore
+
+An on-disk JSON Lines document store: a sidecar index (key -> byte offset and
+length) gives O(1) point reads through a memory map of the data file.
+        Examples:
+            ```
+            with DictIOStore('people.jsonl', key='id') as store:
+                DictIO({'id': 1, 'name': 'John'}) >> store
+                store['1']
+                # Returns {'id': 1, 'name': 'John'}
+            ```
+
+### iter_jsonl
+
+    `iter_jsonl(path: str, factory: Callable = dict)`: Lazily yields the records of
+        a JSON Lines file.
+        Examples:
+            ```
+            for record in iter_jsonl('data.jsonl', factory=DictIO):
+                print(record)
+            ```
+
     """
 
+import atexit
+import bz2
+import gzip
 import json
-from typing import Dict, Optional
+import lzma
+import mmap
+import os
+import threading
+import time
+from importlib import import_module
+from io import TextIOWrapper
+from typing import Any, Callable, Dict, Final, Generator, Iterable, List, Optional, TextIO, Tuple, Union
+from uuid import uuid4
+
+from tools.jsonbackend import json_backend
+
+JSONL_BATCH_SIZE: Final[int] = 1000
+JSONL_FLUSH_INTERVAL: Final[float] = 1.0
+
+FSYNC_NEVER: Final[str] = 'never'
+FSYNC_FLUSH: Final[str] = 'flush'
+FSYNC_CLOSE: Final[str] = 'close'
+
+DURABILITY_NONE: Final[str] = 'none'
+DURABILITY_ATOMIC: Final[str] = 'atomic'
+DURABILITY_GROUP: Final[str] = 'group'
+DURABILITIES: Final[Tuple[str, ...]] = (DURABILITY_NONE, DURABILITY_ATOMIC, DURABILITY_GROUP)
+
+GROUP_COMMIT_SIZE: Final[int] = 1000
+GROUP_COMMIT_INTERVAL: Final[float] = 1.0
+
+COMPRESSION_SUFFIXES: Final[Dict[str, str]] = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+    '.zst': 'zstd',
+}
+
+
+def file_compression(path: str) -> Optional[str]:
+    """
+    Returns the compression of a file from its suffix.
+
+    Args:
+        path (str): The path to the file.
+    Returns:
+        Optional[str]: 'gzip', 'bz2', 'lzma', 'zstd' or None if the file is not compressed.
+    """
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower(), None)
+
+
+def _zstandard() -> Any:
+    try:
+        return import_module('zstandard')
+    except ImportError:
+        raise Exception("'zstd' compression needs the zstandard package") from None
+
+
+def compress_bytes(data: bytes, compression: str) -> bytes:
+    """
+    Compresses data as one complete member (appending it to a file of the same
+    compression keeps the file valid).
+
+    Args:
+        data (bytes): The data.
+        compression (str): 'gzip', 'bz2', 'lzma' or 'zstd'.
+    Returns:
+        bytes: The compressed data.
+    Raises:
+        Exception: If the compression is not supported.
+    """
+    if compression == 'gzip':
+        return gzip.compress(data)
+    if compression == 'bz2':
+        return bz2.compress(data)
+    if compression == 'lzma':
+        return lzma.compress(data)
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor().compress(data)
+    raise Exception("'%s' is not a supported compression" % (compression))
+
+
+def _compressor(raw: Any, compression: str) -> Any:
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb')
+    if compression == 'bz2':
+        return bz2.BZ2File(raw, 'wb')
+    if compression == 'lzma':
+        return lzma.LZMAFile(raw, 'wb')
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+    raise Exception("'%s' is not a supported compression" % (compression))
+
+
+def open_file(path: str, mode: str = 'r', compression: Optional[str] = None) -> TextIO:
+    """
+    Opens a text file, decompressing or compressing it on the fly according to its suffix
+    (pending buffered appends to the file are committed first).
+
+    Args:
+        path (str): The path to the file.
+        mode (str): 'r', 'w', 'a' or 'x'.
+        compression (Optional[str]): Forced compression. Defaults to file_compression(path).
+    Returns:
+        TextIO: The opened text file (UTF-8 if compressed).
+    Raises:
+        Exception: If the mode or the compression is not supported.
+    """
+    if mode not in ('r', 'w', 'a', 'x'):
+        raise Exception("'%s' is not a valid mode" % (mode))
+    _commit_pending(path)
+    if compression is None:
+        compression = file_compression(path)
+    if compression is None:
+        return open(path, mode)
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if compression == 'bz2':
+        return bz2.open(path, mode + 't', encoding='utf-8')
+    if compression == 'lzma':
+        return lzma.open(path, mode + 't', encoding='utf-8')
+    if compression == 'zstd':
+        zstandard: Any = _zstandard()
+        raw: Any = open(path, mode + 'b')
+        if mode == 'r':
+            return TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True),
+                                 encoding='utf-8')
+        return TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw, closefd=True), encoding='utf-8')
+    raise Exception("'%s' is not a supported compression" % (compression))
+
+
+class JsonlWriter():
+    def __init__(self,
+                 path: str,
+                 mode: str = 'a',
+                 batch_size: int = JSONL_BATCH_SIZE,
+                 flush_interval: Optional[float] = JSONL_FLUSH_INTERVAL,
+                 fsync: str = FSYNC_NEVER) -> None:
+        """
+        Initializes a buffered JSON Lines writer (one JSON object per line).
+
+        Args:
+            path (str): The path to the JSON Lines file (compressed according to its suffix,
+                one compressed member until the writer is closed; gzip and zstd flushes
+                make the written records readable, bz2 and xz ones only buffer them).
+            mode (str): 'a' to append to an existing file, 'w' to overwrite it.
+            batch_size (int): Number of buffered records written at once.
+            flush_interval (Optional[float]): Maximum delay in seconds between two
+                flushes, checked when a record is written (None to only flush by batch).
+            fsync (str): FSYNC_NEVER, FSYNC_FLUSH (os.fsync after each flush) or
+                FSYNC_CLOSE (os.fsync once, when the writer is closed).
+        Raises:
+            Exception: If the mode, the batch size or the fsync policy is not valid.
+        """
+        if not isinstance(path, str):
+            raise Exception("'%s' is not a string" % (path))
+        if mode not in ('a', 'w'):
+            raise Exception("'%s' is not a valid mode" % (mode))
+        if batch_size < 1:
+            raise Exception("'%s' is not a valid batch size" % (batch_size))
+        if fsync not in (FSYNC_NEVER, FSYNC_FLUSH, FSYNC_CLOSE):
+            raise Exception("'%s' is not a valid fsync policy" % (fsync))
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.flush_interval: Optional[float] = flush_interval
+        self.fsync: str = fsync
+        self.nb_records: int = 0
+        self.buffer: List[str] = []
+        self.last_flush: float = time.monotonic()
+        self.dumps: Callable[[Any], str] = json_backend().dumps
+        self.compression: Optional[str] = file_compression(path)
+        if self.compression:
+            self.raw: Any = open(path, mode + 'b')
+            try:
+                self.f: Optional[Any] = _compressor(self.raw, self.compression)
+            except BaseException:
+                self.raw.close()
+                raise
+        else:
+            self.f: Optional[Any] = open(path, mode)
+            self.raw: Any = self.f
+
+    def write(self, d: Dict) -> None:
+        """
+        Buffers one record, then writes the buffer if it is full or too old.
+
+        Args:
+            d (Dict): The record.
+        Raises:
+            Exception: If the writer is closed.
+        """
+        if self.f is None:
+            raise Exception("'%s' is closed" % (self.path))
+        self.buffer.append(self.dumps(d))
+        self.nb_records += 1
+        if len(self.buffer) >= self.batch_size or \
+           (self.flush_interval is not None and time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict]) -> None:
+        """
+        Buffers records (see write).
+
+        Args:
+            records (Iterable[Dict]): The records.
+        """
+        for d in records:
+            self.write(d)
+
+    def flush(self) -> None:
+        """
+        Writes buffered records to the file (and fsync it with the FSYNC_FLUSH policy).
+        """
+        if self.f is None:
+            return
+        if self.buffer:
+            self.buffer.append('')
+            if self.compression:
+                self.f.write('\n'.join(self.buffer).encode('utf-8'))
+            else:
+                self.f.write('\n'.join(self.buffer))
+            self.buffer = []
+        self.f.flush()
+        self.raw.flush()
+        if self.fsync == FSYNC_FLUSH:
+            os.fsync(self.raw.fileno())
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Flushes buffered records and closes the file.
+        """
+        if self.f is None:
+            return
+        try:
+            self.flush()
+            if self.compression:
+                self.f.close()
+                self.raw.flush()
+            if self.fsync == FSYNC_CLOSE or (self.fsync == FSYNC_FLUSH and self.compression):
+                os.fsync(self.raw.fileno())
+        finally:
+            self.raw.close()
+            self.f = None
+
+    def __enter__(self) -> 'JsonlWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def iter_jsonl(path: str, factory: Callable[[Dict], Any] = dict) -> Generator[Any, None, None]:
+    """
+    Lazily reads a JSON Lines file, one record at a time (blank lines are ignored).
+
+    Args:
+        path (str): The path to the JSON Lines file (decompressed on the fly, see open_file).
+        factory (Callable[[Dict], Any]): Applied to each decoded record (e.g. depthdict).
+    Returns:
+        Generator[Any, None, None]: The records.
+    Raises:
+        Exception: If the provided value is not a string.
+        json.JSONDecodeError: If a line is not a valid JSON document.
+    """
+    if not isinstance(path, str):
+        raise Exception("'%s' is not a string" % (path))
+    loads: Callable[[str], Any] = json_backend().loads
+    with open_file(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield factory(loads(line))
+
+
+_group_commits: Dict[str, JsonlWriter] = {}
+_group_commits_lock: threading.Lock = threading.Lock()
+
+
+def check_durability(durability: str) -> str:
+    """
+    Checks a durability mode.
+
+    Args:
+        durability (str): DURABILITY_NONE, DURABILITY_ATOMIC or DURABILITY_GROUP.
+    Returns:
+        str: The durability mode.
+    Raises:
+        Exception: If the durability mode is not valid.
+    """
+    if durability not in DURABILITIES:
+        raise Exception("'%s' is not a valid durability" % (durability))
+    return durability
+
+
+def _fsync_dir(dir_name: str) -> None:
+    try:
+        fd: int = os.open(dir_name, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _commit_pending(path: str) -> None:
+    with _group_commits_lock:
+        writer: Optional[JsonlWriter] = _group_commits.pop(os.path.abspath(path), None)
+        if writer is not None:
+            writer.close()
+
+
+def flush_group_commits() -> None:
+    """
+    Commits (writes and fsyncs) all pending group committed appends.
+    """
+    with _group_commits_lock:
+        while _group_commits:
+            _group_commits.popitem()[1].close()
+
+
+atexit.register(flush_group_commits)
+
+
+def write_text_file(path: str, text: str, durability: str = DURABILITY_NONE) -> None:
+    """
+    Writes a file, atomically unless durability is DURABILITY_NONE.
+
+    Args:
+        path (str): The path to the file (compressed according to its suffix).
+        text (str): The file content.
+        durability (str): The durability mode.
+    """
+    _commit_pending(path)
+    compression: Optional[str] = file_compression(path)
+    data: Union[str, bytes] = compress_bytes(text.encode('utf-8'), compression) if compression else text
+    binary: str = 'b' if compression else ''
+    if durability == DURABILITY_NONE:
+        with open(path, "w" + binary) as f:
+            f.write(data)
+        return
+    dir_name: str = os.path.dirname(os.path.abspath(path))
+    tmp_path: str = os.path.join(dir_name, '.%s.%s.tmp' % (os.path.basename(path), uuid4().hex))
+    try:
+        with open(tmp_path, "x" + binary) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(dir_name)
+
+
+def append_json_line(path: str, d: Any, durability: str = DURABILITY_NONE) -> None:
+    """
+    Appends one JSON document on its own line.
+
+    Args:
+        path (str): The path to the file (compressed according to its suffix, one compressed
+            member by append unless durability is DURABILITY_GROUP).
+        d (Any): The document.
+        durability (str): The durability mode (DURABILITY_GROUP appends are buffered).
+    """
+    if durability == DURABILITY_GROUP:
+        with _group_commits_lock:
+            key: str = os.path.abspath(path)
+            writer: Optional[JsonlWriter] = _group_commits.get(key, None)
+            if writer is None:
+                writer = JsonlWriter(path,
+                                     batch_size=GROUP_COMMIT_SIZE,
+                                     flush_interval=GROUP_COMMIT_INTERVAL,
+                                     fsync=FSYNC_FLUSH)
+                _group_commits[key] = writer
+            writer.write(d)
+        return
+    _commit_pending(path)
+    line: str = "%s\n" % (json_backend().dumps(d))
+    compression: Optional[str] = file_compression(path)
+    with open(path, "ab" if compression else "a") as f:
+        f.write(compress_bytes(line.encode('utf-8'), compression) if compression else line)
+        if durability == DURABILITY_ATOMIC:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read_text_file(path: str) -> str:
+    """
+    Reads a file, after committing its pending group committed appends.
+
+    Args:
+        path (str): The path to the file (decompressed on the fly, see open_file).
+    Returns:
+        str: The file content.
+    """
+    _commit_pending(path)
+    with open_file(path, "r") as f:
+        return f.read()
 
 
 class DictIO():
-    def __init__(self, d: Optional[Dict] = None) -> None:
+    def __init__(self, d: Optional[Dict] = None, durability: str = DURABILITY_NONE) -> None:
         """
         Initializes a new instance of the `DictIO` class.
 
         Args:
             d (Optional[Dict]): The dictionary being manipulated. Defaults to an empty
                 dictionary if not provided.
+            durability (str): How `>` and `>>` write (see Durability). Defaults to
+                DURABILITY_NONE.
+        Raises:
+            Exception: If the durability mode is not valid.
         """
         if d is None:
             d = {}
         self.d: Dict = d
+        self.durability: str = check_durability(durability)
 
     def __gt__(self, other: str) -> None:
         """
@@ -79,22 +548,24 @@ class DictIO():
         """
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "w") as f:
-            f.write("%s\n" % (json.dumps(self.d)))
+        write_text_file(other, "%s\n" % (json_backend().dumps(self.d)), durability=self.durability)
 
-    def __rshift__(self, other: str) -> None:
+    def __rshift__(self, other: Union[str, JsonlWriter, 'DictIOStore']) -> None:
         """
         Appends the current dictionary to an existing file.
 
         Args:
-            other (str): The path to the file where the dictionary will be appended.
+            other (Union[str, JsonlWriter, DictIOStore]): The path to the file where the
+                dictionary will be appended, or a JsonlWriter or a DictIOStore.
         Raises:
             Exception: If the provided value is not a string.
         """
+        if isinstance(other, (JsonlWriter, DictIOStore)):
+            other.write(self.d)
+            return
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "a") as f:
-            f.write("%s\n" % (json.dumps(self.d)))
+        append_json_line(other, self.d, durability=self.durability)
 
     def __lt__(self, other: str) -> Dict:
         """
@@ -109,10 +580,9 @@ class DictIO():
         """
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "r") as f:
-            self.d = {}
-            self.d.update(json.loads(f.read()))
-            return self.d
+        self.d = {}
+        self.d.update(json_backend().loads(read_text_file(other)))
+        return self.d
 
     def __lshift__(self, other: str) -> Dict:
         """
@@ -127,9 +597,8 @@ class DictIO():
         """
         if not isinstance(other, str):
             raise Exception("'%s' is not a string" % (other))
-        with open(other, "r") as f:
-            self.d.update(json.loads(f.read()))
-            return self.d
+        self.d.update(json_backend().loads(read_text_file(other)))
+        return self.d
 
     def __repr__(self) -> str:
         """
@@ -156,6 +625,198 @@ class DictIO():
         return self.__repr__()
 
 
+class DictIOStore():
+    def __init__(self, path: str, key: str = 'id', index_path: Optional[str] = None) -> None:
+        """
+        Initializes a JSON Lines store indexed by a record field.
+
+        The index is loaded (or built) on first access. A saved index older than the data
+        file (records appended by another writer) is completed from its last indexed offset;
+        an index beyond the end of the data file is rebuilt (call rebuild_index after any
+        other rewrite). When several records have the same key, the last one wins.
+
+        Args:
+            path (str): The path to the JSON Lines data file (created if missing).
+            key (str): The record field used as key (values are converted to strings).
+            index_path (Optional[str]): The path to the sidecar index. Defaults to path + '.idx'.
+        Raises:
+            Exception: If the provided path is not a string or is a compressed file.
+        """
+        if not isinstance(path, str):
+            raise Exception("'%s' is not a string" % (path))
+        if file_compression(path) is not None:
+            raise Exception("'%s' is compressed and cannot be memory-mapped" % (path))
+        self.path: str = path
+        self.key: str = key
+        self.index_path: str = index_path if index_path is not None else '%s.idx' % (path)
+        self.offsets: Optional[Dict[str, List[int]]] = None
+        self.data_size: int = 0
+        self.index_modified: bool = False
+        self.partial_tail: bool = False
+        self.f: Optional[Any] = None
+        self.mm: Optional[mmap.mmap] = None
+        if not os.path.exists(path):
+            open(path, 'ab').close()
+
+    def _remap(self) -> None:
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.f is None:
+            self.f = open(self.path, 'r+b')
+        else:
+            self.f.flush()
+        if os.fstat(self.f.fileno()).st_size > 0:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _scan(self, start: int) -> None:
+        """Indexes complete lines from start (a trailing partial line is ignored)"""
+        self._remap()
+        if self.mm is None:
+            return
+        mm: mmap.mmap = self.mm
+        loads: Callable[[bytes], Any] = json_backend().loads
+        offset: int = start
+        size: int = len(mm)
+        while offset < size:
+            end: int = mm.find(b'\n', offset)
+            if end < 0:
+                self.partial_tail = True
+                break
+            if end > offset:
+                d: Dict = loads(mm[offset:end])
+                self.offsets[self._key_of(d)] = [offset, end - offset]
+            offset = end + 1
+        self.data_size = offset
+        self.index_modified = True
+
+    def _load_index(self) -> None:
+        data_size: int = os.path.getsize(self.path)
+        try:
+            with open(self.index_path, 'r') as f:
+                index: Dict = json_backend().loads(f.read())
+            if index['key'] != self.key or index['data_size'] > data_size:
+                raise ValueError(self.index_path)
+            self.offsets = index['offsets']
+            self.data_size = index['data_size']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.offsets = {}
+            self.data_size = 0
+            self.index_modified = True
+        if self.data_size < data_size:
+            self._scan(self.data_size)
+        else:
+            self._remap()
+
+    def _index(self) -> Dict[str, List[int]]:
+        if self.offsets is None:
+            self._load_index()
+        return self.offsets
+
+    def _key_of(self, d: Dict) -> str:
+        if not isinstance(d, dict) or self.key not in d:
+            raise Exception("'%s' key is missing in '%s'" % (self.key, d))
+        return str(d[self.key])
+
+    def rebuild_index(self) -> None:
+        """
+        Rebuilds the index from the whole data file.
+        """
+        self.offsets = {}
+        self._scan(0)
+
+    def save_index(self) -> None:
+        """
+        Writes the sidecar index (atomically replaced), if it changed since it was loaded.
+        """
+        if self.offsets is None or not self.index_modified:
+            return
+        if self.f is not None:
+            self.f.flush()
+        tmp_path: str = '%s.tmp' % (self.index_path)
+        with open(tmp_path, 'w') as f:
+            f.write(json_backend().dumps({'key': self.key, 'data_size': self.data_size, 'offsets': self.offsets}))
+        os.replace(tmp_path, self.index_path)
+        self.index_modified = False
+
+    def write(self, d: Dict) -> None:
+        """
+        Appends a record and indexes it.
+
+        Args:
+            d (Dict): The record (it must contain the key field).
+        Raises:
+            Exception: If the key field is missing.
+        """
+        key: str = self._key_of(d)
+        offsets: Dict[str, List[int]] = self._index()
+        line: bytes = json_backend().dumps(d).encode('utf-8')
+        self.f.seek(self.data_size)
+        self.f.write(line + b'\n')
+        if self.partial_tail:
+            self.f.truncate()
+            self.partial_tail = False
+        offsets[key] = [self.data_size, len(line)]
+        self.data_size += len(line) + 1
+        self.index_modified = True
+
+    def get(self, key: Any, d: Any = None, factory: Callable[[Dict], Any] = dict) -> Any:
+        """
+        Reads a record by key.
+
+        Args:
+            key (Any): The key (converted to a string).
+            d (Any): The default value if the key is not in the store.
+            factory (Callable[[Dict], Any]): Applied to the record (e.g. DictIO).
+        Returns:
+            Any: The record or the default value.
+        """
+        position: Optional[List[int]] = self._index().get(str(key), None)
+        if position is None:
+            return d
+        offset, length = position
+        if self.mm is None or offset + length > len(self.mm):
+            self._remap()
+        return factory(json_backend().loads(self.mm[offset:offset + length]))
+
+    def __getitem__(self, key: Any) -> Dict:
+        position: Optional[List[int]] = self._index().get(str(key), None)
+        if position is None:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return str(key) in self._index()
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def keys(self) -> Iterable[str]:
+        """
+        Returns the keys of the store, in first insertion order.
+        """
+        return self._index().keys()
+
+    def close(self) -> None:
+        """
+        Saves the index and releases the memory map and the data file.
+        """
+        self.save_index()
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        self.offsets = None
+
+    def __enter__(self) -> 'DictIOStore':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
 if __name__ == '__main__':
     # Create an instance of DictIO
     dictio = DictIO({'name': 'John', 'age': 30})
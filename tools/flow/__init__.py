@@ -1,7 +1,15 @@
 #! /usr/bin/env python
 
+import asyncio
+import inspect
 import logging
-from typing import Any, Callable, Dict, Final, Generator, List, Optional, Tuple, Union
+import random
+import time
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Final, Generator, List, Optional, Set, Tuple, Union
 
 from tools.inspect import get_fct_parameter_names
 
@@ -10,6 +18,14 @@ logger: logging.Logger = logging.getLogger('Flow')
 final:     Final[bool] = True
 not_final: Final[bool] = False
 
+data_processed:         Final[int] = 0
+data_stopped_with_none: Final[int] = 1
+data_skipped:           Final[int] = 2
+
+batch_attribute: Final[str] = 'flow_batch'
+
+PROFILE_MAX_SAMPLES: Final[int] = 100000
+
 
 class FlowSkipData(Exception):
     """
@@ -39,6 +55,367 @@ class FlowFilterError(Exception):
     pass
 
 
+class FlowStageStats:
+    """
+    Call count, durations and data counters of one profiled function.
+
+    Durations percentiles are computed on at most PROFILE_MAX_SAMPLES durations (reservoir sampling).
+    """
+
+    __slots__ = ('name', 'calls', 'total_time', 'samples', 'skipped', 'stopped_with_none')
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.calls: int = 0
+        self.total_time: float = 0.0
+        self.samples: array = array('d')
+        self.skipped: int = 0
+        self.stopped_with_none: int = 0
+
+    def add(self, duration: float) -> None:
+        """
+        Adds one call duration.
+
+        Args:
+            duration (float): The call duration in seconds.
+        """
+
+        self.calls += 1
+        self.total_time += duration
+        if len(self.samples) < PROFILE_MAX_SAMPLES:
+            self.samples.append(duration)
+        else:
+            index: int = random.randrange(self.calls)
+            if index < PROFILE_MAX_SAMPLES:
+                self.samples[index] = duration
+
+    def merge(self, other: 'FlowStageStats') -> None:
+        """
+        Adds the statistics of the same function collected elsewhere (e.g. by a worker).
+
+        Args:
+            other (FlowStageStats): The statistics to add.
+        """
+
+        self.skipped += other.skipped
+        self.stopped_with_none += other.stopped_with_none
+        self.total_time += other.total_time
+        for duration in other.samples:
+            self.calls += 1
+            if len(self.samples) < PROFILE_MAX_SAMPLES:
+                self.samples.append(duration)
+            else:
+                index: int = random.randrange(self.calls)
+                if index < PROFILE_MAX_SAMPLES:
+                    self.samples[index] = duration
+        self.calls += other.calls - len(other.samples)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns the statistics.
+
+        Returns:
+            Dict[str, Any]: Name, calls, total/p50/p95/p99 time (seconds), skipped and stopped with None data.
+        """
+
+        samples: List[float] = sorted(self.samples)
+
+        def percentile(p: int) -> Optional[float]:
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, max(0, -(-p * len(samples) // 100) - 1))]
+
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'total_time': self.total_time,
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'skipped': self.skipped,
+            'stopped_with_none': self.stopped_with_none,
+        }
+
+
+class FlowProfiler:
+    """
+    Statistics of a profiled flow run (see Flow `profile` parameter).
+    """
+
+    def __init__(self) -> None:
+        self.start: float = time.perf_counter()
+        self.init: List[FlowStageStats] = []
+        self.filters: List[FlowStageStats] = []
+        self.finalyze: List[FlowStageStats] = []
+        self.loader_calls: int = 0
+        self.loader_wait: float = 0.0
+
+    @staticmethod
+    def fct_name(fct: Callable) -> str:
+        """
+        Returns the name used in reports for a function.
+
+        Args:
+            fct (Callable): The function.
+
+        Returns:
+            str: The qualified name of the function.
+        """
+
+        return getattr(fct, '__qualname__', None) or getattr(fct, '__name__', None) or repr(fct)
+
+    def call(self, stages: List[FlowStageStats], fct: Callable, *args, **kwargs) -> Any:
+        """
+        Calls and times an init or finalyze function.
+
+        Args:
+            stages (List[FlowStageStats]): The statistics list of the function kind (init or finalyze).
+            fct (Callable): The function to call.
+            args, kwargs: The function arguments.
+
+        Returns:
+            Any: The function result.
+        """
+
+        stage: FlowStageStats = FlowStageStats(self.fct_name(fct))
+        stages.append(stage)
+        start: float = time.perf_counter()
+        try:
+            return fct(*args, **kwargs)
+        finally:
+            stage.add(time.perf_counter() - start)
+
+    def iter_loader(self, all_data: Any) -> Generator[Any, None, None]:
+        """
+        Yields the loaded data, timing the loader.
+
+        Args:
+            all_data (Any): A generator of unfiltered data.
+
+        Yields:
+            Any: The loaded data.
+        """
+
+        perf_counter: Callable[[], float] = time.perf_counter
+        data_iterator: Any = iter(all_data)
+        while True:
+            start: float = perf_counter()
+            try:
+                data: Any = next(data_iterator)
+            except StopIteration:
+                self.loader_wait += perf_counter() - start
+                return
+            self.loader_wait += perf_counter() - start
+            self.loader_calls += 1
+            yield data
+
+    def summary(self) -> str:
+        """
+        Returns a one line summary of filters statistics and loader wait time.
+
+        Returns:
+            str: The summary.
+        """
+
+        return "; ".join(
+            ["%s: %d calls, %.6fs (skip %d, none %d)" % (stage.name, stage.calls, stage.total_time, stage.skipped, stage.stopped_with_none)
+             for stage in self.filters]
+            + ["loader wait: %.6fs" % (self.loader_wait)]
+        )
+
+    def report(self, counters: Tuple[int, int, int, int]) -> Dict[str, Any]:
+        """
+        Returns the structured report.
+
+        Args:
+            counters (Tuple[int, int, int, int]): The total count, processed count, skipped count, and stopped by None count.
+
+        Returns:
+            Dict[str, Any]: The report.
+        """
+
+        return {
+            'total_time': time.perf_counter() - self.start,
+            'data': dict(zip(('total', 'processed', 'skipped', 'stopped_with_none'), counters)),
+            'loader': {'calls': self.loader_calls, 'wait_time': self.loader_wait},
+            'init': [stage.report() for stage in self.init],
+            'filters': [stage.report() for stage in self.filters],
+            'finalyze': [stage.report() for stage in self.finalyze],
+        }
+
+
+def flow_batch(fct: Callable) -> Callable:
+    """
+    Marks a filter as batch-aware: it receives a list of data and returns a list of the same length.
+
+    A None item stops its data (like a None return of a filter) and a FlowSkipData item skips it;
+    raising FlowSkipData skips the whole batch.
+
+    Args:
+        fct (Callable): The filter.
+
+    Returns:
+        Callable: The same filter.
+    """
+
+    setattr(fct, batch_attribute, True)
+    return fct
+
+
+def _apply_filters_batch(batch: List[Any],
+                         filters: List[Tuple[Callable, bool, bool]],
+                         context: Dict,
+                         continue_if_none: bool,
+                         ignore_last_filter_return: bool,
+                         stages: Optional[List[FlowStageStats]] = None) -> List[Tuple[int, Optional[str]]]:
+    """
+    Applies a filter chain to a batch of data, one filter at a time on all data still in the chain.
+
+    Batch-aware filters get one call with the list of data, other filters one call by data.
+
+    Args:
+        batch (List[Any]): The data to apply the filters to.
+        filters (List[Tuple[Callable, bool, bool]]): The filters, whether they need the context and
+            whether they are batch-aware.
+        context (Dict): The flow context (a copy in a process worker).
+        continue_if_none (bool): Whether to continue processing if a filter returns None.
+        ignore_last_filter_return (bool): Whether to ignore the return value of the last filter.
+        stages (Optional[List[FlowStageStats]]): The statistics of each filter, updated when profiling.
+
+    Returns:
+        List[Tuple[int, Optional[str]]]: Status and FlowSkipData message of each data (see _apply_filters_chain).
+
+    Raises:
+        FlowFilterError: If a batch-aware filter does not return a list of the same length.
+    """
+
+    nb_filters: int = len(filters)
+    statuses: List[Tuple[int, Optional[str]]] = [(data_processed, None)] * len(batch)
+    values: List[Any] = list(batch)
+    alive: List[int] = list(range(len(batch)))
+    for index, (fct, with_context, is_batch) in enumerate(filters, start=1):
+        if not alive:
+            break
+        outputs: List[Any] = []
+        stage: Optional[FlowStageStats] = stages[index - 1] if stages is not None else None
+        if is_batch:
+            inputs: List[Any] = [values[i] for i in alive]
+            if stage is not None:
+                start: float = time.perf_counter()
+            try:
+                if with_context:
+                    outputs = fct(data=inputs, context=context)
+                else:
+                    outputs = fct(data=inputs)
+            except FlowSkipData as fsoe:
+                outputs = [fsoe] * len(alive)
+            if stage is not None:
+                stage.add(time.perf_counter() - start)
+            if not isinstance(outputs, list) or len(outputs) != len(inputs):
+                raise FlowFilterError("Flow: batch filter '%s' must return a list of %d data" % (getattr(fct, '__name__', fct), len(inputs)))
+        else:
+            for i in alive:
+                if stage is not None:
+                    start: float = time.perf_counter()
+                try:
+                    if with_context:
+                        outputs.append(fct(data=values[i], context=context))
+                    else:
+                        outputs.append(fct(data=values[i]))
+                except FlowSkipData as fsoe:
+                    outputs.append(fsoe)
+                if stage is not None:
+                    stage.add(time.perf_counter() - start)
+        stop_if_none: bool = not continue_if_none and (not ignore_last_filter_return or index != nb_filters)
+        still_alive: List[int] = []
+        for i, output in zip(alive, outputs):
+            if isinstance(output, FlowSkipData):
+                statuses[i] = (data_skipped, str(output))
+                if stage is not None:
+                    stage.skipped += 1
+            elif output is None and stop_if_none:
+                statuses[i] = (data_stopped_with_none, None)
+                if stage is not None:
+                    stage.stopped_with_none += 1
+            else:
+                values[i] = output
+                still_alive.append(i)
+        alive = still_alive
+    return statuses
+
+
+def _apply_filters_chain(data: Any,
+                         filters: List[Tuple[Callable, bool]],
+                         context: Dict,
+                         continue_if_none: bool,
+                         ignore_last_filter_return: bool,
+                         stages: Optional[List[FlowStageStats]] = None) -> Tuple[int, Optional[str]]:
+    """
+    Applies a filter chain to one data (run by the workers of a parallel flow).
+
+    Args:
+        data (Any): The data to apply the filters to.
+        filters (List[Tuple[Callable, bool]]): The filters and whether they need the context.
+        context (Dict): The flow context (a copy in a process worker).
+        continue_if_none (bool): Whether to continue processing if a filter returns None.
+        ignore_last_filter_return (bool): Whether to ignore the return value of the last filter.
+        stages (Optional[List[FlowStageStats]]): The statistics of each filter, updated when profiling.
+
+    Returns:
+        Tuple[int, Optional[str]]: data_processed, data_stopped_with_none or data_skipped,
+            and the FlowSkipData message.
+    """
+
+    nb_filters: int = len(filters)
+    stage: Optional[FlowStageStats] = None
+    start: float = 0.0
+    try:
+        for index, (fct, with_context) in enumerate(filters, start=1):
+            if stages is not None:
+                stage = stages[index - 1]
+                start = time.perf_counter()
+            if with_context:
+                data = fct(data=data, context=context)
+            else:
+                data = fct(data=data)
+            if stage is not None:
+                stage.add(time.perf_counter() - start)
+            if (data is None
+                    and not continue_if_none
+                    and
+                    (
+                        not ignore_last_filter_return
+                        or index != nb_filters
+                    )):
+                if stage is not None:
+                    stage.stopped_with_none += 1
+                return data_stopped_with_none, None
+    except FlowSkipData as fsoe:
+        if stage is not None:
+            stage.add(time.perf_counter() - start)
+            stage.skipped += 1
+        return data_skipped, str(fsoe)
+    return data_processed, None
+
+
+def _apply_filters_profiled(apply_fct: Callable, nb_filters: int, *args: Any) -> Tuple[Any, List[FlowStageStats]]:
+    """
+    Applies a filter chain with _apply_filters_chain or _apply_filters_batch, collecting the statistics of
+    each filter (run by the workers of a profiled parallel flow).
+
+    Args:
+        apply_fct (Callable): _apply_filters_chain or _apply_filters_batch.
+        nb_filters (int): The number of filters.
+        args: The arguments of apply_fct.
+
+    Returns:
+        Tuple[Any, List[FlowStageStats]]: The apply_fct result and the statistics of each filter.
+    """
+
+    stages: List[FlowStageStats] = [FlowStageStats('') for _ in range(nb_filters)]
+    return apply_fct(*args, stages), stages
+
+
 class Flow:
     """
     A flow of data processing functions.
@@ -60,6 +437,10 @@ class Flow:
     """
 
     context_prefix: Final[str] = 'context:'
+    executors: Final[Dict[str, type]] = {
+        'thread': ThreadPoolExecutor,
+        'process': ProcessPoolExecutor,
+    }
 
     def __add_flow_function_in_dict(self, fct: Callable) -> None:
         """
@@ -90,7 +471,7 @@ class Flow:
         else:
             self.modulo_functions_dict[modulo_n, idx_fct] = False
 
-    def __get_arg_integer_gt_zero(self, arg_value: Optional[Union[int, str]], comment: str) -> Optional[Union[int, str]]:
+    def _get_arg_integer_gt_zero(self, arg_value: Optional[Union[int, str]], comment: str) -> Optional[Union[int, str]]:
         """
         Validate and sanitize an argument value to ensure it meets good conditions.
 
@@ -126,7 +507,14 @@ class Flow:
                  ignore_last_filter_return: bool = True,
                  context: Optional[Dict] = None,
                  log_modulo: Optional[Union[int, str]] = None,
-                 size_of_set: Optional[Union[int, str]] = None) -> None:
+                 size_of_set: Optional[Union[int, str]] = None,
+                 workers: Optional[Union[int, str]] = None,
+                 executor: str = 'thread',
+                 ordered: bool = True,
+                 max_in_flight: Optional[Union[int, str]] = None,
+                 batch_size: Optional[Union[int, str]] = None,
+                 batch_time: Optional[float] = None,
+                 profile: bool = False) -> None:
         """
         Initializes a new Flow instance.
 
@@ -138,9 +526,30 @@ class Flow:
             continue_if_none(bool, optional): Whether to continue processing if a filter returns None. Defaults to False.
             ignore_last_filter_return(bool, optional): Whether to ignore the return value of the last filter. Defaults to True.
             context(Optional[Dict], optional): The initial context for the flow. Defaults to None.
+            workers(Optional[Union[int, str]], optional): Number of workers applying the filter chain concurrently
+                (an integer or 'context:<field name>'). Defaults to None (filters applied by the caller thread).
+            executor(str, optional): 'thread' or 'process' pool. Process workers get a copy of the context:
+                their context updates are lost, and filters must be picklable. Defaults to 'thread'.
+            ordered(bool, optional): Whether data results (counters, modulo functions) are handled in load order.
+                Defaults to True.
+            max_in_flight(Optional[Union[int, str]], optional): Maximum number of loaded data not yet handled
+                (an integer or 'context:<field name>'), or of batches in batch mode. Defaults to 4 times the number
+                of workers.
+            batch_size(Optional[Union[int, str]], optional): Batch mode: loaded data are grouped in batches of this
+                size (an integer or 'context:<field name>'), and the filters are applied batch by batch, one filter at a
+                time. Batch-aware filters (see flow_batch) get the list of data of a batch. Counters and modulo
+                functions are still by data, once the batch is filtered. Defaults to None.
+            batch_time(Optional[float], optional): Batch mode: a batch is closed when this number of seconds has
+                elapsed since its first data (checked when a data is loaded). Defaults to None.
+            profile(bool, optional): Whether to profile the run: init and finalyze functions durations, loader wait
+                time, and filters call counts, durations (total, p50, p95, p99) and data skipped or stopped
+                with None by each filter (a batch-aware filter counts one call by batch; with workers, the
+                statistics are collected by the workers and merged). The report
+                is available as `report` after `run()`, and a summary is logged with each `log_modulo` log.
+                Defaults to False.
 
         Raises:
-            ValueError: If fct_init or fct_load are not callable.
+            ValueError: If fct_init or fct_load are not callable, or if the executor is unknown.
         """
 
         self.flow_functions_dict: Dict[int, bool] = {}
@@ -151,8 +560,22 @@ class Flow:
         self.flow_functions_final_start: int = 0
         self.modulo_functions_nb: int = 0
         self.modulo_functions_dict: Dict[int, Union[Callable, List[Callable]]] = {}
-        self.size_of_set: Optional[Union[int, str]] = self.__get_arg_integer_gt_zero(size_of_set, 'size of set')
-        self.log_modulo: Optional[Union[int, str]] = self.__get_arg_integer_gt_zero(log_modulo, 'log modulo')
+        self.size_of_set: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(size_of_set, 'size of set')
+        self.log_modulo: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(log_modulo, 'log modulo')
+        self.workers: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(workers, 'workers')
+        self.max_in_flight: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(max_in_flight, 'max in flight')
+        self.ordered: bool = ordered
+        self.profile: bool = profile
+        self.profiler: Optional[FlowProfiler] = None
+        self.report: Optional[Dict[str, Any]] = None
+        self.batch_size: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(batch_size, 'batch size')
+        self.batch_time: Optional[float] = batch_time
+        if batch_time is not None and (not isinstance(batch_time, (int, float)) or batch_time <= 0):
+            logger.error("Flow: batch time value is invalid: %s" % (batch_time,))
+            self.batch_time = None
+        if executor not in self.executors:
+            raise ValueError("Flow: '%s' is not a valid executor" % (executor))
+        self.executor: str = executor
 
         self.functions_init: List[Callable] = None
         if fct_init:
@@ -184,52 +607,73 @@ class Flow:
 
         logger.debug('Flow: init done')
 
-    def __apply_filter_fct(self, data, fct_idx_tmp, fct) -> Any:
+    def _bind_context(self, fct: Callable, with_context: bool) -> Callable:
         """
-        Applies a filter to the given data.
+        Pre-binds the context to a function that needs it.
 
         Args:
-            data(Any): The data to apply the filter to.
-            fct_idx_tmp(int): The index of the filter.
-            fct(Callable): The filter function.
+            fct (Callable): The function.
+            with_context (bool): Whether the function has a 'context' parameter.
 
         Returns:
-            Any: The filtered data.
+            Callable: The function, or a partial with the context bound.
         """
 
-        if self.flow_functions_dict[fct_idx_tmp]:
-            data: Any = fct(data=data, context=self.context)
-        else:
-            data: Any = fct(data=data)
+        if with_context:
+            return partial(fct, context=self.context)
+        return fct
+
+    def _compile_filter(self, fct: Callable, with_context: bool) -> Callable[[Any], Any]:
+        """
+        Compiles a filter into a one positional argument function (keyword arguments calls are slower).
+
+        The filter is called positionally when its first parameters are 'data' (and 'context'), else by keywords.
+
+        Args:
+            fct (Callable): The filter.
+            with_context (bool): Whether the filter has a 'context' parameter.
 
-        return data
+        Returns:
+            Callable[[Any], Any]: The function to call with the data.
+        """
 
-    def __apply_filters_fct(self, data, fct_idx_tmp) -> None:
+        positional_kinds: Tuple = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        parameters: List[inspect.Parameter] = list(inspect.signature(fct).parameters.values())
+        expected_names: List[str] = ['data', 'context'] if with_context else ['data']
+        positional: bool = (len(parameters) >= len(expected_names)
+                            and all(parameter.name == name and parameter.kind in positional_kinds
+                                    for parameter, name in zip(parameters, expected_names)))
+        context: Dict = self.context
+        if with_context:
+            if positional:
+                return lambda data: fct(data, context)
+            return lambda data: fct(data=data, context=context)
+        if positional:
+            return fct
+        return lambda data: fct(data=data)
+
+    def _compile_filters(self, fct_idx: int) -> List[Tuple[Callable, bool]]:
         """
-        Applies all filters to the given data.
+        Compiles the filter chain applied by the caller thread: filters called with the data only (see
+        _compile_filter), and whether a None return stops the data.
 
         Args:
-            data(Any): The data to apply the filters to.
-            fct_idx_tmp(int): The index of the filter.
+            fct_idx (int): The index of the load function.
+
+        Returns:
+            List[Tuple[Callable, bool]]: The bound filters and their stop on None flags.
         """
 
-        index: int = 0
-        for index, fct in enumerate(self.functions_filter, start=1):
-            fct_idx_tmp += 1
-            data: Any = self.__apply_filter_fct(data, fct_idx_tmp, fct)
-            if (data is None
-                    and not self.continue_if_none
-                    and
-                    (
-                        not self.ignore_last_filter_return
-                        or index != self.nb_filters
-                    )):
-                self.nb_data_stopped_with_none += 1
-                break
-        else:
-            self.nb_data_processed += 1
+        nb_filters: int = len(self.functions_filter)
+        return [
+            (
+                self._compile_filter(fct, self.flow_functions_dict[fct_idx_tmp]),
+                not self.continue_if_none and (not self.ignore_last_filter_return or index != nb_filters)
+            )
+            for index, (fct_idx_tmp, fct) in enumerate(enumerate(self.functions_filter, start=fct_idx + 1), start=1)
+        ]
 
-    def __build_function_dicts(self) -> None:
+    def _build_function_dicts(self) -> None:
         """
         Builds the flow's dictionary with functions and their context requirements.
         """
@@ -270,7 +714,16 @@ class Flow:
             else:
                 self.functions_modulo = None
 
-    def __read_var_from_context_integer_gt_zero(self, fieldname: str, comment: Optional[str] = None) -> Optional[int]:
+        # Modulo functions with their context bound (see _after_data)
+        self.modulos_plan: List[Tuple[int, List[Callable]]] = []
+        if self.functions_modulo:
+            for modulo_n, modulos_fct in self.functions_modulo.items():
+                self.modulos_plan.append((modulo_n, [
+                    self._bind_context(fct, self.modulo_functions_dict[modulo_n, idx_fct])
+                    for idx_fct, fct in enumerate(modulos_fct, start=1)
+                ]))
+
+    def _read_var_from_context_integer_gt_zero(self, fieldname: str, comment: Optional[str] = None) -> Optional[int]:
         """
         Retrieves an integer value from the context of a flow field.
 
@@ -310,21 +763,27 @@ class Flow:
                 value = None
         return value
 
-    def __init_vars(self) -> None:
+    def _init_vars(self) -> None:
         """
         Initializes instance variables from context values.
 
-        This method reads two integer values from the context:
+        This method reads five integer values from the context:
         - 'size_of_set': The number of elements in the set.
         - 'log_modulo': A modulo value used for logarithmic calculations.
+        - 'workers': The number of workers applying the filters.
+        - 'max_in_flight': The maximum number of data handled by the workers at once.
+        - 'batch_size': The number of data of a batch.
 
-        Both values are checked to ensure they are greater than zero, which is a valid input range.
+        All values are checked to ensure they are greater than zero, which is a valid input range.
 
         :param self: The instance of the class
         """
 
-        self.size_of_set = self.__read_var_from_context_integer_gt_zero('size_of_set')
-        self.log_modulo = self.__read_var_from_context_integer_gt_zero('log_modulo')
+        self.size_of_set = self._read_var_from_context_integer_gt_zero('size_of_set')
+        self.log_modulo = self._read_var_from_context_integer_gt_zero('log_modulo')
+        self.workers = self._read_var_from_context_integer_gt_zero('workers')
+        self.max_in_flight = self._read_var_from_context_integer_gt_zero('max_in_flight')
+        self.batch_size = self._read_var_from_context_integer_gt_zero('batch_size')
 
     def __init_flow(self, fct_idx: int = 0) -> int:
         """
@@ -341,12 +800,17 @@ class Flow:
 
         for fct in self.functions_init:
             fct_idx += 1
-            if self.flow_functions_dict[fct_idx]:
+            if self.profiler is not None:
+                if self.flow_functions_dict[fct_idx]:
+                    self.profiler.call(self.profiler.init, fct, context=self.context)
+                else:
+                    self.profiler.call(self.profiler.init, fct)
+            elif self.flow_functions_dict[fct_idx]:
                 fct(context=self.context)
             else:
                 fct()
 
-        self.__init_vars()
+        self._init_vars()
 
         logger.debug("Flow: Init ends")
 
@@ -385,7 +849,12 @@ class Flow:
             fct (function): The function to be applied.
         """
 
-        if self.flow_functions_dict[idx_fct]:
+        if self.profiler is not None:
+            if self.flow_functions_dict[idx_fct]:
+                self.profiler.call(self.profiler.finalyze, fct, context=self.context)
+            else:
+                self.profiler.call(self.profiler.finalyze, fct)
+        elif self.flow_functions_dict[idx_fct]:
             fct(context=self.context)
         else:
             fct()
@@ -402,7 +871,7 @@ class Flow:
 
         logger.debug("Flow: Finalyze ends")
 
-    def __log_modulo(self, flag_final: bool = not_final) -> None:
+    def _log_modulo(self, flag_final: bool = not_final) -> None:
         """
         Logs a message indicating the current state of the data set.
 
@@ -429,75 +898,317 @@ class Flow:
                 )
             )
 
-    def __apply_modulo_fct(self, modulo_n, idx_fct, fct) -> None:
+        if self.profiler is not None:
+            logger.debug("Flow: profile%s: %s" % (' (final)' if flag_final else '', self.profiler.summary()))
+
+    def __apply_modulos_fct(self) -> None:
+        """
+        Applies the modulo functions whose modulo number divides the total number of data, then computes
+        the next total number of data triggering a modulo function.
+        """
+
+        nb_data_total: int = self.nb_data_total
+        next_modulo: Optional[int] = None
+        for modulo_n, modulos_fct in self.modulos_plan:
+            if nb_data_total % modulo_n == 0:
+                for fct in modulos_fct:
+                    fct(idx=nb_data_total)
+            next_n: int = (nb_data_total // modulo_n + 1) * modulo_n
+            if next_modulo is None or next_n < next_modulo:
+                next_modulo = next_n
+        self.next_modulo = next_modulo
+
+    def _after_data(self) -> None:
+        """
+        Applies modulo functions and logs, after a data has been handled.
+
+        Only compares the total number of data with precomputed next triggers.
         """
-        Applies the specified function to the data set with modulo functionality.
 
-        If the specified index of function exists in the dictionary, applies it to the total number of data points with the given context.
-        Otherwise, applies it to the total number of data points without any additional context.
+        if self.nb_data_total == self.next_modulo:
+            self.__apply_modulos_fct()
+
+        if self.nb_data_total == self.next_log:
+            self.next_log += self.log_modulo
+            self._log_modulo()
+
+    def _handle_filters_result(self, future: Future, profiled: bool = False) -> None:
+        """
+        Updates counters with the result of a filter chain applied by a worker.
 
         Args:
-            modulo_n (int): The modulo number for which the function is applied.
-            idx_fct (int): The index of the function to be applied.
-            fct (function): The function to be applied to the data set.
+            future (Future): The worker result (see _apply_filters_chain and _apply_filters_batch), its exception
+                is raised.
+            profiled (bool): Whether the result comes from _apply_filters_profiled (its statistics are merged).
         """
 
-        if self.modulo_functions_dict[modulo_n, idx_fct]:
-            fct(idx=self.nb_data_total, context=self.context)
+        result: Union[Tuple[int, Optional[str]], List[Tuple[int, Optional[str]]]] = future.result()
+        if profiled:
+            result, stages = result
+            for stage, worker_stage in zip(self.profiler.filters, stages):
+                stage.merge(worker_stage)
+        if isinstance(result, list):
+            for status, message in result:
+                self._count_data(status, message)
         else:
-            fct(idx=self.nb_data_total)
+            self._count_data(*result)
 
-    def __apply_modulos_fct(self) -> None:
+    def _count_data(self, status: int, message: Optional[str]) -> None:
         """
-        Applies all modulo functions to the data set based on its size and the given modulo numbers.
+        Updates counters with the status of a filtered data, then applies modulo functions and logs.
 
-        Iterates through each modulo number and checks if the total number of data points is divisible by it.
-        If it is, iterates through each function associated with that modulo number and applies them to the data set using the `__apply_modulo_fct` method.
+        Args:
+            status (int): data_processed, data_stopped_with_none or data_skipped.
+            message (Optional[str]): The FlowSkipData message.
         """
 
-        for modulo_n in self.functions_modulo:
-            if self.nb_data_total % modulo_n == 0:
-                for idx_fct, fct in enumerate(self.functions_modulo[modulo_n], start=1):
-                    self.__apply_modulo_fct(modulo_n, idx_fct, fct)
+        self.nb_data_total += 1
+        if status == data_processed:
+            self.nb_data_processed += 1
+        elif status == data_stopped_with_none:
+            self.nb_data_stopped_with_none += 1
+        else:
+            self.nb_data_skip += 1
+            logger.debug("FlowSkipData: %s" % message)
 
-    def __filter_data(self, fct_idx: int, all_data: Generator) -> Tuple[int, int, int, int]:
+        self._after_data()
+
+    def __filter_data_parallel(self, fct_idx: int, all_data: Generator) -> None:
         """
-        Applies all filters to the given data.
+        Applies all filters to the given data with a pool of workers.
+
+        At most `max_in_flight` data are loaded and not yet handled. Results are handled by the caller
+        thread (counters, modulo functions, logs), in load order if `ordered`, else in completion order.
 
         Args:
             fct_idx (int): The index of the function.
             all_data (Generator): A generator of unfiltered data.
+        """
+
+        if self.batching:
+            items: Any = self._iter_batches(all_data)
+            apply_fct: Callable = _apply_filters_batch
+            filters: List[Tuple] = self._build_filters(fct_idx, with_batch=True)
+        else:
+            items: Any = all_data
+            apply_fct: Callable = _apply_filters_chain
+            filters: List[Tuple] = self._build_filters(fct_idx)
+        max_in_flight: int = self.max_in_flight if self.max_in_flight is not None else 4 * self.workers
+        max_in_flight = max(max_in_flight, 1)
+        profiled: bool = self.profiler is not None
+        if profiled:
+            self.profiler.filters = [FlowStageStats(self.profiler.fct_name(fct)) for fct in self.functions_filter]
+
+        logger.debug("Flow: %d %s workers, %d data in flight" % (self.workers, self.executor, max_in_flight))
+
+        pool = self.executors[self.executor](max_workers=self.workers)
+        try:
+            in_order: Deque[Future] = deque()
+            in_flight: Set[Future] = set()
+            for data in items:
+                if profiled:
+                    future: Future = pool.submit(_apply_filters_profiled,
+                                                 apply_fct,
+                                                 len(filters),
+                                                 data,
+                                                 filters,
+                                                 self.context,
+                                                 self.continue_if_none,
+                                                 self.ignore_last_filter_return)
+                else:
+                    future: Future = pool.submit(apply_fct,
+                                                 data,
+                                                 filters,
+                                                 self.context,
+                                                 self.continue_if_none,
+                                                 self.ignore_last_filter_return)
+                if self.ordered:
+                    in_order.append(future)
+                    if len(in_order) >= max_in_flight:
+                        self._handle_filters_result(in_order.popleft(), profiled)
+                else:
+                    in_flight.add(future)
+                    if len(in_flight) >= max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._handle_filters_result(future, profiled)
+            while in_order:
+                self._handle_filters_result(in_order.popleft(), profiled)
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._handle_filters_result(future, profiled)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        pool.shutdown(wait=True)
+
+    def _build_filters(self, fct_idx: int, with_batch: bool = False) -> List[Tuple]:
+        """
+        Builds the filter chain run by _apply_filters_chain or _apply_filters_batch.
+
+        Args:
+            fct_idx (int): The index of the load function.
+            with_batch (bool): Whether to add if each filter is batch-aware.
 
         Returns:
-            Tuple[int, int, int, int]: The total count, processed count, skipped count, and stopped by None count.
+            List[Tuple]: The filters, whether they need the context (and whether they are batch-aware).
         """
 
-        logger.debug("Flow: Apply filters")
+        if with_batch:
+            return [
+                (fct, self.flow_functions_dict[fct_idx_tmp], getattr(fct, batch_attribute, False))
+                for fct_idx_tmp, fct in enumerate(self.functions_filter, start=fct_idx + 1)
+            ]
+        return [
+            (fct, self.flow_functions_dict[fct_idx_tmp])
+            for fct_idx_tmp, fct in enumerate(self.functions_filter, start=fct_idx + 1)
+        ]
+
+    def _iter_batches(self, all_data: Any) -> Generator[List[Any], None, None]:
+        """
+        Groups data in batches of `batch_size` data or `batch_time` seconds.
+
+        Args:
+            all_data (Any): A generator of unfiltered data.
+
+        Yields:
+            List[Any]: A batch of data.
+        """
+
+        batch_size: Optional[int] = self.batch_size
+        if batch_size is None and self.batch_time is None:
+            # Only batch-aware filters: batches of one data
+            batch_size = 1
+        batch: List[Any] = []
+        batch_start: float = 0.0
+        for data in all_data:
+            if not batch and self.batch_time is not None:
+                batch_start = time.monotonic()
+            batch.append(data)
+            if (batch_size is not None and len(batch) >= batch_size) \
+                    or (self.batch_time is not None and time.monotonic() - batch_start >= self.batch_time):
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _reset_counters(self) -> None:
+        """
+        Resets data counters before applying filters.
+        """
 
         self.nb_filters: int = len(self.functions_filter)
         self.nb_data_total: int = 0
         self.nb_data_processed: int = 0
         self.nb_data_skip: int = 0
         self.nb_data_stopped_with_none: int = 0
+        # Next totals triggering modulo functions and logs
+        self.next_modulo: Optional[int] = min((modulo_n for modulo_n, _ in self.modulos_plan), default=None)
+        self.next_log: Optional[int] = self.log_modulo if self.log_modulo else None
+        # Batch mode, also used (by batches of one data) if a filter is batch-aware
+        self.batching: bool = (self.batch_size is not None
+                               or self.batch_time is not None
+                               or any(getattr(fct, batch_attribute, False) for fct in self.functions_filter))
+
+    def __filter_data_profiled(self, fct_idx: int, all_data: Generator) -> None:
+        """
+        Applies all filters to the given data, timing the loader and each filter call (see `profile`).
 
-        for data in all_data:
+        Args:
+            fct_idx (int): The index of the function.
+            all_data (Generator): A generator of unfiltered data.
+        """
+
+        filters: List[Tuple[Callable, bool]] = self._compile_filters(fct_idx)
+        profiler: FlowProfiler = self.profiler
+        profiler.filters = [FlowStageStats(profiler.fct_name(fct)) for fct in self.functions_filter]
+        stages: List[Tuple[Callable, bool, FlowStageStats]] = [
+            (fct, stop_if_none, stage) for (fct, stop_if_none), stage in zip(filters, profiler.filters)
+        ]
+        perf_counter: Callable[[], float] = time.perf_counter
+        for data in profiler.iter_loader(all_data):
             self.nb_data_total += 1
 
-            fct_idx_tmp: int = fct_idx
+            start: float = 0.0
+            stage: Optional[FlowStageStats] = None
             try:
-                self.__apply_filters_fct(data, fct_idx_tmp)
+                for fct, stop_if_none, stage in stages:
+                    start = perf_counter()
+                    data = fct(data)
+                    stage.add(perf_counter() - start)
+                    if data is None and stop_if_none:
+                        stage.stopped_with_none += 1
+                        self.nb_data_stopped_with_none += 1
+                        break
+                else:
+                    self.nb_data_processed += 1
             except FlowSkipData as fsoe:
+                stage.add(perf_counter() - start)
+                stage.skipped += 1
                 self.nb_data_skip += 1
                 logger.debug("FlowSkipData: %s" % fsoe)
 
-            if self.functions_modulo:
-                self.__apply_modulos_fct()
+            if self.nb_data_total == self.next_modulo or self.nb_data_total == self.next_log:
+                self._after_data()
+
+    def __filter_data(self, fct_idx: int, all_data: Generator) -> Tuple[int, int, int, int]:
+        """
+        Applies all filters to the given data.
+
+        Args:
+            fct_idx (int): The index of the function.
+            all_data (Generator): A generator of unfiltered data.
+
+        Returns:
+            Tuple[int, int, int, int]: The total count, processed count, skipped count, and stopped by None count.
+        """
+
+        logger.debug("Flow: Apply filters")
 
-            if self.log_modulo and self.nb_data_total % self.log_modulo == 0:
-                self.__log_modulo()
+        self._reset_counters()
+
+        if self.workers is not None and self.workers > 1:
+            self.__filter_data_parallel(fct_idx, self.profiler.iter_loader(all_data) if self.profiler is not None else all_data)
+        elif self.profiler is not None and not self.batching:
+            self.__filter_data_profiled(fct_idx, all_data)
+        elif self.batching:
+            filters: List[Tuple] = self._build_filters(fct_idx, with_batch=True)
+            stages: Optional[List[FlowStageStats]] = None
+            if self.profiler is not None:
+                self.profiler.filters = [FlowStageStats(self.profiler.fct_name(fct)) for fct in self.functions_filter]
+                stages = self.profiler.filters
+                all_data = self.profiler.iter_loader(all_data)
+            for batch in self._iter_batches(all_data):
+                for status, message in _apply_filters_batch(batch,
+                                                            filters,
+                                                            self.context,
+                                                            self.continue_if_none,
+                                                            self.ignore_last_filter_return,
+                                                            stages):
+                    self._count_data(status, message)
+        else:
+            filters: List[Tuple[Callable, bool]] = self._compile_filters(fct_idx)
+            for data in all_data:
+                self.nb_data_total += 1
+
+                try:
+                    for fct, stop_if_none in filters:
+                        data = fct(data)
+                        if data is None and stop_if_none:
+                            self.nb_data_stopped_with_none += 1
+                            break
+                    else:
+                        self.nb_data_processed += 1
+                except FlowSkipData as fsoe:
+                    self.nb_data_skip += 1
+                    logger.debug("FlowSkipData: %s" % fsoe)
+
+                if self.nb_data_total == self.next_modulo or self.nb_data_total == self.next_log:
+                    self._after_data()
 
         if self.log_modulo:
-            self.__log_modulo(final)
+            self._log_modulo(final)
 
         logger.debug("Flow: End of filters")
 
@@ -513,11 +1224,15 @@ class Flow:
 
         output_data: Tuple[int, int, int, int] = (0, 0, 0, 0)
 
-        self.__build_function_dicts()
+        self.profiler = FlowProfiler() if self.profile else None
+        self.report = None
+
+        self._build_function_dicts()
 
         fct_idx: int = 0
         if self.functions_init is None:
-            logger.init("Flow: No init functions")
+            logger.info("Flow: No init functions")
+            self._init_vars()
         else:
             fct_idx = self.__init_flow()
 
@@ -536,6 +1251,256 @@ class Flow:
         else:
             self.__apply_finalyzes_fct()
 
+        if self.profiler is not None:
+            self.report = self.profiler.report(output_data)
+
+        return output_data
+
+
+async def _call_fct(fct: Callable, *args, **kwargs) -> Any:
+    """
+    Calls a function or a coroutine function and returns its (awaited) result.
+    """
+
+    result: Any = fct(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _apply_filters_chain_async(data: Any,
+                                     filters: List[Tuple[Callable, bool, bool]],
+                                     context: Dict,
+                                     continue_if_none: bool,
+                                     ignore_last_filter_return: bool) -> Tuple[int, Optional[str]]:
+    """
+    Applies a filter chain (functions or coroutine functions) to one data (see _apply_filters_chain).
+
+    Batch-aware filters get a batch of one data.
+
+    Raises:
+        FlowFilterError: If a batch-aware filter does not return a list of one data.
+    """
+
+    nb_filters: int = len(filters)
+    try:
+        for index, (fct, with_context, is_batch) in enumerate(filters, start=1):
+            if is_batch:
+                data = [data]
+            if with_context:
+                data = await _call_fct(fct, data=data, context=context)
+            else:
+                data = await _call_fct(fct, data=data)
+            if is_batch:
+                if not isinstance(data, list) or len(data) != 1:
+                    raise FlowFilterError("Flow: batch filter '%s' must return a list of 1 data" % (getattr(fct, '__name__', fct)))
+                data = data[0]
+                if isinstance(data, FlowSkipData):
+                    raise data
+            if (data is None
+                    and not continue_if_none
+                    and
+                    (
+                        not ignore_last_filter_return
+                        or index != nb_filters
+                    )):
+                return data_stopped_with_none, None
+    except FlowSkipData as fsoe:
+        return data_skipped, str(fsoe)
+    return data_processed, None
+
+
+class AsyncFlow(Flow):
+    """
+    An asyncio flow of data processing functions, for I/O-bound loaders and filters.
+
+    Same parameters and behavior as Flow, except:
+        - `fct_load` may return an async iterator (async generator) or an iterator.
+        - init, filter and finalyze functions may be coroutine functions (modulo functions are
+          called synchronously, between records).
+        - up to `concurrency` data are filtered concurrently: the loader is not read further while
+          `concurrency` data are being filtered (backpressure).
+        - `run()` is a coroutine: `asyncio.run(AsyncFlow(...).run())`.
+        - there is no batch mode (batch_size and batch_time are not used, batch-aware filters get
+          a batch of one data).
+        - there is no profiling (profile is not used).
+
+    Methods:
+        run(): Runs the flow and returns the counts.
+    """
+
+    def __init__(self, *args, concurrency: Optional[Union[int, str]] = None, **kwargs) -> None:
+        """
+        Initializes a new AsyncFlow instance.
+
+        Args:
+            args, kwargs: Flow parameters (workers, executor, max_in_flight, batch_size, batch_time and profile are
+                not used).
+            concurrency(Optional[Union[int, str]], optional): Maximum number of data filtered concurrently
+                (an integer or 'context:<field name>'). Defaults to None (one data at a time).
+        """
+
+        super().__init__(*args, **kwargs)
+        self.concurrency: Optional[Union[int, str]] = self._get_arg_integer_gt_zero(concurrency, 'concurrency')
+
+    def _init_vars(self) -> None:
+        """
+        Initializes instance variables from context values (see Flow), and the concurrency.
+        """
+
+        super()._init_vars()
+        self.concurrency = self._read_var_from_context_integer_gt_zero('concurrency')
+
+    async def __init_flow(self, fct_idx: int = 0) -> int:
+        """
+        Initializes the flow and applies all functions (awaited if coroutine functions).
+
+        Args:
+            fct_idx (int, optional): The index of the function to start with. Defaults to 0.
+
+        Returns:
+            int: The final index.
+        """
+
+        logger.debug("Flow: Init starts")
+
+        for fct in self.functions_init:
+            fct_idx += 1
+            if self.flow_functions_dict[fct_idx]:
+                await _call_fct(fct, context=self.context)
+            else:
+                await _call_fct(fct)
+
+        self._init_vars()
+
+        logger.debug("Flow: Init ends")
+
+        return fct_idx
+
+    async def __filter_data(self, fct_idx: int, all_data: Any) -> Tuple[int, int, int, int]:
+        """
+        Applies all filters to the given data, with up to `concurrency` data at once.
+
+        Args:
+            fct_idx (int): The index of the load function.
+            all_data (Any): An async iterator or an iterator of unfiltered data.
+
+        Returns:
+            Tuple[int, int, int, int]: The total count, processed count, skipped count, and stopped by None count.
+        """
+
+        logger.debug("Flow: Apply filters")
+
+        self._reset_counters()
+        filters: List[Tuple[Callable, bool, bool]] = self._build_filters(fct_idx, with_batch=True)
+        concurrency: int = self.concurrency if self.concurrency is not None else 1
+
+        in_order: Deque[asyncio.Task] = deque()
+        in_flight: Set[asyncio.Task] = set()
+
+        async def handle_one() -> None:
+            nonlocal in_flight
+            if self.ordered:
+                task: asyncio.Task = in_order.popleft()
+                await asyncio.wait([task])
+                self._handle_filters_result(task)
+            else:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    self._handle_filters_result(task)
+
+        async def submit(data: Any) -> None:
+            task: asyncio.Task = asyncio.ensure_future(_apply_filters_chain_async(data,
+                                                                                  filters,
+                                                                                  self.context,
+                                                                                  self.continue_if_none,
+                                                                                  self.ignore_last_filter_return))
+            if self.ordered:
+                in_order.append(task)
+            else:
+                in_flight.add(task)
+            while len(in_order) + len(in_flight) >= concurrency:
+                await handle_one()
+
+        try:
+            if hasattr(all_data, '__aiter__'):
+                async for data in all_data:
+                    await submit(data)
+            else:
+                for data in all_data:
+                    await submit(data)
+            while in_order or in_flight:
+                await handle_one()
+        except BaseException:
+            pending: List[asyncio.Task] = list(in_order) + list(in_flight)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        if self.log_modulo:
+            self._log_modulo(final)
+
+        logger.debug("Flow: End of filters")
+
+        return self.nb_data_total, self.nb_data_processed, self.nb_data_skip, self.nb_data_stopped_with_none
+
+    async def __apply_finalyzes_fct(self) -> None:
+        """
+        Applies all finalyze functions (awaited if coroutine functions).
+        """
+
+        logger.debug("Flow: Finalyze starts")
+
+        for idx_fct, fct in enumerate(self.functions_finalyze, start=self.flow_functions_final_start):
+            if self.flow_functions_dict[idx_fct]:
+                await _call_fct(fct, context=self.context)
+            else:
+                await _call_fct(fct)
+
+        logger.debug("Flow: Finalyze ends")
+
+    async def run(self) -> Tuple[int, int, int, int]:
+        """
+        Runs the flow and returns the counts.
+
+        Returns:
+            Tuple[int, int, int, int]: The total count, processed count, skipped count, and stopped by None count.
+        """
+
+        output_data: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+        self._build_function_dicts()
+
+        fct_idx: int = 0
+        if self.functions_init is None:
+            logger.info("Flow: No init functions")
+            self._init_vars()
+        else:
+            fct_idx = await self.__init_flow()
+
+        if self.function_load is None:
+            logger.warning("Flow: No load function")
+        else:
+            if self.functions_filter is None:
+                logger.warning("Flow: No filter functions")
+            else:
+                logger.debug("Flow: Call data generator")
+                fct_idx += 1
+                if self.flow_functions_dict[fct_idx]:
+                    all_data: Any = self.function_load(context=self.context)
+                else:
+                    all_data: Any = self.function_load()
+                if inspect.isawaitable(all_data):
+                    all_data = await all_data
+                logger.debug("Flow: End of call generator")
+                output_data = await self.__filter_data(fct_idx, all_data)
+
+        if self.functions_finalyze is None:
+            logger.info("Flow: No finalyze functions")
+        else:
+            await self.__apply_finalyzes_fct()
+
         return output_data
 
 
@@ -0,0 +1,217 @@
+#! /usr/bin/env python
+
+"""JSON backends used by depthdict and DictIO (to_json and file operators)
+
+A backend provides dumps (object -> str) and loads (str or bytes -> object).
+Installed faster codecs (orjson, msgspec, ujson) are detected, stdlib json is the fallback.
+
+In compatibility mode (the default), dumps output of the fast codec is normalized like
+stdlib json.dumps(ensure_ascii=True): non-ASCII characters are written as \\uXXXX escapes.
+Separators are the codec ones (compact for orjson and msgspec), so the output is not
+byte-identical to stdlib json but decodes to the same value. Documents the codec cannot
+encode (e.g. big integers) are written by stdlib json.dumps; note that orjson writes NaN
+and Infinity as null. loads falls back to stdlib json when the fast codec rejects a
+document (e.g. NaN or big integers), so results are identical to stdlib json.
+Decoding errors are always json.JSONDecodeError.
+
+    set_json_backend('orjson', compat=False)
+    json_backend().dumps({'a': 1})
+    # '{"a":1}'
+"""
+
+import json
+import re
+from importlib import import_module
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple, Union
+
+JSON_BACKENDS_PRIORITY: Final[Tuple[str, ...]] = ('orjson', 'msgspec', 'ujson', 'json')
+
+_non_ascii: Final[re.Pattern] = re.compile('[^\x00-\x7f]')
+
+
+class JsonBackend():
+    """A JSON codec: dumps returns a str, loads accepts str or bytes
+    """
+
+    def __init__(self,
+                 name: str,
+                 dumps: Callable[[Any], str],
+                 loads: Callable[[Union[str, bytes]], Any],
+                 compat: bool = False) -> None:
+        self.name: str = name
+        self.dumps: Callable[[Any], str] = dumps
+        self.loads: Callable[[Union[str, bytes]], Any] = loads
+        self.compat: bool = compat
+
+    def __repr__(self) -> str:
+        return "JsonBackend(%s%s)" % (self.name, ', compat' if self.compat else '')
+
+
+def _decode_error(e: Exception, s: Union[str, bytes]) -> json.JSONDecodeError:
+    if isinstance(e, json.JSONDecodeError):
+        return e
+    doc: str = s.decode('utf-8', errors='replace') if isinstance(s, (bytes, bytearray, memoryview)) else s
+    return json.JSONDecodeError(str(e), doc, 0)
+
+
+def _wrap_loads(loads: Callable[[Union[str, bytes]], Any], errors: Tuple[type, ...]) -> Callable[[Union[str, bytes]], Any]:
+    def wrapped_loads(s: Union[str, bytes]) -> Any:
+        try:
+            return loads(s)
+        except errors as e:
+            raise _decode_error(e, s) from e
+    return wrapped_loads
+
+
+def _stdlib_backend() -> JsonBackend:
+    return JsonBackend('json', json.dumps, json.loads, compat=True)
+
+
+def _orjson_backend() -> JsonBackend:
+    orjson = import_module('orjson')
+    option: int = orjson.OPT_NON_STR_KEYS
+    return JsonBackend('orjson',
+                       lambda o: orjson.dumps(o, option=option).decode('utf-8'),
+                       _wrap_loads(orjson.loads, (orjson.JSONDecodeError,)))
+
+
+def _msgspec_backend() -> JsonBackend:
+    msgspec_json = import_module('msgspec.json')
+    msgspec = import_module('msgspec')
+    encoder = msgspec_json.Encoder()
+    decoder = msgspec_json.Decoder()
+    return JsonBackend('msgspec',
+                       lambda o: encoder.encode(o).decode('utf-8'),
+                       _wrap_loads(decoder.decode, (msgspec.DecodeError,)))
+
+
+def _ujson_backend() -> JsonBackend:
+    ujson = import_module('ujson')
+    return JsonBackend('ujson',
+                       lambda o: ujson.dumps(o, ensure_ascii=False),
+                       _wrap_loads(ujson.loads, (ValueError,)))
+
+
+_backend_factories: Dict[str, Callable[[], JsonBackend]] = {
+    'json': _stdlib_backend,
+    'orjson': _orjson_backend,
+    'msgspec': _msgspec_backend,
+    'ujson': _ujson_backend,
+}
+
+_current_backend: Optional[JsonBackend] = None
+
+
+def register_json_backend(name: str, factory: Callable[[], JsonBackend]) -> None:
+    """Register a backend factory (it raises ImportError if its codec is not installed)
+    :param name: Backend name
+    :param factory: Function creating the backend
+    """
+    _backend_factories[name] = factory
+
+
+def available_json_backends() -> List[str]:
+    """Names of the backends whose codec is installed
+    :returns: List of backend names
+    """
+    names: List[str] = []
+    for name, factory in _backend_factories.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _escape_non_ascii(match: re.Match) -> str:
+    code: int = ord(match.group())
+    if code < 0x10000:
+        return '\\u%04x' % (code)
+    code -= 0x10000
+    return '\\u%04x\\u%04x' % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+def _ensure_ascii(s: str) -> str:
+    """Escape non-ASCII characters of a JSON document like stdlib json.dumps
+    (they only appear in strings, so the document is unchanged)
+    :param s: JSON document
+    :returns: The ASCII JSON document
+    """
+    if s.isascii():
+        return s
+    return _non_ascii.sub(_escape_non_ascii, s)
+
+
+def _compat_backend(backend: JsonBackend) -> JsonBackend:
+    if backend.compat:
+        return backend
+    fast_dumps: Callable[[Any], str] = backend.dumps
+    fast_loads: Callable[[Union[str, bytes]], Any] = backend.loads
+
+    def dumps(o: Any) -> str:
+        try:
+            return _ensure_ascii(fast_dumps(o))
+        except (TypeError, ValueError, OverflowError):
+            return json.dumps(o)
+
+    def loads(s: Union[str, bytes]) -> Any:
+        try:
+            return fast_loads(s)
+        except json.JSONDecodeError:
+            return json.loads(s)
+    return JsonBackend(backend.name, dumps, loads, compat=True)
+
+
+def get_json_backend(name: Optional[str] = None, compat: bool = True) -> JsonBackend:
+    """Create a backend
+    :param name: Backend name, None for the first installed one of JSON_BACKENDS_PRIORITY
+    :param compat: Compatibility mode (ASCII output and stdlib json decoding fallback, see module documentation)
+    :returns: The backend
+    """
+    if name is None:
+        for name in list(JSON_BACKENDS_PRIORITY) + [n for n in _backend_factories if n not in JSON_BACKENDS_PRIORITY]:
+            try:
+                backend: JsonBackend = _backend_factories[name]()
+            except (ImportError, KeyError):
+                continue
+            return _compat_backend(backend) if compat else backend
+        return _stdlib_backend()
+    if name not in _backend_factories:
+        raise Exception("'%s' is not a known JSON backend" % (name))
+    backend: JsonBackend = _backend_factories[name]()
+    return _compat_backend(backend) if compat else backend
+
+
+def set_json_backend(backend: Union[str, JsonBackend, None] = None, compat: bool = True) -> JsonBackend:
+    """Set the backend used by depthdict and DictIO
+    :param backend: Backend, backend name or None (auto-detected)
+    :param compat: Compatibility mode (ignored for a JsonBackend instance)
+    :returns: The backend
+    """
+    global _current_backend
+    if not isinstance(backend, JsonBackend):
+        backend = get_json_backend(backend, compat=compat)
+    _current_backend = backend
+    return backend
+
+
+def json_backend() -> JsonBackend:
+    """Current backend (auto-detected in compatibility mode on first use)
+    :returns: The backend
+    """
+    if _current_backend is None:
+        return set_json_backend()
+    return _current_backend
+
+
+def dumps(o: Any) -> str:
+    """Serialize with the current backend
+    """
+    return json_backend().dumps(o)
+
+
+def loads(s: Union[str, bytes]) -> Any:
+    """Deserialize with the current backend (json.JSONDecodeError on invalid documents)
+    """
+    return json_backend().loads(s)
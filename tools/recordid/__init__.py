@@ -0,0 +1,140 @@
+#! /usr/bin/env python
+
+"""Record id generators for flattened rows (depthdict.flat, dictflat.flat)
+
+An id generator is a callable: (table, d, ref_value, index, key_path) -> str
+    table: table name of the generated row
+    d: source dictionnary of the row
+    ref_value: id of the parent row (None for a root row)
+    index: position of the row in its parent list (None for a root row)
+    key_path: key path of the list in the parent row, e.g. 'a.list' (None for a root row)
+Callables without the key_path parameter are accepted by get_id_generator.
+"""
+
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+from uuid import uuid4
+
+IdGenerator = Callable[[str, Dict, Optional[str], Optional[int], Optional[str]], str]
+
+
+def uuid_id(table: str, d: Dict, ref_value: Optional[str], index: Optional[int], key_path: Optional[str] = None) -> str:
+    """Random id (uuid4), the historical behavior
+    """
+    return str(uuid4())
+
+
+class CounterIdGenerator():
+    """Monotonic integer ids: '1', '2', ... (optionally prefixed)
+    """
+
+    def __init__(self, start: int = 1, prefix: str = '') -> None:
+        self.prefix: str = prefix
+        self.next_id: int = start
+
+    def __call__(self, table: str, d: Dict, ref_value: Optional[str], index: Optional[int],
+                 key_path: Optional[str] = None) -> str:
+        self.next_id += 1
+        return '%s%d' % (self.prefix, self.next_id - 1)
+
+    def shard(self, shard_index: int) -> 'CounterIdGenerator':
+        """Independent generator for a shard of a parallel run: ids are prefixed by the shard index
+        and count from the same start, e.g. '0.1', '0.2', ..., '1.1', ...
+        Ids therefore depend on the number of shards and differ from a run without shards.
+        """
+        return CounterIdGenerator(start=self.next_id, prefix='%s%d.' % (self.prefix, shard_index))
+
+
+class HashIdGenerator():
+    """Content hash ids: hash of the table name, parent id, key path, position and scalar fields of the row
+    Root rows also hash their sequence number, so identical root documents get distinct ids;
+    ids are reproducible for the same input order.
+    """
+
+    def __init__(self, hash_name: str = 'sha1', length: int = 20, salt: str = '') -> None:
+        self.hash_name: str = hash_name
+        self.length: int = length
+        self.salt: str = salt
+        self.next_root: int = 0
+
+    def __call__(self, table: str, d: Dict, ref_value: Optional[str], index: Optional[int],
+                 key_path: Optional[str] = None) -> str:
+        scalars: Dict[str, Any] = {k: v for k, v in d.items() if not isinstance(v, (dict, list, tuple))}
+        if ref_value is None:
+            self.next_root += 1
+            payload: List = [table, '%s%d' % (self.salt, self.next_root - 1), scalars]
+        else:
+            payload: List = [table, ref_value, key_path, index, scalars]
+        data: str = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.new(self.hash_name, data.encode('utf-8')).hexdigest()[:self.length]
+
+    def shard(self, shard_index: int) -> 'HashIdGenerator':
+        """Independent generator for a shard of a parallel run (root sequence salted by the shard index)
+        """
+        return HashIdGenerator(hash_name=self.hash_name, length=self.length, salt='%s%d.' % (self.salt, shard_index))
+
+
+class KeyPathIdGenerator():
+    """Ids from a key of the root documents; child rows get '<parent id>/<key path>/<index>'
+    """
+
+    def __init__(self, path: Union[List[str], str], s: str = '.') -> None:
+        if isinstance(path, str):
+            path = path.split(s) if s else [path]
+        self.path: List[str] = path
+
+    def __call__(self, table: str, d: Dict, ref_value: Optional[str], index: Optional[int],
+                 key_path: Optional[str] = None) -> str:
+        if ref_value is not None:
+            return '%s/%s/%d' % (ref_value, key_path or table, index or 0)
+        value: Any = d
+        for field_name in self.path:
+            if not isinstance(value, dict) or field_name not in value:
+                raise Exception("Record without key '%s'" % ('.'.join(self.path)))
+            value = value[field_name]
+        return '%s' % (value)
+
+
+class _WithoutKeyPath():
+    """Adapter of an id generator without the key_path parameter
+    """
+
+    def __init__(self, id_generator: Callable[[str, Dict, Optional[str], Optional[int]], str]) -> None:
+        self.id_generator: Callable[[str, Dict, Optional[str], Optional[int]], str] = id_generator
+
+    def __call__(self, table: str, d: Dict, ref_value: Optional[str], index: Optional[int],
+                 key_path: Optional[str] = None) -> str:
+        return self.id_generator(table, d, ref_value, index)
+
+    def shard(self, shard_index: int) -> IdGenerator:
+        if hasattr(self.id_generator, 'shard'):
+            return _WithoutKeyPath(self.id_generator.shard(shard_index))
+        return self
+
+
+def get_id_generator(id_generator: Union[str, IdGenerator, None] = None) -> IdGenerator:
+    """Resolve an id generator
+    :param id_generator: None or 'uuid', 'counter', 'hash', 'key:<path>' or a callable
+    :returns: An id generator
+    """
+    if id_generator is None or id_generator == 'uuid':
+        return uuid_id
+    if isinstance(id_generator, str):
+        if id_generator == 'counter':
+            return CounterIdGenerator()
+        if id_generator == 'hash':
+            return HashIdGenerator()
+        if id_generator.startswith('key:'):
+            return KeyPathIdGenerator(id_generator[len('key:'):])
+        raise Exception("'%s' is not a valid id generator" % (id_generator))
+    if not callable(id_generator):
+        raise Exception("'%s' is not a valid id generator" % (id_generator))
+    try:
+        inspect.signature(id_generator).bind(None, None, None, None, None)
+    except TypeError:
+        return _WithoutKeyPath(id_generator)
+    except ValueError:
+        pass
+    return id_generator